@@ -0,0 +1,95 @@
+# ----------------------------------------------------------------------
+#   Benchmark del arranque de la app
+#
+#   Mide, cada vez en un intérprete nuevo, lo que cuesta importar lo que
+#   src/app.py carga al iniciar (con streamlit / pandas / numpy ya
+#   cargados, como los tiene el servidor antes de correr el script) y lo
+#   que agrega abrir cada pestaña por primera vez. Falla (código 1) si
+#   el arranque supera el presupuesto o si carga alguno de los módulos
+#   pesados que deben esperar a su primer uso.
+#
+#   Uso:
+#     python benchmarks/bench_startup.py
+#     python benchmarks/bench_startup.py --repeat 9 --budget-ms 150
+# ----------------------------------------------------------------------
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+STARTUP_BUDGET_MS = 100
+
+# Lo que app.py importa antes de dibujar la navegación
+STARTUP = ["data_layer", "instrumentation", "navigation", "sections"]
+
+# Sólo con su primer uso: la primera petición a Yahoo o la pestaña que los necesita
+DEFERRED = ["yfinance", "curl_cffi", "requests_cache", "plotly.express"]
+
+# Etapa → módulos que agrega (sobre el arranque)
+STAGES = {
+    "Yahoo (primera petición)": ["yfinance", "curl_cffi.requests"],
+    "Valoración y Análisis Financiero": ["plotly.graph_objects", "metrics", "dividends", "geraldine_weiss", "charts",
+                                         "screener", "valuation"],
+    "Seguimiento de Cartera": ["portfolio_tab"],
+    "Analizar ETF's": ["etf_tab"],
+    "Finanzas Personales": ["finance_tab"],
+    "Calculadora de Interés Compuesto": ["compound_tab"],
+}
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+import numpy, pandas, streamlit
+def load(names):
+    start = time.perf_counter()
+    for name in names:
+        __import__(name)
+    return (time.perf_counter() - start) * 1000
+startup = load({startup!r})
+loaded = [m for m in {deferred!r} if m in sys.modules]
+stage = load({stage!r})
+print(json.dumps({{"startup": startup, "stage": stage, "loaded": loaded}}))
+"""
+
+
+def probe(stage_modules):
+    code = _PROBE.format(src=str(SRC), startup=STARTUP, deferred=DEFERRED, stage=stage_modules)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat):
+    """{etapa: ms (mediana)} y los módulos diferidos que cargó el arranque."""
+    timings, loaded = {"Arranque": []}, set()
+    for _ in range(repeat):
+        for stage, modules in STAGES.items():
+            result = probe(modules)
+            timings["Arranque"].append(result["startup"])
+            timings.setdefault(stage, []).append(result["stage"])
+            loaded.update(result["loaded"])
+    return {stage: statistics.median(values) for stage, values in timings.items()}, sorted(loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de importación del arranque y de cada pestaña")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="presupuesto del arranque")
+    args = parser.parse_args()
+
+    medians, loaded = run(args.repeat)
+    for stage, ms in medians.items():
+        print(f"{stage:<34} {ms:8.1f} ms")
+    failures = []
+    if medians["Arranque"] > args.budget_ms:
+        failures.append(f"el arranque tarda {medians['Arranque']:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    if loaded:
+        failures.append(f"el arranque importa {', '.join(loaded)}")
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print(f"✓ arranque dentro del presupuesto ({args.budget_ms:.0f} ms)")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,260 @@
+# ----------------------------------------------------------------------
+#   Benchmark de los cálculos de valoración
+#
+#   Mide tiempo y memoria pico por etapa (drawdown, CAGR / yield de
+#   dividendos, Geraldine Weiss, histórico del PER, EV/EBITDA y márgenes)
+#   para varias formas de datos (5 años mensual … 20 años diario) y
+#   universos de 1 a 1.000 tickers. Cada corrida se guarda en
+#   benchmarks/results/ para compararla con otras versiones.
+#
+#   Uso:
+#     python benchmarks/bench_valuation.py                 # datos sintéticos
+#     python benchmarks/bench_valuation.py --recorded      # fixtures de replay.py
+#     python benchmarks/bench_valuation.py --quick         # grilla reducida
+#     python benchmarks/bench_valuation.py --compare A.json B.json
+# ----------------------------------------------------------------------
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# (nombre, período, intervalo)
+SHAPES = [
+    ("5y-mensual", "5y", "1mo"),
+    ("5y-diario", "5y", "1d"),
+    ("20y-diario", "20y", "1d"),
+]
+TICKER_COUNTS = [1, 10, 100, 1000]
+QUICK_SHAPES = SHAPES[:2]
+QUICK_TICKER_COUNTS = [1, 10, 100]
+
+STATEMENT_YEARS = 4
+
+
+# --------------------------
+# Datos
+# --------------------------
+def synthetic_universe(n_tickers, period, seed=0):
+    """Precios diarios, dividendos trimestrales y estados anuales de `n_tickers` ficticios."""
+    rng = np.random.default_rng(seed)
+    years = int(period[:-1])
+    end = pd.Timestamp.today().normalize()
+    dates = pd.bdate_range(end - pd.DateOffset(years=years), end)
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+
+    returns = rng.normal(0.0003, 0.015, (len(dates), n_tickers))
+    prices = pd.DataFrame(50 * np.exp(np.cumsum(returns, axis=0)), index=dates, columns=tickers)
+
+    # Un pago por trimestre (primer día hábil de marzo, junio, septiembre y diciembre)
+    quarter_months = dates[dates.month % 3 == 0]
+    pay_dates = pd.DatetimeIndex(
+        quarter_months.to_series().groupby([quarter_months.year, quarter_months.month]).first().to_numpy())
+    growth = 1 + rng.uniform(0, 0.08, n_tickers)
+    steps = np.arange(len(pay_dates))[:, None] / 4
+    dividends = pd.DataFrame(0.25 * growth[None, :] ** steps, index=pay_dates, columns=tickers)
+    dividends.loc[:, rng.random(n_tickers) < 0.1] = np.nan     # ~10 % no paga dividendos
+
+    statements = {ticker: synthetic_statements(rng, end.year) for ticker in tickers}
+    market_caps = pd.Series(rng.uniform(1e9, 5e11, n_tickers), index=tickers)
+    return prices, dividends, statements, market_caps
+
+
+def synthetic_statements(rng, last_year):
+    years = list(range(last_year - STATEMENT_YEARS, last_year))[::-1]
+    revenue = rng.uniform(1e9, 1e11) * (1 + rng.normal(0.05, 0.05, len(years)))
+    income = pd.DataFrame({
+        "Total Revenue": revenue,
+        "Gross Profit": revenue * rng.uniform(0.3, 0.6),
+        "Operating Income": revenue * rng.uniform(0.1, 0.3),
+        "Net Income": revenue * rng.uniform(0.05, 0.2),
+        "EBITDA": revenue * rng.uniform(0.15, 0.35),
+        "Basic EPS": rng.uniform(1, 10, len(years)),
+    }, index=years)
+    balance = pd.DataFrame({
+        "Total Debt": revenue * rng.uniform(0.2, 1.0),
+        "Cash And Cash Equivalents": revenue * rng.uniform(0.05, 0.3),
+    }, index=years)
+    return {"income": income, "balance": balance}
+
+
+def recorded_universe(n_tickers, period):
+    """Universo a partir de los fixtures grabados (YF_REPLAY=record), repetidos hasta `n_tickers`."""
+    os.environ["YF_REPLAY"] = "replay"
+    import data_layer as dl
+
+    available = sorted(p.stem for p in dl.PRICE_STORE.root.glob("*.parquet"))
+    if not available:
+        raise SystemExit(f"No hay precios grabados en {dl.PRICE_STORE.root} (grabar con YF_REPLAY=record)")
+
+    closes, dividends, statements, market_caps = {}, {}, {}, {}
+    for i in range(n_tickers):
+        source = available[i % len(available)]
+        name = source if i < len(available) else f"{source}#{i}"
+        history = dl.get_daily_history(source)
+        closes[name] = dl.slice_period(history, period)["Close"]
+        dividends[name] = history["Dividends"][history["Dividends"] > 0]
+        income = dl.get_annual_statement(source, "financials")
+        statements[name] = {"income": income, "balance": dl.get_annual_statement(source, "balance_sheet")}
+        market_caps[name] = dl.get_info(source).get("marketCap")
+
+    from geraldine_weiss import to_matrix
+    prices = to_matrix(closes)
+    return prices, to_matrix(dividends).reindex(columns=prices.columns), statements, pd.Series(market_caps)
+
+
+def to_interval(prices, interval):
+    if interval == "1d":
+        return prices
+    return prices.resample("MS").last()
+
+
+# --------------------------
+# Etapas
+# --------------------------
+def build_stages(prices, dividends, statements, market_caps):
+    import metrics
+    from dividends import summarize_matrix
+    from geraldine_weiss import compute_bands
+
+    def per_history():
+        for ticker, statement in statements.items():
+            income = statement["income"]
+            if "Basic EPS" in income.columns:
+                eps = income["Basic EPS"].copy()
+                eps.index = pd.to_datetime(eps.index.astype(str), format="%Y")
+                metrics.per_history(eps, prices[ticker].dropna())
+
+    def ev_ebitda():
+        for ticker, statement in statements.items():
+            metrics.ev_ebitda(statement["income"], statement["balance"], market_caps.get(ticker))
+
+    def margins():
+        for statement in statements.values():
+            metrics.margins(statement["income"])
+
+    return {
+        "drawdown": lambda: metrics.drawdown(prices),
+        "dividendos_cagr_yield": lambda: summarize_matrix(prices, dividends),
+        "geraldine_weiss": lambda: compute_bands(prices, dividends).summary(),
+        "per_historico": per_history,
+        "ev_ebitda": ev_ebitda,
+        "margenes": margins,
+    }
+
+
+def measure(func, repeat):
+    """(mejor tiempo, mediana, memoria pico en MB) de `func`."""
+    func()                                   # calentamiento
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), statistics.median(times), peak / 1e6
+
+
+def run(source, shapes, ticker_counts, repeat):
+    rows = []
+    for shape, period, interval in shapes:
+        for n_tickers in ticker_counts:
+            if source == "recorded":
+                prices, dividends, statements, market_caps = recorded_universe(n_tickers, period)
+            else:
+                prices, dividends, statements, market_caps = synthetic_universe(n_tickers, period)
+            prices = to_interval(prices, interval)
+            for stage, func in build_stages(prices, dividends, statements, market_caps).items():
+                best, median, peak_mb = measure(func, repeat)
+                rows.append({
+                    "shape": shape, "tickers": n_tickers, "bars": len(prices), "stage": stage,
+                    "seconds": best, "seconds_median": median, "peak_mb": peak_mb,
+                })
+                print(f"{shape:>11} {n_tickers:>5} tickers  {stage:<22} {best * 1000:9.2f} ms  {peak_mb:8.2f} MB", flush=True)
+    return rows
+
+
+# --------------------------
+# Resultados
+# --------------------------
+def version():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "src"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocida"
+
+
+def save(rows, source, repeat):
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    run_version = version()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = RESULTS_DIR / f"{stamp}_{source}_{run_version}.json"
+    path.write_text(json.dumps({
+        "version": run_version,
+        "timestamp": stamp,
+        "source": source,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": rows,
+    }, indent=2), encoding="utf-8")
+    return path
+
+
+def compare(base_path, new_path):
+    """Tabla de tiempos y memoria de `new` frente a `base` por (forma, tickers, etapa)."""
+    keys = ["shape", "tickers", "stage"]
+    base, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in (base_path, new_path))
+    merged = pd.DataFrame(base["results"]).merge(
+        pd.DataFrame(new["results"]), on=keys, suffixes=("_base", "_new"))
+    merged["x tiempo"] = merged["seconds_new"] / merged["seconds_base"]
+    merged["x memoria"] = merged["peak_mb_new"] / merged["peak_mb_base"]
+    merged["ms base"] = merged["seconds_base"] * 1000
+    merged["ms nuevo"] = merged["seconds_new"] * 1000
+    print(f"{base['version']} → {new['version']}")
+    columns = keys + ["ms base", "ms nuevo", "x tiempo", "peak_mb_base", "peak_mb_new", "x memoria"]
+    print(merged[columns].to_string(index=False, float_format="{:.3g}".format))
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los cálculos de valoración")
+    parser.add_argument("--recorded", action="store_true", help="usar los fixtures grabados en vez de datos sintéticos")
+    parser.add_argument("--quick", action="store_true", help="grilla reducida (sin 20 años ni 1.000 tickers)")
+    parser.add_argument("--tickers", type=int, nargs="+", help="cantidades de tickers a medir")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NUEVO"), help="comparar dos resultados guardados")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        source = "recorded" if args.recorded else "synthetic"
+        shapes = QUICK_SHAPES if args.quick else SHAPES
+        ticker_counts = args.tickers or (QUICK_TICKER_COUNTS if args.quick else TICKER_COUNTS)
+        rows = run(source, shapes, ticker_counts, args.repeat)
+        print(f"Resultados guardados en {save(rows, source, args.repeat)}")
@@ -0,0 +1,79 @@
+# ----------------------------------------------------------------------
+#   Capa de gráficos para series largas
+#
+#   Con 20 años de datos diarios cada serie tiene ~5.000 puntos. Antes de
+#   mandarlos al navegador:
+#     · se reducen con LTTB (Largest-Triangle-Three-Buckets), que conserva
+#       la forma visual (picos y valles) de la serie,
+#     · por encima de WEBGL_THRESHOLD puntos se usa Scattergl,
+#     · sólo se rotula el último punto (una anotación, no una lista de
+#       textos vacíos del tamaño de la serie).
+# ----------------------------------------------------------------------
+import numpy as np
+import plotly.graph_objects as go
+
+from instrumentation import timed
+
+# Puntos máximos por serie: ~ancho útil de un gráfico a pantalla completa
+MAX_POINTS = 1200
+WEBGL_THRESHOLD = 1000
+
+
+def lttb_indices(x, y, n_out):
+    """Índices de los `n_out` puntos que LTTB conserva de (x, y)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # El primero y el último siempre se conservan; el resto en n_out-2 cubetas
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Promedio de la cubeta siguiente (o el último punto)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Punto de la cubeta actual que forma el triángulo de mayor área
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """(x, y) reducidos con LTTB; x puede ser un índice de fechas."""
+    if getattr(x, "tz", None) is not None:
+        x = x.tz_localize(None)         # fechas locales del mercado
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_points:
+        return x, y
+    x_num = x.astype("datetime64[ns]").astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    keep = lttb_indices(x_num, y, max_points)
+    return x[keep], y[keep]
+
+
+@timed("chart")
+def add_line(fig, x, y, name, line, last_label=None, textposition="top right",
+             max_points=MAX_POINTS, **kwargs):
+    """Añade una serie de líneas reducida y, si se pide, rotula su último punto.
+
+    `last_label` es un formato (p. ej. "${:.2f}") aplicado al último valor.
+    """
+    x, y = downsample(x, y, max_points)
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    fig.add_trace(trace(x=x, y=y, mode="lines", name=name, line=line, **kwargs))
+    if last_label is not None and len(y):
+        vertical, horizontal = textposition.split()
+        fig.add_annotation(
+            x=x[-1], y=y[-1], text=last_label.format(y[-1]), showarrow=False,
+            xanchor="left" if horizontal == "right" else "right",
+            yanchor="bottom" if vertical == "top" else "top",
+        )
+    return fig
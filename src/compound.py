@@ -0,0 +1,241 @@
+# ----------------------------------------------------------------------
+#   Interés compuesto: calendario determinista, Monte Carlo y metas
+#
+#   · El calendario con aportes periódicos sale en forma cerrada
+#     (valor futuro de un capital más una anualidad) para todos los
+#     períodos a la vez; future_value acepta arreglos, así que también
+#     evalúa una grilla completa de escenarios de una sola vez.
+#   · Monte Carlo: retornos mensuales lognormales con la rentabilidad
+#     esperada como media. Las trayectorias se generan por tandas (la
+#     memoria queda acotada a tanda × períodos) y en pares antitéticos
+#     (cada sorteo da dos trayectorias). De cada tanda sólo se guarda un
+#     histograma del saldo al cierre de cada año, en escala logarítmica
+#     relativa a la trayectoria mediana; los percentiles se leen de los
+#     histogramas acumulados al final.
+#   · Metas: aporte necesario y años hasta la meta en forma cerrada;
+#     la rentabilidad necesaria (sin forma cerrada) con Newton protegido
+#     por bisección, en lote para toda una grilla de escenarios.
+#   Saldo de una trayectoria con aportes C al cierre de cada período:
+#     B_t = G_t · (B_0 + C · Σ_{s≤t} 1 / G_s),   G_t = Π_{s≤t} (1 + r_s)
+# ----------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 12
+PERCENTILES = (5, 25, 50, 75, 95)
+
+MC_PATHS = 50_000
+MC_CHUNK = 10_000           # trayectorias por tanda
+HIST_BINS = 2048
+HIST_SIGMAS = 6             # ancho del histograma: ± 6 desvíos del log-retorno acumulado
+
+
+# --------------------------
+# Forma cerrada
+# --------------------------
+def period_rate(annual_return, periods_per_year=PERIODS_PER_YEAR):
+    """Tasa efectiva por período equivalente a la rentabilidad anual."""
+    return np.power(1 + np.asarray(annual_return, dtype=float), 1 / periods_per_year) - 1
+
+
+def annuity_factor(rate, periods, at_start=False):
+    """Σ (1 + r)^k de los aportes: valor futuro de aportar 1 cada período."""
+    rate, periods = np.asarray(rate, dtype=float), np.asarray(periods, dtype=float)
+    growth = np.power(1 + rate, periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(np.abs(rate) > 1e-12, (growth - 1) / rate, periods)
+    return factor * (1 + rate) if at_start else factor
+
+
+def future_value(initial, contribution, annual_return, periods, periods_per_year=PERIODS_PER_YEAR, at_start=False):
+    """Saldo tras `periods` períodos (acepta arreglos y hace broadcasting entre todos los argumentos)."""
+    rate = period_rate(annual_return, periods_per_year)
+    growth = np.power(1 + rate, np.asarray(periods, dtype=float))
+    return np.asarray(initial, dtype=float) * growth + np.asarray(contribution, dtype=float) * annuity_factor(
+        rate, periods, at_start)
+
+
+def growth_schedule(initial, contribution, annual_return, years, inflation=0.0,
+                    periods_per_year=PERIODS_PER_YEAR, at_start=False):
+    """Saldo, aportes e interés acumulado por período (forma cerrada, sin recorrer los períodos)."""
+    periods = np.arange(0, int(round(years * periods_per_year)) + 1)
+    balance = future_value(initial, contribution, annual_return, periods, periods_per_year, at_start)
+    contributed = initial + contribution * periods
+    return pd.DataFrame({
+        "Período": periods,
+        "Año": periods / periods_per_year,
+        "Aportado": contributed,
+        "Interés Ganado": balance - contributed,
+        "Saldo": balance,
+        "Saldo Real": balance / np.power(1 + inflation, periods / periods_per_year),
+    })
+
+
+def yearly(schedule, periods_per_year=PERIODS_PER_YEAR):
+    """Filas de cierre de cada año del calendario."""
+    rows = schedule[schedule["Período"] % periods_per_year == 0]
+    return rows.assign(Año=rows["Año"].astype(int)).set_index("Año").drop(columns="Período")
+
+
+# --------------------------
+# Monte Carlo
+# --------------------------
+def _percentiles_from_histogram(counts, low, width, ranks):
+    """Percentiles por fila desde histogramas acumulados, interpolando dentro del intervalo."""
+    cumulative = np.cumsum(counts, axis=1)
+    result = np.empty((counts.shape[0], len(ranks)))
+    for j, rank in enumerate(ranks):
+        index = np.argmax(cumulative >= rank, axis=1)
+        rows = np.arange(counts.shape[0])
+        before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+        inside = np.maximum(counts[rows, index], 1)
+        result[:, j] = low + (index + (rank - before) / inside) * width
+    return result
+
+
+def monte_carlo(initial, contribution, annual_return, volatility, years, paths=MC_PATHS, target=None,
+                percentiles=PERCENTILES, periods_per_year=PERIODS_PER_YEAR, chunk=MC_CHUNK, bins=HIST_BINS, seed=None):
+    """(bandas por año, resumen) de `paths` trayectorias simuladas con aportes al cierre de cada período.
+
+    Las bandas tienen una columna P<q> por percentil y la Media, con el
+    año 0 al inicio. Los percentiles salen de histogramas de HIST_BINS
+    intervalos (error relativo bajo 0,1% en horizontes largos); la
+    media y la probabilidad de llegar a `target` son exactas.
+    """
+    periods = int(round(years * periods_per_year))
+    if periods <= 0:
+        raise ValueError("El horizonte debe ser de al menos un período.")
+    rng = np.random.Generator(np.random.SFC64(seed))
+    sigma = volatility / np.sqrt(periods_per_year)
+    # Media del retorno bruto = (1 + rentabilidad)^(1/períodos): el escenario medio es el determinista
+    mu = np.log1p(annual_return) / periods_per_year - sigma ** 2 / 2
+    steps = np.arange(1, periods + 1)
+    checkpoints = np.unique(np.append(np.arange(periods_per_year, periods + 1, periods_per_year), periods)) - 1
+
+    # Trayectoria mediana (sin sorpresas) y ancho del histograma de cada cierre
+    median_growth = np.exp(mu * steps)
+    median = median_growth * (initial + contribution * np.cumsum(1 / median_growth))
+    log_median = np.log(np.maximum(median[checkpoints], 1e-12))
+    half = np.maximum(HIST_SIGMAS * sigma * np.sqrt(steps[checkpoints]), 1e-6)
+    width = 2 * half / bins
+    # Trayectoria antitética (−Z): G' = E / G con E = exp(2 μ t)
+    mirror = np.exp(2 * mu * steps).astype(np.float32)
+
+    counts = np.zeros((len(checkpoints), bins), dtype=np.int64)
+    offsets = (np.arange(len(checkpoints)) * bins)[None, :]
+    total = np.zeros(len(checkpoints))
+    reached = 0
+
+    def record(balance):
+        nonlocal reached
+        position = (np.log(np.maximum(balance, 1e-12)) - log_median + half) / width
+        index = np.clip(position.astype(np.int64), 0, bins - 1) + offsets
+        counts.ravel()[:] += np.bincount(index.ravel(), minlength=counts.size)
+        total[:] += balance.sum(axis=0)
+        if target is not None:
+            reached += int((balance[:, -1] >= target).sum())
+
+    done = 0
+    while done < paths:
+        size = min(chunk, paths - done)
+        draws = (size + 1) // 2
+        log_growth = rng.standard_normal((draws, periods), dtype=np.float32)
+        log_growth *= sigma
+        log_growth += mu
+        np.cumsum(log_growth, axis=1, out=log_growth)
+        growth = np.exp(log_growth, out=log_growth)
+        discount = np.reciprocal(growth)
+        savings = np.cumsum(discount, axis=1)[:, checkpoints]
+        record(growth[:, checkpoints] * (initial + contribution * savings))
+        if size > 1:
+            growth *= 1 / mirror          # ahora 1 / G' de la trayectoria antitética
+            savings = np.cumsum(growth, axis=1)[:size - draws, checkpoints]
+            record(discount[:size - draws, checkpoints] * mirror[checkpoints] * (initial + contribution * savings))
+        done += size
+
+    ranks = np.asarray(percentiles, dtype=float) / 100 * paths
+    log_ratio = _percentiles_from_histogram(counts, -half, width, ranks)
+    values = np.exp(log_ratio + log_median[:, None])
+    years_index = np.append(0, (checkpoints + 1) / periods_per_year)
+    bands = pd.DataFrame(np.vstack([np.full(len(percentiles), float(initial)), values]),
+                         index=pd.Index(years_index, name="Año"), columns=[f"P{q}" for q in percentiles])
+    bands["Media"] = np.append(initial, total / paths)
+    summary = {
+        "Trayectorias": paths,
+        "Saldo Mediano": float(bands.iloc[-1].get("P50", np.nan)),
+        "Saldo Medio": float(bands["Media"].iloc[-1]),
+        "Probabilidad de Meta (%)": reached / paths * 100 if target is not None else None,
+    }
+    return bands, summary
+
+
+# --------------------------
+# Metas (problemas inversos)
+# --------------------------
+def required_contribution(target, initial, annual_return, years, periods_per_year=PERIODS_PER_YEAR, at_start=False):
+    """Aporte por período necesario para llegar a `target` (0 si el capital inicial ya alcanza)."""
+    rate = period_rate(annual_return, periods_per_year)
+    periods = np.asarray(years, dtype=float) * periods_per_year
+    gap = np.asarray(target, dtype=float) - np.asarray(initial, dtype=float) * np.power(1 + rate, periods)
+    return np.maximum(gap / annuity_factor(rate, periods, at_start), 0.0)
+
+
+def years_to_target(target, initial, contribution, annual_return, periods_per_year=PERIODS_PER_YEAR, at_start=False):
+    """Años (en períodos completos) hasta llegar a `target`; inf si no se llega nunca.
+
+    Con tasa r por período el saldo es (B_0 + C/r)(1 + r)^n − C/r, así
+    que n = log((meta + C/r) / (B_0 + C/r)) / log(1 + r).
+    """
+    target, initial = np.asarray(target, dtype=float), np.asarray(initial, dtype=float)
+    rate = period_rate(annual_return, periods_per_year)
+    contribution = np.asarray(contribution, dtype=float) * ((1 + rate) if at_start else 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level = contribution / rate
+        periods = np.log((target + level) / (initial + level)) / np.log1p(rate)
+        linear = (target - initial) / contribution
+    periods = np.where(np.abs(rate) > 1e-12, periods, linear)
+    periods = np.where(np.isnan(periods) | (periods < 0), np.inf, periods)
+    periods = np.where(target <= initial, 0.0, periods)
+    return np.ceil(np.maximum(periods - 1e-9, 0.0)) / periods_per_year
+
+
+def required_return(target, initial, contribution, years, periods_per_year=PERIODS_PER_YEAR, at_start=False,
+                    low=-0.99, high=1.0, tol=1e-10, max_iter=100):
+    """Rentabilidad anual necesaria para llegar a `target`, para todos los escenarios a la vez.
+
+    El saldo final crece con la rentabilidad, así que en cada escenario la
+    raíz queda encerrada en [low, high]: se da un paso de Newton (derivada
+    numérica) y, si cae fuera del intervalo, se bisecta. NaN donde la
+    meta no se alcanza ni con `high` o ya se supera con `low`.
+    """
+    target, initial, contribution, years = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (target, initial, contribution, years)))
+    periods = years * periods_per_year
+
+    def gap(annual_return):
+        return future_value(initial, contribution, annual_return, periods, periods_per_year, at_start) - target
+
+    low, high = np.full(target.shape, low), np.full(target.shape, high)
+    valid = (gap(low) <= 0) & (gap(high) >= 0)
+    guess = (low + high) / 2
+    for _ in range(max_iter):
+        value = gap(guess)
+        below = value < 0
+        low, high = np.where(below, guess, low), np.where(below, high, guess)
+        step = 1e-7
+        slope = (gap(guess + step) - value) / step
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = guess - value / slope
+        inside = np.isfinite(newton) & (newton > low) & (newton < high)
+        guess = np.where(inside, newton, (low + high) / 2)
+        if np.all(~valid | (np.abs(value) <= tol * np.maximum(np.abs(target), 1.0)) | (high - low < tol)):
+            break
+    return np.where(valid, guess, np.nan)
+
+
+def scenario_grid(solver, rows, row_values, columns, column_values, **fixed):
+    """Evalúa `solver` sobre toda la grilla filas × columnas en una sola llamada (broadcasting)."""
+    values = solver(**{rows: np.asarray(row_values, dtype=float)[:, None],
+                       columns: np.asarray(column_values, dtype=float)[None, :]}, **fixed)
+    values = np.broadcast_to(values, (len(row_values), len(column_values)))
+    return pd.DataFrame(values, index=pd.Index(row_values, name=rows), columns=pd.Index(column_values, name=columns))
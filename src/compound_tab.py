@@ -0,0 +1,141 @@
+# ----------------------------------------------------------------------
+#   Pestaña "Calculadora de Interés Compuesto"
+#
+#   Calendario determinista (forma cerrada) con aportes mensuales y, a
+#   pedido, bandas de percentiles de una simulación Monte Carlo (motor
+#   en compound.py). La simulación se memoiza por parámetros: mover un
+#   widget que no la afecta no vuelve a simular. El planificador de
+#   metas resuelve el problema inverso (aporte, rentabilidad o años) para
+#   los datos ingresados y para una grilla de escenarios alrededor.
+# ----------------------------------------------------------------------
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import compound
+import data_layer as dl
+import instrumentation
+
+SEED = 42                   # semilla fija: los mismos parámetros dan las mismas bandas
+PATH_OPTIONS = [10_000, 50_000, 100_000, 200_000]
+
+GOALS = ["Aporte mensual", "Rentabilidad necesaria", "Años hasta la meta"]
+GRID_RETURNS = np.arange(2.0, 12.5, 1.0)           # % anual
+GRID_YEARS = np.arange(5, 55, 5)
+GRID_CONTRIBUTION_STEPS = np.array([0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0])   # × aporte actual
+
+
+@dl.memoize(dl.TTL_STATEMENTS, kind="compute")
+def _simulate(initial, contribution, annual_return, volatility, years, paths, target):
+    return compound.monte_carlo(initial, contribution, annual_return, volatility, years, paths=paths,
+                                target=target, seed=SEED)
+
+
+def _usd(value):
+    return f"${value:,.0f}"
+
+
+def render():
+    st.markdown("## 📈 Calculadora de Interés Compuesto")
+    cols = st.columns(4)
+    initial = cols[0].number_input("Capital Inicial (USD)", min_value=0.0, value=10_000.0, step=1_000.0, key="ic_inicial")
+    contribution = cols[1].number_input("Aporte Mensual (USD)", min_value=0.0, value=500.0, step=50.0, key="ic_aporte")
+    annual_return = cols[2].number_input("Rentabilidad Anual Esperada (%)", value=7.0, step=0.5, key="ic_rentabilidad")
+    inflation = cols[3].number_input("Inflación Anual (%)", value=3.0, step=0.5, key="ic_inflacion")
+    years = st.slider("Años", min_value=1, max_value=50, value=30, key="ic_anios")
+
+    schedule = compound.growth_schedule(initial, contribution, annual_return / 100, years, inflation / 100)
+    final = schedule.iloc[-1]
+    cols = st.columns(4)
+    cols[0].metric("💰 Saldo Final", _usd(final["Saldo"]))
+    cols[1].metric("🧾 Total Aportado", _usd(final["Aportado"]))
+    cols[2].metric("📈 Interés Ganado", _usd(final["Interés Ganado"]))
+    cols[3].metric("🛒 Saldo Final Real", _usd(final["Saldo Real"]))
+
+    table = compound.yearly(schedule)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=table.index, y=table["Aportado"], name="Aportado"))
+    fig.add_trace(go.Bar(x=table.index, y=table["Interés Ganado"], name="Interés Ganado"))
+    fig.add_trace(go.Scatter(x=table.index, y=table["Saldo Real"], name="Saldo Real", mode="lines"))
+    fig.update_layout(barmode="stack", title="Evolución del Saldo (USD)", xaxis_title="Año", yaxis_title="USD", height=400)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_ic_saldo")
+    with st.expander("📋 Tabla por año"):
+        dollars = st.column_config.NumberColumn(format="$%.2f")
+        st.dataframe(table, column_config={col: dollars for col in table.columns})
+
+    _goal_section(initial, contribution, annual_return / 100, years)
+    _monte_carlo_section(initial, contribution, annual_return / 100, years)
+
+
+def _goal_section(initial, contribution, annual_return, years):
+    st.markdown("### 🎯 Planificador de Metas")
+    cols = st.columns(2)
+    target = cols[0].number_input("Meta (USD)", min_value=0.0, value=1_000_000.0, step=50_000.0, key="ic_objetivo")
+    goal = cols[1].radio("Calcular", GOALS, horizontal=True, key="ic_resolver")
+    contributions = np.maximum(contribution, 50.0) * GRID_CONTRIBUTION_STEPS
+
+    if goal == "Aporte mensual":
+        needed = float(compound.required_contribution(target, initial, annual_return, years))
+        st.metric(f"💵 Aporte mensual para llegar en {years} años", _usd(needed))
+        grid = compound.scenario_grid(compound.required_contribution, "annual_return", GRID_RETURNS / 100,
+                                      "years", GRID_YEARS, target=target, initial=initial)
+        grid.index, labels = GRID_RETURNS, {"y": "Rentabilidad Anual (%)", "x": "Años", "color": "USD/mes"}
+        text = ",.0f"
+    elif goal == "Rentabilidad necesaria":
+        needed = float(compound.required_return(target, initial, contribution, years))
+        st.metric(f"📈 Rentabilidad anual para llegar en {years} años",
+                  "—" if np.isnan(needed) else f"{needed * 100:.2f}%")
+        grid = compound.scenario_grid(compound.required_return, "contribution", contributions,
+                                      "years", GRID_YEARS, target=target, initial=initial) * 100
+        labels = {"y": "Aporte Mensual (USD)", "x": "Años", "color": "% anual"}
+        text = ".1f"
+    else:
+        needed = float(compound.years_to_target(target, initial, contribution, annual_return))
+        st.metric("⏳ Años hasta la meta", "No se alcanza" if np.isinf(needed) else f"{needed:.1f}")
+        grid = compound.scenario_grid(compound.years_to_target, "annual_return", GRID_RETURNS / 100,
+                                      "contribution", contributions, target=target, initial=initial)
+        grid.index, labels = GRID_RETURNS, {"y": "Rentabilidad Anual (%)", "x": "Aporte Mensual (USD)", "color": "Años"}
+        grid = grid.replace(np.inf, np.nan)
+        text = ".1f"
+
+    grid.columns = [f"{c:,.0f}" for c in grid.columns]
+    grid.index = [f"{i:,.0f}" for i in grid.index]
+    fig = px.imshow(grid, text_auto=text, aspect="auto", color_continuous_scale="Viridis", labels=labels,
+                    title=f"{goal} por escenario")
+    fig.update_layout(height=450)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_ic_metas")
+
+
+def _monte_carlo_section(initial, contribution, annual_return, years):
+    st.markdown("### 🎲 Escenarios (Monte Carlo)")
+    if not st.toggle("Simular escenarios de rentabilidad", key="ic_montecarlo"):
+        return
+    cols = st.columns(3)
+    volatility = cols[0].number_input("Volatilidad Anual (%)", min_value=0.0, value=15.0, step=1.0, key="ic_volatilidad")
+    paths = cols[1].selectbox("Trayectorias", PATH_OPTIONS, index=1, format_func="{:,}".format, key="ic_trayectorias")
+    target = cols[2].number_input("Meta (USD, 0 = sin meta)", min_value=0.0, value=0.0, step=10_000.0, key="ic_meta")
+
+    bands, summary = _simulate(initial, contribution, annual_return, volatility / 100, years, paths, target or None)
+    final = bands.iloc[-1]
+    cols = st.columns(4)
+    cols[0].metric("🌧️ Pesimista (P5)", _usd(final["P5"]))
+    cols[1].metric("⚖️ Mediana (P50)", _usd(final["P50"]))
+    cols[2].metric("☀️ Optimista (P95)", _usd(final["P95"]))
+    if summary["Probabilidad de Meta (%)"] is not None:
+        cols[3].metric("🎯 Probabilidad de Meta", f"{summary['Probabilidad de Meta (%)']:.1f}%")
+    else:
+        cols[3].metric("📊 Media", _usd(final["Media"]))
+
+    fig = go.Figure()
+    for low, high, name in [("P5", "P95", "P5 – P95"), ("P25", "P75", "P25 – P75")]:
+        fig.add_trace(go.Scatter(x=bands.index, y=bands[high], mode="lines", line={"width": 0}, showlegend=False,
+                                 hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=bands.index, y=bands[low], mode="lines", line={"width": 0}, fill="tonexty",
+                                 fillcolor="rgba(31, 119, 180, 0.2)", name=name))
+    fig.add_trace(go.Scatter(x=bands.index, y=bands["P50"], mode="lines", name="Mediana"))
+    fig.add_trace(go.Scatter(x=bands.index, y=bands["Media"], mode="lines", name="Media", line={"dash": "dash"}))
+    if target:
+        fig.add_hline(y=target, line_dash="dot", annotation_text="Meta")
+    fig.update_layout(title=f"Bandas de Saldo ({paths:,} trayectorias)", xaxis_title="Año", yaxis_title="USD", height=450)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_ic_montecarlo")
@@ -0,0 +1,451 @@
+# ----------------------------------------------------------------------
+#   Capa de acceso a datos de Yahoo Finance
+#
+#   Todas las secciones de la app piden los datos por aquí. Cada endpoint
+#   (history, info, dividends, balance, resultados, flujo de caja) se
+#   memoiza en memoria por (ticker, período, intervalo) con TTL y
+#   desalojo LRU, de modo que una vista de página cuesta UNA petición por
+#   endpoint y los cambios de widgets no vuelven a tocar la red.
+#
+#   Los objetos devueltos se comparten entre llamadas: tratarlos como de
+#   sólo lectura (usar .copy() / .transpose() antes de modificarlos).
+# ----------------------------------------------------------------------
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import wraps
+
+import pandas as pd
+
+import instrumentation
+import replay
+from http_cache import CachedSession
+from price_store import PriceStore, dividend_adjusted
+
+# yfinance y curl_cffi se importan con la primera petición a Yahoo y no al
+# arrancar el proceso: las pestañas que no los usan no pagan su carga.
+REPLAY_MODE = replay.mode()
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def yf_session():
+    """UNA sesión global que imita Chrome, detrás de la caché HTTP en disco (se crea al primer uso).
+
+    Con YF_REPLAY=record se graban sus respuestas; con YF_REPLAY=replay se
+    sirven desde los fixtures sin tocar la red (ver replay.py).
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            if REPLAY_MODE == "replay":
+                import yfinance as yf
+                yf.set_tz_cache_location(str(replay.FIXTURES_DIR / "yfinance"))
+                _SESSION = replay.replay_session()
+            else:
+                from curl_cffi import requests as curl_requests
+                _SESSION = CachedSession(curl_requests.Session(impersonate="chrome"))
+                if REPLAY_MODE == "record":
+                    _SESSION = replay.RecordingSession(_SESSION)
+    return _SESSION
+
+# TTL por endpoint (segundos)
+TTL_QUOTE      = 15 * 60          # precios / info: cambian durante el día
+TTL_DIVIDENDS  = 12 * 60 * 60
+TTL_STATEMENTS = 24 * 60 * 60     # balance, resultados, flujo de caja
+TTL_EMPTY      = 60               # resultado vacío (rate-limit / ticker inválido)
+
+# Tiempo máximo que la página espera a un endpoint antes de mostrar lo que haya
+FETCH_TIMEOUT = 20
+
+# Descargas en bloque (screener): tickers por llamada a yf.download e hilos
+BATCH_SIZE = 100
+BATCH_THREADS = 8
+
+
+class TTLCache:
+    """Caché en memoria con expiración por entrada y desalojo LRU."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()          # key -> (expira_en, valor)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, item[1]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, _ = self._data.popitem(last=False)
+                self._key_locks.pop(old_key, None)
+
+    def key_lock(self, key):
+        # Un lock por clave: dos secciones pidiendo lo mismo a la vez
+        # esperan la misma descarga en lugar de duplicarla.
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._key_locks.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+_CACHE = TTLCache(maxsize=256)
+
+# Resultados de las descargas en bloque (screener, warmup): un screener de
+# cientos de tickers vaciaría _CACHE, incluido el ticker abierto en la vista
+# individual. Van aparte; 1024 entradas ≈ 500 tickers (ajustado + crudo).
+_BATCH_CACHE = TTLCache(maxsize=1024)
+
+
+def memoize(ttl, kind="fetch"):
+    """Memoiza una función de acceso a datos en la caché global.
+
+    `kind` es el tipo de span con que se registra en instrumentation
+    ("fetch" para endpoints de Yahoo, "compute" para cálculos).
+    """
+    def decorator(func):
+        name = func.__name__.lstrip("_")
+
+        @wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + args
+            with instrumentation.span(kind, name) as fields:
+                found, value = _CACHE.get(key)
+                if not found:
+                    with _CACHE.key_lock(key):
+                        found, value = _CACHE.get(key)
+                        if not found:
+                            value = func(*args)
+                            # Un resultado vacío suele ser un 429 o un ticker mal escrito:
+                            # se recuerda poco para no envenenar la sesión entera.
+                            _CACHE.set(key, value, TTL_EMPTY if _is_empty(value) else ttl)
+                if instrumentation.active():
+                    fields.update(cache="hit" if found else "miss", payload=value,
+                                  detail=" ".join(map(str, args))[:120])
+            return value
+        return wrapper
+    return decorator
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if hasattr(value, "empty"):
+        return value.empty
+    if isinstance(value, (dict, list, tuple)):
+        return len(value) == 0
+    return False
+
+
+def normalize_ticker(ticker):
+    return ticker.strip().upper()
+
+
+def get_ticker(ticker):
+    import yfinance as yf
+    return yf.Ticker(normalize_ticker(ticker), session=yf_session())
+
+
+# Históricos diarios completos en disco (Parquet) con descarga incremental
+PRICE_STORE = PriceStore(ticker_factory=get_ticker, **replay.price_store_options())
+
+
+def slice_period(data, period):
+    """Ventana final de `data` equivalente a un `period` de yfinance (5y, 6mo, 10d, max)."""
+    if period == "max" or data.empty:
+        return data
+    units = {"y": "years", "mo": "months", "d": "days"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[: -len(suffix)].isdigit():
+            now = pd.Timestamp.now(tz=data.index.tz)
+            start = now - pd.DateOffset(**{unit: int(period[: -len(suffix)])})
+            return data[data.index >= start]
+    raise ValueError(f"Período no soportado: {period}")
+
+
+# Intervalos de yfinance que se derivan en memoria desde el diario
+RESAMPLE_RULES = {"1wk": "W-MON", "1mo": "MS", "3mo": "QS"}
+BAR_AGGREGATIONS = {
+    "Open": "first", "High": "max", "Low": "min", "Close": "last",
+    "Volume": "sum", "Dividends": "sum", "Stock Splits": "max",
+}
+
+
+def resample_bars(daily, interval):
+    """Barras semanales / mensuales / trimestrales a partir de las diarias."""
+    rule = RESAMPLE_RULES[interval]
+    aggregations = {col: how for col, how in BAR_AGGREGATIONS.items() if col in daily.columns}
+    bars = daily.resample(rule, label="left", closed="left").agg(aggregations)
+    return bars.dropna(subset=["Close"])
+
+
+# --------------------------
+# Endpoints memoizados
+# --------------------------
+@memoize(TTL_QUOTE)
+def _daily_history(ticker):
+    return PRICE_STORE.history(ticker)
+
+
+@memoize(TTL_QUOTE, kind="compute")
+def _history(ticker, period, interval):
+    # Se descarga una sola vez el diario completo; cada combinación de
+    # período / intervalo es un corte o un resample en memoria.
+    if interval == "1d":
+        return slice_period(_daily_history(ticker), period)
+    if interval in RESAMPLE_RULES:
+        return resample_bars(slice_period(_daily_history(ticker), period), interval)
+    return get_ticker(ticker).history(period=period, interval=interval)
+
+
+@memoize(TTL_QUOTE)
+def _info(ticker):
+    return get_ticker(ticker).info
+
+
+@memoize(TTL_DIVIDENDS, kind="compute")
+def _dividends(ticker):
+    # Mismos pagos que Ticker.dividends, sin una segunda descarga de period="max"
+    dividends = _daily_history(ticker)["Dividends"]
+    return dividends[dividends > 0]
+
+
+@memoize(TTL_STATEMENTS)
+def _balance_sheet(ticker):
+    return get_ticker(ticker).balance_sheet
+
+
+@memoize(TTL_STATEMENTS)
+def _financials(ticker):
+    return get_ticker(ticker).financials
+
+
+@memoize(TTL_STATEMENTS)
+def _cashflow(ticker):
+    return get_ticker(ticker).cashflow
+
+
+def get_daily_history(ticker):
+    return _daily_history(normalize_ticker(ticker))
+
+
+def get_history(ticker, period, interval="1d"):
+    return _history(normalize_ticker(ticker), period, interval)
+
+
+def get_info(ticker):
+    return _info(normalize_ticker(ticker))
+
+
+def get_dividends(ticker):
+    return _dividends(normalize_ticker(ticker))
+
+
+def get_balance_sheet(ticker):
+    return _balance_sheet(normalize_ticker(ticker))
+
+
+def get_financials(ticker):
+    return _financials(normalize_ticker(ticker))
+
+
+def get_cashflow(ticker):
+    return _cashflow(normalize_ticker(ticker))
+
+
+# Estados financieros traspuestos (filas = años), compartidos entre secciones
+_STATEMENTS = {
+    "balance_sheet": _balance_sheet,
+    "financials": _financials,
+    "cashflow": _cashflow,
+}
+
+
+@memoize(TTL_STATEMENTS, kind="compute")
+def _annual_statement(ticker, name):
+    statement = _STATEMENTS[name](ticker).transpose()
+    statement.index = statement.index.year
+    return statement
+
+
+def get_annual_statement(ticker, name):
+    return _annual_statement(normalize_ticker(ticker), name)
+
+
+# --------------------------
+# Descarga en paralelo de un ticker en frío
+# --------------------------
+_FETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="yf-fetch")
+
+def _submit(func, *args):
+    # Con el contexto del llamador: los spans del hilo quedan en su ejecución
+    return _FETCH_POOL.submit(contextvars.copy_context().run, func, *args)
+
+
+_ENDPOINTS = {
+    "history": _daily_history,       # también trae los dividendos
+    "info": _info,
+    "balance_sheet": _balance_sheet,
+    "financials": _financials,
+    "cashflow": _cashflow,
+}
+CORE_ENDPOINTS = ("history", "info", "balance_sheet")
+STATEMENT_ENDPOINTS = ("financials", "cashflow")
+
+
+def fetch(name, ticker):
+    """Resultado memoizado del endpoint `name` ("history", "info", …) para `ticker`.
+
+    Lanza ValueError si Yahoo no devolvió nada (vacío o None).
+    """
+    value = _ENDPOINTS[name](normalize_ticker(ticker))
+    if _is_empty(value):
+        raise ValueError(f"{name} vacío para {ticker}")
+    return value
+
+
+def prefetch(ticker, endpoints=tuple(_ENDPOINTS)):
+    """Lanza en paralelo las descargas de `endpoints` → {endpoint: Future}.
+
+    Los resultados caen en la caché memoizada; un get_*() posterior del
+    mismo endpoint espera a la descarga en curso en vez de repetirla.
+    """
+    ticker = normalize_ticker(ticker)
+    return {name: _submit(_ENDPOINTS[name], ticker) for name in endpoints}
+
+
+def collect(futures, names, timeout=FETCH_TIMEOUT):
+    """Espera sólo a `names`; lo que falle o no llegue a tiempo vale None."""
+    pending = [futures[name] for name in names]
+    done, _ = wait(pending, timeout=timeout)
+    return {
+        name: futures[name].result() if futures[name] in done and futures[name].exception() is None else None
+        for name in names
+    }
+
+
+def fetch_many(tickers, endpoints, timeout=None):
+    """{endpoint: {ticker: resultado}} para muchos tickers con el pool acotado.
+
+    Los tickers que fallan o no responden a tiempo quedan en None.
+    """
+    tickers = [normalize_ticker(t) for t in tickers]
+    futures = {
+        (name, ticker): _submit(_ENDPOINTS[name], ticker)
+        for name in endpoints for ticker in tickers
+    }
+    done, _ = wait(futures.values(), timeout=timeout)
+    results = {name: {} for name in endpoints}
+    for (name, ticker), future in futures.items():
+        ok = future in done and future.exception() is None
+        results[name][ticker] = future.result() if ok else None
+    return results
+
+
+# --------------------------
+# Históricos en bloque (muchos tickers)
+# --------------------------
+def _batch_download(tickers, **kwargs):
+    """yf.download por bloques de BATCH_SIZE → {ticker: barras diarias crudas}."""
+    import yfinance as yf
+    frames = {}
+    for i in range(0, len(tickers), BATCH_SIZE):
+        chunk = tickers[i:i + BATCH_SIZE]
+        data = yf.download(
+            chunk, interval="1d", auto_adjust=False, actions=True, group_by="ticker",
+            ignore_tz=True, threads=min(BATCH_THREADS, len(chunk)), progress=False,
+            session=yf_session(), **kwargs,
+        )
+        for ticker in chunk:
+            if isinstance(data.columns, pd.MultiIndex):
+                frame = data[ticker] if ticker in data.columns.get_level_values(0) else None
+            else:
+                frame = data            # un solo ticker: columnas planas
+            frames[ticker] = frame
+    return frames
+
+
+def get_daily_histories(tickers, adjusted=True):
+    """{ticker: histórico diario ajustado} con descargas en bloque.
+
+    Los resultados quedan en una caché propia (_BATCH_CACHE), separada de
+    la de la vista individual. Abrir después uno de estos tickers ahí no
+    vuelve a la red: lee el Parquet que esta descarga dejó en PRICE_STORE.
+    Con adjusted=False entrega las barras sin ajustar por dividendos (los
+    cierres reales, ya ajustados por splits), desde la misma descarga.
+    """
+    tickers = list(dict.fromkeys(normalize_ticker(t) for t in tickers))
+    name = "_daily_history" if adjusted else "_raw_history"
+    histories = {}
+    cold = []
+    for ticker in tickers:
+        found, value = _BATCH_CACHE.get((name, ticker))
+        if found:
+            histories[ticker] = value
+        else:
+            cold.append(ticker)
+    for ticker, raw in PRICE_STORE.update_many(cold, _batch_download).items():
+        history = dividend_adjusted(raw) if not raw.empty else raw
+        ttl = TTL_EMPTY if raw.empty else TTL_QUOTE
+        _BATCH_CACHE.set(("_daily_history", ticker), history, ttl)
+        _BATCH_CACHE.set(("_raw_history", ticker), raw, ttl)
+        histories[ticker] = history if adjusted else raw
+    return {ticker: histories[ticker] for ticker in tickers}
+
+
+def get_last_prices(tickers):
+    """{ticker: último cierre sin ajustar (None si no hay)} con una descarga en bloque.
+
+    Sólo los tickers que no estén en caché van a Yahoo, todos en la
+    misma llamada a yf.download (period="5d", por feriados y fines de semana).
+    """
+    tickers = list(dict.fromkeys(normalize_ticker(t) for t in tickers))
+    prices = {}
+    cold = []
+    for ticker in tickers:
+        found, value = _BATCH_CACHE.get(("_last_price", ticker))
+        if found:
+            prices[ticker] = value
+        else:
+            cold.append(ticker)
+    if cold:
+        for ticker, raw in _batch_download(cold, period="5d").items():
+            close = raw["Close"].dropna() if raw is not None and "Close" in raw.columns else pd.Series(dtype=float)
+            price = float(close.iloc[-1]) if not close.empty else None
+            _BATCH_CACHE.set(("_last_price", ticker), price, TTL_EMPTY if price is None else TTL_QUOTE)
+            prices[ticker] = price
+    return {ticker: prices[ticker] for ticker in tickers}
+
+
+def cache_stats():
+    # Sin sesión todavía no hubo peticiones HTTP
+    return {"memory": _CACHE.stats(), "batch": _BATCH_CACHE.stats(), "http": dict(_SESSION.stats) if _SESSION is not None else {}}
+
+
+def clear_cache():
+    _CACHE.clear()
+    _BATCH_CACHE.clear()
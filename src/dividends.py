@@ -0,0 +1,179 @@
+# ----------------------------------------------------------------------
+#   Motor de análisis de dividendos
+#
+#   Dividendos anuales, CAGR, yield histórico (promedio / mín / máx) y
+#   dividendo ajustado del año en curso, calculados UNA vez por
+#   (ticker, período, intervalo) y compartidos por todas las secciones:
+#   métricas clave, expander de dividendos, Geraldine Weiss y
+#   Valoración Proyectada.
+# ----------------------------------------------------------------------
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+from instrumentation import timed
+
+
+@dataclass(frozen=True)
+class DividendSummary:
+    annual: pd.Series            # dividendo anual por año, dentro del período
+    adjusted: pd.Series          # igual, con el año en curso proyectado con el CAGR
+    cagr: float = None           # % anual entre el primer año y el penúltimo
+    yield_series: pd.Series = None   # yield (%) por barra, hasta el último año completo
+    avg_yield: float = None
+    min_yield: float = None
+    max_yield: float = None
+
+    @property
+    def empty(self):
+        return self.annual.empty
+
+    @property
+    def cagr_years(self):
+        # (primer año, último año completo) usados en el CAGR
+        if self.cagr is None:
+            return None
+        return self.annual.index[0], self.annual.index[-2]
+
+    def adjusted_dividend(self, year):
+        return self.adjusted.get(year, None)
+
+
+def annual_dividends(dividends, start_year, end_year):
+    if dividends.empty:
+        return pd.Series(dtype=float)
+    annual = dividends.resample("YE").sum()
+    annual.index = annual.index.year
+    return annual[(annual.index >= start_year) & (annual.index <= end_year)]
+
+
+def dividend_cagr(annual):
+    # Se excluye el último año: normalmente está incompleto
+    if len(annual) < 3:
+        return None
+    n_years = annual.index[-2] - annual.index[0]
+    return ((annual.iloc[-2] / annual.iloc[0]) ** (1 / n_years) - 1) * 100
+
+
+def adjust_current_year(annual, cagr, current_year=None):
+    # El dividendo del año en curso aún no está completo: se proyecta
+    # como el del año anterior crecido al CAGR histórico.
+    current_year = current_year or pd.Timestamp.today().year
+    adjusted = annual.copy()
+    if cagr is not None and (current_year - 1) in annual.index:
+        adjusted.loc[current_year] = annual[current_year - 1] * (1 + cagr / 100)
+    return adjusted
+
+
+@timed()
+def summarize_dividends(dividends, close, current_year=None):
+    """Resumen de dividendos para una serie de precios de cierre."""
+    years = pd.DatetimeIndex(close.index).year
+    annual = annual_dividends(dividends, years.min(), years.max())
+    if annual.empty:
+        return DividendSummary(annual=annual, adjusted=annual)
+
+    cagr = dividend_cagr(annual)
+    adjusted = adjust_current_year(annual, cagr, current_year)
+
+    yield_series = years.map(annual.to_dict()).to_numpy(dtype=float) / close.to_numpy() * 100
+    yield_series = pd.Series(yield_series, index=close.index, name="Yield (%)")
+    if len(annual) > 1:
+        yield_series = yield_series[years <= annual.index[-2]]
+
+    return DividendSummary(
+        annual=annual,
+        adjusted=adjusted,
+        cagr=cagr,
+        yield_series=yield_series,
+        avg_yield=yield_series.mean(),
+        min_yield=yield_series.min(),
+        max_yield=yield_series.max(),
+    )
+
+
+# --------------------------
+# Versión matricial (muchos tickers a la vez)
+# --------------------------
+def annual_dividend_matrix(dividends, prices, current_year):
+    """Dividendo anual (años × tickers); NaN fuera de los años con pagos o sin precios."""
+    annual = dividends.fillna(0).resample("YE").sum()
+    annual.index = annual.index.year
+    first_price_year = pd.to_datetime(prices.apply(pd.Series.first_valid_index)).dt.year
+    last_price_year = pd.to_datetime(prices.apply(pd.Series.last_valid_index)).dt.year
+    first_year = min([first_price_year.min()] + list(annual.index[:1]))
+    last_year = max([last_price_year.max(), current_year] + list(annual.index[-1:]))
+    annual = annual.reindex(range(int(first_year), int(last_year) + 1), fill_value=0.0)
+
+    # Válido entre el primer y el último año con pagos, y dentro del rango de precios
+    paid = annual.to_numpy() > 0
+    started = np.cumsum(paid, axis=0) > 0
+    not_ended = np.cumsum(paid[::-1], axis=0)[::-1] > 0
+    years = annual.index.to_numpy()[:, None]
+    in_range = (years >= first_price_year.to_numpy()[None, :]) & (years <= last_price_year.to_numpy()[None, :])
+    return annual.where(started & not_ended & in_range)
+
+
+def cagr_matrix(annual):
+    """dividend_cagr() por columna de una matriz de annual_dividend_matrix()."""
+    values = annual.to_numpy()
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    n_rows = len(values)
+    first = valid.argmax(axis=0)
+    last = n_rows - 1 - valid[::-1].argmax(axis=0)
+    penultimate = np.maximum(last - 1, 0)
+    cols = np.arange(values.shape[1])
+    years = annual.index.to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n_years = (years[penultimate] - years[first]).astype(float)
+        cagr = ((values[penultimate, cols] / values[first, cols]) ** (1 / n_years) - 1) * 100
+    # Se excluye el último año (incompleto): hacen falta al menos 3 años
+    return pd.Series(np.where(count >= 3, cagr, np.nan), index=annual.columns)
+
+
+@timed()
+def summarize_matrix(prices, dividends, current_year=None):
+    """CAGR del dividendo y yield promedio (%) de cada columna de `prices`.
+
+    Mismo resultado que summarize_dividends() ticker a ticker; `prices` y
+    `dividends` como en geraldine_weiss.compute_bands (ver to_matrix).
+    """
+    current_year = current_year or pd.Timestamp.today().year
+    dividends = dividends.reindex(columns=prices.columns)
+    annual = annual_dividend_matrix(dividends, prices, current_year)
+    cagr = cagr_matrix(annual)
+
+    values = annual.to_numpy()
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    last = len(values) - 1 - valid[::-1].argmax(axis=0)
+    # El yield promedio excluye el último año con pagos (incompleto) si hay más de uno
+    cutoff = annual.index.to_numpy()[np.where(count > 1, last - 1, last)]
+
+    years = prices.index.year.to_numpy()
+    rows = annual.index.get_indexer(years)
+    bar_dividend = np.where((rows >= 0)[:, None], values[rows], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yields = bar_dividend / prices.to_numpy() * 100
+    yields[years[:, None] > cutoff[None, :]] = np.nan
+    n_bars = (~np.isnan(yields)).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_yield = np.where(n_bars > 0, np.nansum(yields, axis=0) / n_bars, np.nan)
+
+    return pd.DataFrame({
+        "CAGR del Dividendo": cagr,
+        "Yield Promedio": avg_yield,
+    }, index=prices.columns)
+
+
+@dl.memoize(dl.TTL_QUOTE, kind="compute")
+def _dividend_summary(ticker, period, interval):
+    price_data = dl.get_history(ticker, period, interval)
+    return summarize_dividends(dl.get_dividends(ticker), price_data["Close"])
+
+
+def dividend_summary(ticker, period, interval="1d"):
+    return _dividend_summary(dl.normalize_ticker(ticker), period, interval)
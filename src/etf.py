@@ -0,0 +1,326 @@
+# ----------------------------------------------------------------------
+#   Análisis de ETFs por transparencia (look-through)
+#
+#   Por cada fondo se guardan en disco (data/etfs/) sus posiciones, pesos
+#   por sector y perfil (gasto anual, categoría, activos), con un TTL:
+#   un análisis repetido no vuelve a Yahoo mientras el archivo esté al
+#   día, y si Yahoo falla se sigue usando lo último guardado.
+#     · Yahoo sólo informa las ~10 mayores posiciones; un CSV con la
+#       cartera completa del emisor en data/etf_holdings/<TICKER>.csv
+#       (columnas Symbol, Peso en %, Nombre opcional) tiene prioridad.
+#     · Las posiciones de todos los fondos forman UNA matriz dispersa
+#       fondos × valores (formato coordenado: fila, columna, peso).
+#       La exposición de una cartera de ETFs es el producto pesos × W y
+#       el solapamiento entre fondos es W·Wᵀ con mín(wᵢ, wⱼ) como
+#       producto, resuelto con un cruce por valor: sólo se recorren los
+#       pares de fondos que comparten cada valor.
+# ----------------------------------------------------------------------
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+from fx import normalize_codes
+
+ETF_DIR = Path(__file__).parent.parent / "data" / "etfs"
+HOLDINGS_DIR = Path(__file__).parent.parent / "data" / "etf_holdings"
+
+TTL_HOLDINGS = 7 * 24 * 60 * 60     # las carteras se publican con días de rezago
+
+QUOTE_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary"
+MODULES = ("topHoldings", "fundProfile", "summaryDetail", "defaultKeyStatistics", "quoteType")
+
+SECTOR_NAMES = {
+    "realestate": "Inmobiliario",
+    "consumer_cyclical": "Consumo Cíclico",
+    "basic_materials": "Materiales Básicos",
+    "consumer_defensive": "Consumo Defensivo",
+    "technology": "Tecnología",
+    "communication_services": "Comunicaciones",
+    "financial_services": "Servicios Financieros",
+    "utilities": "Servicios Públicos",
+    "industrials": "Industriales",
+    "energy": "Energía",
+    "healthcare": "Salud",
+}
+PROFILE_FIELDS = ["Nombre", "Categoría", "Familia", "Gasto Anual (%)", "Activos Totales", "Yield (%)"]
+HOLDING_COLUMNS = ["Symbol", "Nombre", "Peso"]
+
+
+# --------------------------
+# Yahoo (quoteSummary)
+# --------------------------
+def _raw(value):
+    # Con formatted=false Yahoo a veces igual entrega {"raw": x, "fmt": "..."}
+    return value.get("raw") if isinstance(value, dict) else value
+
+
+def _fetch_summary(ticker):
+    """Módulos de fondo de quoteSummary por la sesión con caché HTTP (None si falla)."""
+    data = dl.get_ticker(ticker)._data
+    params = {"modules": ",".join(MODULES), "formatted": "false", "symbol": ticker}
+    try:
+        payload = data.get_raw_json(f"{QUOTE_SUMMARY_URL}/{ticker}", user_agent_headers=data.user_agent_headers,
+                                    params=params)
+        return payload["quoteSummary"]["result"][0]
+    except Exception:
+        return None
+
+
+def parse_summary(result):
+    """(posiciones, pesos por sector, perfil) desde el resultado de quoteSummary."""
+    top = result.get("topHoldings") or {}
+    holdings = pd.DataFrame(
+        [(h.get("symbol"), h.get("holdingName"), _raw(h.get("holdingPercent"))) for h in top.get("holdings") or []],
+        columns=HOLDING_COLUMNS,
+    )
+    sectors = {}
+    for entry in top.get("sectorWeightings") or []:
+        for key, weight in entry.items():
+            sectors[SECTOR_NAMES.get(key, key)] = _raw(weight)
+    fund = result.get("fundProfile") or {}
+    fees = fund.get("feesExpensesInvestment") or {}
+    detail = result.get("summaryDetail") or {}
+    stats = result.get("defaultKeyStatistics") or {}
+    expense = _raw(fees.get("annualReportExpenseRatio")) or _raw(stats.get("annualReportExpenseRatio"))
+    dividend_yield = _raw(detail.get("yield"))
+    profile = {
+        "Nombre": (result.get("quoteType") or {}).get("longName"),
+        "Categoría": fund.get("categoryName") or stats.get("category"),
+        "Familia": fund.get("family") or stats.get("fundFamily"),
+        "Gasto Anual (%)": expense * 100 if expense is not None else None,
+        "Activos Totales": _raw(detail.get("totalAssets")) or _raw(stats.get("totalAssets")),
+        "Yield (%)": dividend_yield * 100 if dividend_yield is not None else None,
+    }
+    return holdings, pd.Series(sectors, dtype=float), profile
+
+
+def read_issuer_holdings(ticker, root=HOLDINGS_DIR):
+    """Cartera completa publicada por el emisor (data/etf_holdings/<TICKER>.csv) o None."""
+    path = Path(root) / f"{ticker}.csv"
+    if not path.exists():
+        return None
+    data = pd.read_csv(path)
+    holdings = pd.DataFrame({
+        "Symbol": data["Symbol"],
+        "Nombre": data["Nombre"] if "Nombre" in data else None,
+        "Peso": pd.to_numeric(data["Peso"], errors="coerce") / 100,
+    })
+    return holdings.dropna(subset=["Symbol", "Peso"])
+
+
+def _clean_holdings(holdings):
+    holdings = holdings.dropna(subset=["Symbol", "Peso"]).copy()
+    holdings["Symbol"] = normalize_codes(holdings["Symbol"])
+    holdings["Peso"] = holdings["Peso"].astype(float)
+    # Un mismo valor en varias líneas (clases de acción, lotes) se suma
+    return holdings.groupby("Symbol", as_index=False).agg(Nombre=("Nombre", "first"), Peso=("Peso", "sum"))
+
+
+# --------------------------
+# Almacén local con TTL
+# --------------------------
+class EtfStore:
+    """Posiciones, sectores y perfil por fondo en disco, renovados cada `ttl` segundos."""
+
+    def __init__(self, root=ETF_DIR, ttl=TTL_HOLDINGS, holdings_dir=HOLDINGS_DIR, fetch=_fetch_summary):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.holdings_dir = Path(holdings_dir)
+        self._fetch = fetch
+        self.stats = {"fresh": 0, "fetched": 0, "stale": 0}
+
+    def _paths(self, ticker):
+        name = ticker.replace("/", "_")
+        return (self.root / f"{name}.holdings.parquet", self.root / f"{name}.sectors.parquet",
+                self.root / f"{name}.profile.json")
+
+    def is_fresh(self, ticker):
+        profile = self._paths(ticker)[2]
+        return profile.exists() and time.time() - profile.stat().st_mtime < self.ttl
+
+    def load(self, ticker):
+        holdings, sectors, profile = self._paths(ticker)
+        if not profile.exists():
+            return None
+        return {
+            "holdings": pd.read_parquet(holdings),
+            "sectors": pd.read_parquet(sectors)["Peso"],
+            "profile": json.loads(profile.read_text(encoding="utf-8")),
+        }
+
+    def _save(self, ticker, fund):
+        self.root.mkdir(parents=True, exist_ok=True)
+        holdings, sectors, profile = self._paths(ticker)
+        fund["holdings"].to_parquet(holdings, index=False)
+        fund["sectors"].rename("Peso").to_frame().to_parquet(sectors)
+        # El perfil se escribe al final: su fecha marca la del conjunto
+        tmp = profile.with_suffix(".tmp")
+        tmp.write_text(json.dumps(fund["profile"], ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, profile)
+
+    def get(self, ticker):
+        """{"holdings", "sectors", "profile"} del fondo; None si nunca se pudo descargar."""
+        if self.is_fresh(ticker):
+            self.stats["fresh"] += 1
+            fund = self.load(ticker)
+        else:
+            result = self._fetch(ticker)
+            if result is None:
+                # Yahoo no respondió: se sirve lo último guardado, aunque esté vencido
+                self.stats["stale"] += 1
+                fund = self.load(ticker)
+            else:
+                holdings, sectors, profile = parse_summary(result)
+                fund = {"holdings": _clean_holdings(holdings), "sectors": sectors, "profile": profile}
+                self._save(ticker, fund)
+                self.stats["fetched"] += 1
+        issuer = read_issuer_holdings(ticker, self.holdings_dir)
+        if issuer is not None:
+            fund = fund or {"holdings": None, "sectors": pd.Series(dtype=float),
+                            "profile": dict.fromkeys(PROFILE_FIELDS)}
+            fund = {**fund, "holdings": _clean_holdings(issuer)}
+        return fund
+
+
+STORE = EtfStore()
+
+
+@dl.memoize(dl.TTL_STATEMENTS, kind="compute")
+def _fund(ticker):
+    return STORE.get(ticker) or {}
+
+
+def get_funds(tickers):
+    """{ticker: fondo} de los tickers con datos (en disco o recién descargados)."""
+    funds = {t: _fund(dl.normalize_ticker(t)) for t in tickers}
+    return {t: f for t, f in funds.items() if f}
+
+
+# --------------------------
+# Matriz dispersa fondos × valores
+# --------------------------
+class HoldingsMatrix:
+    """Pesos de cada fondo en cada valor, en formato coordenado (fila, columna, peso)."""
+
+    def __init__(self, rows, cols, weights, funds, securities):
+        self.rows, self.cols, self.weights = rows, cols, weights
+        self.funds, self.securities = pd.Index(funds), pd.Index(securities)
+
+    @classmethod
+    def from_holdings(cls, holdings):
+        """Desde {fondo: DataFrame con Symbol / Peso}."""
+        frames = [h[["Symbol", "Peso"]].assign(Fondo=fund) for fund, h in holdings.items() if h is not None]
+        long = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Symbol", "Peso", "Fondo"])
+        rows, funds = pd.factorize(long["Fondo"])
+        cols, securities = pd.factorize(long["Symbol"])
+        return cls(rows, cols, long["Peso"].to_numpy(dtype=float), funds, securities)
+
+    @property
+    def shape(self):
+        return len(self.funds), len(self.securities)
+
+    def coverage(self):
+        """Fracción de cada fondo cubierta por las posiciones conocidas."""
+        return pd.Series(np.bincount(self.rows, self.weights, minlength=len(self.funds)), index=self.funds)
+
+    def exposure(self, allocation):
+        """Peso de cada valor en una cartera de fondos: asignación (fondos) × W."""
+        allocation = pd.Series(allocation, dtype=float).reindex(self.funds, fill_value=0.0).to_numpy()
+        weights = np.bincount(self.cols, allocation[self.rows] * self.weights, minlength=len(self.securities))
+        return pd.Series(weights, index=self.securities).sort_values(ascending=False)
+
+    def _pairs(self):
+        # Cruce por valor: (fondo i, fondo j, peso en i, peso en j) para cada valor compartido
+        left = pd.DataFrame({"col": self.cols, "i": self.rows, "wi": self.weights})
+        pairs = left.merge(left.rename(columns={"i": "j", "wi": "wj"}), on="col")
+        return pairs["i"].to_numpy(), pairs["j"].to_numpy(), pairs["wi"].to_numpy(), pairs["wj"].to_numpy()
+
+    def _square(self, i, j, values):
+        n = len(self.funds)
+        matrix = np.bincount(i * n + j, values, minlength=n * n).reshape(n, n)
+        return pd.DataFrame(matrix, index=self.funds, columns=self.funds)
+
+    def overlap(self):
+        """Solapamiento por peso: Σ mín(wᵢ, wⱼ) sobre los valores en común (fracción)."""
+        i, j, wi, wj = self._pairs()
+        return self._square(i, j, np.minimum(wi, wj))
+
+    def common(self):
+        """Número de valores en común entre cada par de fondos."""
+        i, j, _, _ = self._pairs()
+        return self._square(i, j, np.ones(len(i)))
+
+
+# --------------------------
+# Análisis de una cartera de ETFs
+# --------------------------
+def parse_allocation(text):
+    """Asignación {ticker: fracción} desde "SPY 60, QQQ 40" (o sólo tickers → partes iguales).
+
+    Los tickers sin peso se reparten lo que falte para llegar al 100%.
+    """
+    entries = re.findall(r"([A-Za-z0-9.\-]+)(?:\s*[:=]?\s*(\d+(?:[.,]\d+)?)\s*%?)?", text or "")
+    weights = {}
+    for ticker, weight in entries:
+        if re.fullmatch(r"\d+(?:[.,]\d+)?", ticker):
+            continue
+        weights[dl.normalize_ticker(ticker)] = float(weight.replace(",", ".")) if weight else np.nan
+    allocation = pd.Series(weights, dtype=float)
+    if allocation.empty:
+        return allocation
+    missing = allocation.isna()
+    if missing.any():
+        rest = max(100.0 - allocation[~missing].sum(), 0.0)
+        allocation[missing] = rest / missing.sum()
+    total = allocation.sum()
+    return allocation / total if total > 0 else allocation
+
+
+def profiles(funds):
+    """Tabla fondos × perfil con la cobertura de las posiciones conocidas."""
+    table = pd.DataFrame({t: f["profile"] for t, f in funds.items()}).T.reindex(columns=PROFILE_FIELDS)
+    table["Posiciones"] = [len(f["holdings"]) if f["holdings"] is not None else 0 for f in funds.values()]
+    table["Cobertura (%)"] = [f["holdings"]["Peso"].sum() * 100 if f["holdings"] is not None else 0.0
+                              for f in funds.values()]
+    numeric = ["Gasto Anual (%)", "Activos Totales", "Yield (%)", "Cobertura (%)"]
+    table[numeric] = table[numeric].apply(pd.to_numeric, errors="coerce")
+    return table
+
+
+def sector_matrix(funds):
+    """Fondos × sectores (fracción)."""
+    return pd.DataFrame({t: f["sectors"] for t, f in funds.items()}).T.fillna(0.0)
+
+
+def look_through(allocation, funds):
+    """Exposición de la cartera de ETFs: valores, sectores, gasto ponderado y solapamiento."""
+    allocation = allocation.reindex(list(funds)).dropna()
+    allocation = allocation / allocation.sum() if allocation.sum() > 0 else allocation
+    matrix = HoldingsMatrix.from_holdings({t: f["holdings"] for t, f in funds.items()})
+    names = [f["holdings"].set_index("Symbol")["Nombre"] for f in funds.values() if f["holdings"] is not None]
+    names = pd.concat(names) if names else pd.Series(dtype=object)
+    names = names[~names.index.duplicated()]
+
+    exposure = matrix.exposure(allocation)
+    holdings = pd.DataFrame({"Nombre": names.reindex(exposure.index).to_numpy(),
+                             "Exposición (%)": exposure.to_numpy() * 100}, index=exposure.index.rename("Symbol"))
+    sectors = sector_matrix(funds)
+    sector_exposure = (sectors.mul(allocation.reindex(sectors.index, fill_value=0.0), axis=0).sum() * 100
+                       if not sectors.empty else pd.Series(dtype=float))
+    table = profiles(funds)
+    expense = (table["Gasto Anual (%)"] * allocation.reindex(table.index)).sum(min_count=1)
+    return {
+        "holdings": holdings,
+        "sectors": sector_exposure.sort_values(ascending=False).rename("Exposición (%)"),
+        "profiles": table,
+        "expense": expense,
+        "overlap": matrix.overlap() * 100,
+        "common": matrix.common(),
+        "allocation": allocation,
+    }
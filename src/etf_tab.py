@@ -0,0 +1,74 @@
+# ----------------------------------------------------------------------
+#   Pestaña "Analizar ETF's"
+#
+#   Perfil, gasto y exposición por transparencia de una cartera de ETFs
+#   (motor en etf.py): valores y sectores subyacentes ponderados por la
+#   asignación, y solapamiento entre cada par de fondos.
+# ----------------------------------------------------------------------
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import etf
+import instrumentation
+
+TOP_HOLDINGS = 25
+
+
+def render():
+    st.markdown("## 🧺 Analizar ETF's")
+    texto = st.text_area("ETFs y peso en la cartera (Ej: VOO 60, QQQ 25, SCHD 15 — sin pesos se reparten en partes iguales)",
+                         key="etf_tickers")
+    if st.button("▶️ Analizar ETFs", key="etf_analizar"):
+        allocation = etf.parse_allocation(texto)
+        if allocation.empty:
+            st.warning("Ingresa al menos un ETF.")
+        else:
+            st.session_state["etf_asignacion"] = allocation
+    if "etf_asignacion" not in st.session_state:
+        return
+
+    allocation = st.session_state["etf_asignacion"]
+    with st.spinner(f"Cargando {len(allocation)} fondos..."):
+        funds = etf.get_funds(allocation.index)
+    missing = [t for t in allocation.index if t not in funds]
+    if missing:
+        st.warning(f"Sin datos de fondo para: {', '.join(missing)}")
+    if not funds:
+        return
+    result = etf.look_through(allocation, funds)
+
+    cols = st.columns(3)
+    cols[0].metric("🧺 Fondos", len(funds))
+    cols[1].metric("💸 Gasto Anual Ponderado", "—" if pd.isna(result["expense"]) else f"{result['expense']:.2f}%")
+    cols[2].metric("🔎 Valores Subyacentes", len(result["holdings"]))
+
+    st.markdown("### 📋 Perfil de los Fondos")
+    percent = st.column_config.NumberColumn(format="%.2f%%")
+    st.dataframe(
+        result["profiles"].assign(**{"Asignación (%)": result["allocation"] * 100}),
+        column_config={
+            **{col: percent for col in ["Gasto Anual (%)", "Yield (%)", "Cobertura (%)", "Asignación (%)"]},
+            "Activos Totales": st.column_config.NumberColumn(format="$%.0f"),
+        },
+    )
+    st.caption("Cobertura: peso del fondo cubierto por las posiciones conocidas (Yahoo informa sólo las mayores; "
+               "la cartera completa se puede dejar en data/etf_holdings/<TICKER>.csv).")
+
+    if not result["sectors"].empty:
+        sectors = result["sectors"].reset_index().rename(columns={"index": "Sector"})
+        fig = px.bar(sectors, x="Exposición (%)", y="Sector", orientation="h", title="Exposición por Sector (%)")
+        fig.update_layout(height=400, yaxis={"categoryorder": "total ascending"})
+        instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_etf_sectores")
+
+    st.markdown(f"### 🔎 Principales Posiciones Subyacentes (Top {TOP_HOLDINGS})")
+    st.dataframe(result["holdings"].head(TOP_HOLDINGS), column_config={"Exposición (%)": percent})
+
+    if len(funds) > 1:
+        overlap = result["overlap"]
+        fig = px.imshow(overlap, text_auto=".1f", color_continuous_scale="Blues", zmin=0,
+                        title="Solapamiento entre Fondos (% de peso en común)", labels={"color": "%"})
+        fig.update_layout(height=150 + 40 * len(overlap))
+        instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_etf_solapamiento")
+        with st.expander("Valores en común entre cada par de fondos"):
+            st.dataframe(result["common"])
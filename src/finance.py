@@ -0,0 +1,441 @@
+# ----------------------------------------------------------------------
+#   Finanzas personales: importación de cartolas bancarias
+#
+#   Las exportaciones CSV de bancos y tarjetas (a veces de cientos de
+#   miles de filas) se leen por tandas y cada tanda pasa por:
+#     · columnas reconocidas por alias (Fecha / Descripción / Monto o
+#       Cargo + Abono / Moneda), montos con "1.234,56" o "1,234.56",
+#     · conversión a USD con el almacén de tipos de cambio (fx.py),
+#     · categoría por reglas: todas las reglas forman UNA expresión
+#       regular con un grupo por categoría, aplicada sólo a las
+#       descripciones distintas (los comercios se repiten mucho),
+#     · un hash por transacción (cuenta, fecha, monto, descripción y
+#       n-ésima repetición de esa combinación en la cartola), que es la
+#       clave primaria del almacén SQLite: reimportar una cartola que se
+#       solapa con otra sólo agrega las filas nuevas.
+#   Presupuestos y gastos por mes son groupbys sobre la tabla guardada.
+# ----------------------------------------------------------------------
+import csv
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fx import FX, normalize_codes
+
+DB_PATH = Path(__file__).parent.parent / "data" / "finanzas.sqlite"
+RULES_PATH = Path(__file__).parent.parent / "data" / "finanzas_reglas.csv"
+BUDGET_PATH = Path(__file__).parent.parent / "data" / "presupuesto.csv"
+
+CHUNK_ROWS = 100_000
+OTHER = "Otros"
+INCOME = "Ingresos"
+
+COLUMN_ALIASES = {
+    "Fecha": ["fecha", "fecha operacion", "fecha transaccion", "fecha contable", "date", "transaction date"],
+    "Descripción": ["descripcion", "detalle", "glosa", "descripcion movimiento", "comercio", "description", "merchant"],
+    "Monto": ["monto", "importe", "amount", "valor"],
+    "Cargo": ["cargo", "cargos", "debito", "debit", "giros", "monto cargo"],
+    "Abono": ["abono", "abonos", "credito", "credit", "depositos", "monto abono"],
+    "Moneda": ["moneda", "divisa", "currency"],
+}
+
+# Categoría → palabras clave (sin tildes, en minúsculas). Gana la palabra que aparece
+# primero en la descripción; a igual posición, la categoría listada antes.
+DEFAULT_RULES = {
+    INCOME: ["remuneracion", "sueldo", "nomina", "honorarios", "abono de dividendos", "devolucion"],
+    "Servicios Básicos": ["enel", "aguas andinas", "metrogas", "cge", "esval", "essbio"],
+    "Supermercado": ["lider", "jumbo", "unimarc", "tottus", "santa isabel", "acuenta", "walmart"],
+    "Transporte": ["uber", "cabify", "didi", "copec", "shell", "petrobras", "metro", "bip", "autopista"],
+    "Restaurantes": ["rappi", "pedidosya", "pedidos ya", "starbucks", "mcdonald", "burger", "restaurant", "cafe"],
+    "Telecomunicaciones": ["entel", "movistar", "vtr", "wom", "claro", "gtd"],
+    "Suscripciones": ["netflix", "spotify", "disney", "amazon prime", "youtube", "hbo", "apple.com", "google"],
+    "Salud": ["farmacia", "cruz verde", "salcobrand", "ahumada", "clinica", "isapre", "fonasa", "dental"],
+    "Vivienda": ["arriendo", "dividendo hipotecario", "gastos comunes", "contribuciones"],
+    "Inversiones": ["fintual", "racional", "interactive brokers", "corredora", "deposito a plazo", "fondo mutuo"],
+    "Compras": ["falabella", "ripley", "paris", "mercadolibre", "mercado libre", "aliexpress", "amazon"],
+}
+
+TABLE_COLUMNS = ["id", "cuenta", "fecha", "descripcion", "monto", "moneda", "monto_usd", "categoria", "archivo"]
+DISPLAY_NAMES = {"cuenta": "Cuenta", "fecha": "Fecha", "descripcion": "Descripción", "monto": "Monto",
+                 "moneda": "Moneda", "monto_usd": "Monto USD", "categoria": "Categoría", "archivo": "Archivo"}
+
+
+# --------------------------
+# Texto y números
+# --------------------------
+def _plain(text):
+    return unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower().strip()
+
+
+def normalize_text(values):
+    """Minúsculas, sin tildes ni espacios repetidos; normaliza cada valor distinto una vez."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+    plain = np.array([re.sub(r"\s+", " ", _plain(u)) for u in uniques], dtype=object)
+    return plain[codes] if len(plain) else np.array([], dtype=object)
+
+
+def _per_unique(values, parse, fill=np.nan):
+    """Aplica `parse` (Serie → Serie) una sola vez por valor distinto; vacíos → `fill`."""
+    codes, uniques = pd.factorize(values)
+    if not len(uniques):
+        return pd.Series(fill, index=values.index)
+    parsed = parse(pd.Series(uniques, dtype=values.dtype)).to_numpy()
+    result = np.full(len(values), fill, dtype=parsed.dtype)
+    found = codes >= 0
+    result[found] = parsed[codes[found]]
+    return pd.Series(result, index=values.index)
+
+
+_AMOUNT_NOISE = re.compile(r"[^\d,.\-()]")
+_COMMA_DECIMAL = re.compile(r",\d{1,2}$")              # "1.234,56" / "12,5"
+_DOT_THOUSANDS = re.compile(r"^\d{1,3}(?:\.\d{3})+$")   # "12.345" / "1.234.567" (pesos sin decimales)
+
+
+def _parse_amount(text):
+    text = _AMOUNT_NOISE.sub("", text)
+    if not text:
+        return np.nan
+    negative = text[0] in "(-" or text[-1] == "-"
+    text = text.strip("()-")
+    if _COMMA_DECIMAL.search(text):
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", "")
+        if _DOT_THOUSANDS.match(text):
+            text = text.replace(".", "")
+    try:
+        value = float(text)
+    except ValueError:
+        return np.nan
+    return -value if negative else value
+
+
+def _parse_amount_text(text):
+    return pd.Series([_parse_amount(t) for t in text.astype(str)], dtype=float)
+
+
+def parse_amounts(values):
+    """Montos de texto con separadores de miles y decimales de cualquier convención."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(values, errors="coerce").astype(float)
+    return _per_unique(values, _parse_amount_text).astype(float)
+
+
+def _parse_date_text(text):
+    text = text.astype(str).str.strip()
+    dates = pd.to_datetime(text, errors="coerce", format="ISO8601")
+    missing = dates.isna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(text[missing], errors="coerce", dayfirst=True)
+    return dates.dt.normalize()
+
+
+def parse_dates(values):
+    """Fechas ISO o día/mes/año (como las exportan los bancos chilenos)."""
+    return pd.to_datetime(_per_unique(values, _parse_date_text, fill=np.datetime64("NaT")))
+
+
+# --------------------------
+# Reglas de categorías
+# --------------------------
+class Categorizer:
+    """Reglas categoría → palabras clave compiladas en una sola expresión regular."""
+
+    def __init__(self, rules=DEFAULT_RULES):
+        self.categories = list(rules)
+        groups = []
+        for i, keywords in enumerate(rules.values()):
+            words = sorted({_plain(k) for k in keywords if str(k).strip()}, key=len, reverse=True)
+            if words:
+                groups.append(f"(?P<c{i}>\\b(?:{'|'.join(re.escape(w) for w in words)}))")
+        self.pattern = "|".join(groups) if groups else "(?P<c0>(?!))"
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        """Reglas de data/finanzas_reglas.csv (Categoría, Patrón) antes de las de DEFAULT_RULES."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        table = pd.read_csv(path)
+        rules = {}
+        for category, keyword in zip(table["Categoría"], table["Patrón"]):
+            rules.setdefault(str(category).strip(), []).append(keyword)
+        for category, keywords in DEFAULT_RULES.items():
+            rules.setdefault(category, []).extend(keywords)
+        return cls(rules)
+
+    def categorize(self, descriptions, amounts=None):
+        """Categoría de cada descripción; sin regla: Ingresos si es abono, si no Otros."""
+        codes, uniques = pd.factorize(normalize_text(descriptions))
+        names = np.full(len(uniques), OTHER, dtype=object)
+        if len(uniques):
+            matches = pd.Series(uniques, dtype=object).str.extract(self.pattern)
+            found = matches.notna().to_numpy()
+            hit = found.any(axis=1)
+            group = np.array([int(c[1:]) for c in matches.columns])[found.argmax(axis=1)]
+            names[hit] = np.array(self.categories, dtype=object)[group[hit]]
+        result = names[codes]
+        if amounts is not None:
+            result = np.where((result == OTHER) & (np.asarray(amounts) > 0), INCOME, result)
+        return result
+
+
+# --------------------------
+# Lectura por tandas
+# --------------------------
+def _key(name):
+    return re.sub(r"[^a-z ]", "", _plain(name)).strip()
+
+
+def map_columns(columns):
+    """{columna del archivo: columna estándar} según COLUMN_ALIASES."""
+    mapping = {}
+    for column in columns:
+        key = _key(column)
+        for standard, aliases in COLUMN_ALIASES.items():
+            if key in aliases and standard not in mapping.values():
+                mapping[column] = standard
+                break
+    return mapping
+
+
+def _detect_format(sample):
+    """(separador, codificación) a partir de los primeros bytes del archivo."""
+    text = sample.decode("utf-8", errors="replace")
+    # Un carácter cortado al final de la muestra no es señal de latin-1
+    encoding = "utf-8-sig" if text[:-1].count("\ufffd") == 0 else "latin-1"
+    try:
+        delimiter = csv.Sniffer().sniff(sample.decode(encoding, errors="replace"), delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+    return delimiter, encoding
+
+
+def read_statement(source, chunk_rows=CHUNK_ROWS):
+    """Itera la cartola (ruta o archivo abierto en binario) en tandas de `chunk_rows` filas con columnas estándar."""
+    handle = open(source, "rb") if isinstance(source, (str, Path)) else source
+    try:
+        sample = handle.read(20_000)
+        handle.seek(0)
+        delimiter, encoding = _detect_format(sample)
+        reader = pd.read_csv(handle, sep=delimiter, encoding=encoding, dtype=str, chunksize=chunk_rows,
+                             skipinitialspace=True)
+        for chunk in reader:
+            chunk = chunk.rename(columns=map_columns(chunk.columns))
+            if "Fecha" not in chunk or "Descripción" not in chunk or not ({"Monto", "Cargo", "Abono"} & set(chunk)):
+                raise ValueError(f"No se reconocen las columnas de la cartola: {list(chunk.columns)}")
+            yield chunk
+    finally:
+        if isinstance(source, (str, Path)):
+            handle.close()
+
+
+def normalize_chunk(chunk, currency="CLP"):
+    """Fecha, descripción, monto con signo (cargos negativos), moneda y monto en USD."""
+    if "Monto" in chunk:
+        amount = parse_amounts(chunk["Monto"])
+    else:
+        charge = parse_amounts(chunk["Cargo"]).abs() if "Cargo" in chunk else 0.0
+        credit = parse_amounts(chunk["Abono"]).abs() if "Abono" in chunk else 0.0
+        amount = pd.Series(credit, index=chunk.index).fillna(0.0) - pd.Series(charge, index=chunk.index).fillna(0.0)
+    frame = pd.DataFrame({
+        "fecha": parse_dates(chunk["Fecha"]),
+        "descripcion": chunk["Descripción"].fillna("").astype(str).str.strip(),
+        "monto": amount.astype(float),
+        "moneda": normalize_codes(chunk["Moneda"].fillna(currency)) if "Moneda" in chunk else currency.upper(),
+    })
+    frame = frame.dropna(subset=["fecha", "monto"])
+    frame = frame[frame["monto"] != 0].reset_index(drop=True)
+    frame["monto_usd"] = FX.to_usd(frame["monto"], frame["moneda"], frame["fecha"])
+    return frame
+
+
+def transaction_ids(frame, account, seen):
+    """Hash int64 por transacción; `seen` (hash → veces vista) lleva las repeticiones entre tandas."""
+    codes, uniques = pd.factorize(normalize_text(frame["descripcion"]))
+    base = pd.util.hash_pandas_object(
+        pd.DataFrame({"cuenta": pd.Categorical([account] * len(frame)),
+                      "dia": frame["fecha"].to_numpy().astype("datetime64[D]").astype(np.int64),
+                      "monto": frame["monto"].round(2).to_numpy(),
+                      "descripcion": pd.Categorical.from_codes(codes, pd.Index(uniques))}),
+        index=False,
+    )
+    # Dos cafés iguales el mismo día son dos transacciones: se numeran las repeticiones
+    occurrence = base.groupby(base).cumcount().to_numpy() + seen.reindex(base.to_numpy(), fill_value=0).to_numpy()
+    seen = seen.add(base.value_counts(), fill_value=0).astype(np.int64)
+    ids = pd.util.hash_pandas_object(pd.DataFrame({"base": base.to_numpy(), "n": occurrence}), index=False)
+    return ids.to_numpy().view(np.int64), seen
+
+
+# --------------------------
+# Almacén SQLite
+# --------------------------
+class FinanceStore:
+    """Transacciones deduplicadas por hash en SQLite, con índices por fecha y categoría."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.version = 0
+        self._frame = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS transacciones (
+                       id INTEGER PRIMARY KEY,
+                       cuenta TEXT,
+                       fecha TEXT,
+                       descripcion TEXT,
+                       monto REAL,
+                       moneda TEXT,
+                       monto_usd REAL,
+                       categoria TEXT,
+                       archivo TEXT
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cuenta_fecha ON transacciones (cuenta, fecha)")
+            self._conn.commit()
+        return self._conn
+
+    def ingest(self, source, account, currency="CLP", name=None, categorizer=None, chunk_rows=CHUNK_ROWS):
+        """Importa una cartola → {"leídas", "nuevas", "duplicadas"}."""
+        categorizer = categorizer or Categorizer.from_file()
+        name = name or getattr(source, "name", str(source))
+        seen, read, added = pd.Series(dtype=np.int64), 0, 0
+        stored, covered = np.array([], dtype=np.int64), None
+        with self._lock:
+            conn = self._connect()
+            for chunk in read_statement(source, chunk_rows):
+                frame = normalize_chunk(chunk, currency)
+                if frame.empty:
+                    continue
+                read += len(frame)
+                frame["id"], seen = transaction_ids(frame, account, seen)
+                # Ids ya guardados de la cuenta: se consulta sólo el tramo de fechas que no cubrió
+                # una tanda anterior (las cartolas vienen casi ordenadas por fecha)
+                day_values = frame["fecha"].to_numpy().astype("datetime64[D]")
+                days = np.datetime_as_string(day_values)
+                first, last = str(day_values.min()), str(day_values.max())
+                missing = [(first, last)] if covered is None else \
+                    [(lo, hi) for lo, hi in [(first, covered[0]), (covered[1], last)] if lo < hi]
+                for lo, hi in missing:
+                    found = conn.execute("SELECT id FROM transacciones WHERE cuenta = ? AND fecha BETWEEN ? AND ?",
+                                         (account, lo, hi)).fetchall()
+                    stored = np.union1d(stored, np.array(found, dtype=np.int64).ravel())
+                covered = (first, last) if covered is None else (min(first, covered[0]), max(last, covered[1]))
+                fresh = ~np.isin(frame["id"].to_numpy(), stored)
+                frame, days = frame[fresh], days[fresh]
+                if frame.empty:
+                    continue
+                frame["categoria"] = categorizer.categorize(frame["descripcion"], frame["monto"])
+                frame["cuenta"], frame["archivo"], frame["fecha"] = account, Path(name).name, days
+                frame["monto_usd"] = frame["monto_usd"].astype(object).where(frame["monto_usd"].notna(), None)
+                # En orden de clave primaria: el árbol de SQLite se llena sin saltos
+                rows = frame.sort_values("id")[TABLE_COLUMNS].astype(object)
+                before = conn.total_changes
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO transacciones ({', '.join(TABLE_COLUMNS)}) VALUES ({', '.join('?' * len(TABLE_COLUMNS))})",
+                    rows.itertuples(index=False, name=None),
+                )
+                conn.commit()
+                added += conn.total_changes - before
+            if added:
+                self.version += 1
+        return {"leídas": read, "nuevas": added, "duplicadas": read - added}
+
+    def frame(self):
+        """Todas las transacciones (en memoria hasta la próxima importación)."""
+        with self._lock:
+            if self._frame is None or self._frame[0] != self.version:
+                if not self.path.exists():
+                    data = pd.DataFrame(columns=TABLE_COLUMNS)
+                else:
+                    data = pd.read_sql(f"SELECT {', '.join(TABLE_COLUMNS)} FROM transacciones ORDER BY fecha",
+                                       self._connect())
+                data["fecha"] = pd.to_datetime(data["fecha"])
+                data[["monto", "monto_usd"]] = data[["monto", "monto_usd"]].astype(float)
+                self._frame = (self.version, data)
+            return self._frame[1]
+
+    def recategorize(self, categorizer=None):
+        """Vuelve a aplicar las reglas a todo lo guardado (tras editar data/finanzas_reglas.csv)."""
+        categorizer = categorizer or Categorizer.from_file()
+        data = self.frame()
+        categories = categorizer.categorize(data["descripcion"], data["monto"])
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("UPDATE transacciones SET categoria = ? WHERE id = ?",
+                             zip(categories, data["id"].astype(int)))
+            conn.commit()
+            self.version += 1
+
+
+STORE = FinanceStore()
+
+
+# --------------------------
+# Presupuestos y resúmenes
+# --------------------------
+def with_month(data):
+    return data.assign(Mes=data["fecha"].to_numpy().astype("datetime64[M]").astype("datetime64[ns]"))
+
+
+def monthly_expenses(data):
+    """Meses × categorías con el gasto en USD (positivo)."""
+    expenses = with_month(data[data["monto_usd"] < 0])
+    if expenses.empty:
+        return pd.DataFrame()
+    pivot = (-expenses["monto_usd"]).groupby([expenses["Mes"], expenses["categoria"]]).sum().unstack(fill_value=0.0)
+    return pivot.reindex(pd.date_range(pivot.index.min(), pivot.index.max(), freq="MS"), fill_value=0.0)
+
+
+def monthly_summary(data):
+    """Ingresos, gastos, ahorro y tasa de ahorro por mes (USD)."""
+    monthly = with_month(data)
+    usd = monthly["monto_usd"]
+    summary = pd.DataFrame({
+        "Ingresos": usd.where(usd > 0, 0.0).groupby(monthly["Mes"]).sum(),
+        "Gastos": (-usd.where(usd < 0, 0.0)).groupby(monthly["Mes"]).sum(),
+    })
+    summary["Ahorro"] = summary["Ingresos"] - summary["Gastos"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["Tasa de Ahorro (%)"] = np.where(summary["Ingresos"] > 0, summary["Ahorro"] / summary["Ingresos"] * 100, np.nan)
+    return summary
+
+
+def read_budget(path=BUDGET_PATH):
+    """Presupuesto mensual por categoría (USD) de data/presupuesto.csv."""
+    path = Path(path)
+    if not path.exists():
+        return pd.Series(dtype=float, name="Presupuesto")
+    table = pd.read_csv(path)
+    return table.set_index("Categoría")["Presupuesto"].astype(float)
+
+
+def write_budget(budget, path=BUDGET_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    budget.rename("Presupuesto").rename_axis("Categoría").reset_index().to_csv(path, index=False)
+
+
+def budget_status(data, budget, month):
+    """Presupuesto vs. gasto de `month` por categoría."""
+    spent = monthly_expenses(data)
+    spent = spent.loc[month] if month in spent.index else pd.Series(dtype=float)
+    table = pd.DataFrame({"Presupuesto": budget, "Gastado": spent}).fillna(0.0)
+    table = table.drop(index=INCOME, errors="ignore")
+    table["Disponible"] = table["Presupuesto"] - table["Gastado"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["Usado (%)"] = np.where(table["Presupuesto"] > 0, table["Gastado"] / table["Presupuesto"] * 100, np.nan)
+    return table.rename_axis("Categoría").sort_values("Gastado", ascending=False)
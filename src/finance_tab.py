@@ -0,0 +1,115 @@
+# ----------------------------------------------------------------------
+#   Pestaña "Finanzas Personales"
+#
+#   Importa cartolas CSV de bancos y tarjetas al almacén local
+#   (motor en finance.py) y muestra ingresos, gastos y ahorro por mes,
+#   el gasto por categoría y el presupuesto mensual
+#   (data/presupuesto.csv) contra lo gastado.
+# ----------------------------------------------------------------------
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import finance
+import instrumentation
+
+
+def _usd(value):
+    return f"-${abs(value):,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+def _import_form():
+    with st.expander("📥 Importar cartola"):
+        with st.form("fin_importar", clear_on_submit=True):
+            files = st.file_uploader("Cartolas (CSV exportado del banco o la tarjeta)", type=["csv", "txt"],
+                                     accept_multiple_files=True)
+            cols = st.columns(2)
+            account = cols[0].text_input("Cuenta", value="Cuenta Corriente")
+            currency = cols[1].text_input("Moneda (si la cartola no la trae)", value="CLP")
+            if st.form_submit_button("Importar"):
+                if not files or not account.strip():
+                    st.warning("Selecciona al menos un archivo e indica la cuenta.")
+                    return
+                for file in files:
+                    try:
+                        with st.spinner(f"Importando {file.name}..."):
+                            result = finance.STORE.ingest(file, account.strip(), currency.strip().upper() or "CLP",
+                                                          name=file.name)
+                    except ValueError as e:
+                        st.error(f"{file.name}: {e}")
+                        continue
+                    st.success(f"{file.name}: {result['leídas']:,} leídas, {result['nuevas']:,} nuevas, "
+                               f"{result['duplicadas']:,} ya importadas.")
+        if st.button("🏷️ Recategorizar con data/finanzas_reglas.csv", key="fin_recategorizar"):
+            finance.STORE.recategorize()
+            st.success("Categorías actualizadas.")
+
+
+def render():
+    st.markdown("## 🏦 Finanzas Personales")
+    _import_form()
+    data = finance.STORE.frame()
+    if data.empty:
+        st.info("Aún no hay transacciones importadas.")
+        return
+
+    accounts = ["Todas"] + sorted(data["cuenta"].unique())
+    account = st.selectbox("Cuenta", accounts, key="fin_cuenta")
+    if account != "Todas":
+        data = data[data["cuenta"] == account]
+    summary = finance.monthly_summary(data)
+    months = list(summary.index[::-1])
+    month = st.selectbox("Mes", months, format_func=lambda m: m.strftime("%Y-%m"), key="fin_mes")
+
+    row = summary.loc[month]
+    cols = st.columns(4)
+    cols[0].metric("💵 Ingresos", _usd(row["Ingresos"]))
+    cols[1].metric("🧾 Gastos", _usd(row["Gastos"]))
+    cols[2].metric("🐷 Ahorro", _usd(row["Ahorro"]))
+    cols[3].metric("📊 Tasa de Ahorro", "—" if pd.isna(row["Tasa de Ahorro (%)"]) else f"{row['Tasa de Ahorro (%)']:.1f}%")
+    if data["monto_usd"].isna().any():
+        st.caption(f"{data['monto_usd'].isna().sum():,} transacciones sin tipo de cambio no se incluyen en los totales.")
+
+    expenses = finance.monthly_expenses(data)
+    if not expenses.empty:
+        stacked = expenses.rename_axis("Mes").reset_index().melt(id_vars="Mes", var_name="Categoría", value_name="USD")
+        fig = px.bar(stacked, x="Mes", y="USD", color="Categoría", title="Gastos por Mes y Categoría (USD)")
+        fig.update_layout(height=400, barmode="stack")
+        instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_fin_gastos")
+        if month in expenses.index and expenses.loc[month].sum() > 0:
+            spent = expenses.loc[month]
+            spent = spent[spent > 0].rename_axis("Categoría").reset_index(name="USD")
+            fig = px.pie(spent, names="Categoría", values="USD", title=f"Gastos de {month:%Y-%m} por Categoría")
+            fig.update_layout(height=400)
+            instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_fin_categorias")
+
+    _budget_section(data, expenses, month)
+
+    st.markdown(f"### 📋 Transacciones de {month:%Y-%m}")
+    shown = finance.with_month(data)
+    shown = shown[shown["Mes"] == month].sort_values("fecha", ascending=False)
+    st.dataframe(
+        shown[list(finance.DISPLAY_NAMES)].rename(columns=finance.DISPLAY_NAMES),
+        column_config={"Fecha": st.column_config.DateColumn(format="YYYY-MM-DD"),
+                       "Monto USD": st.column_config.NumberColumn(format="$%.2f")},
+        hide_index=True,
+    )
+
+
+def _budget_section(data, expenses, month):
+    st.markdown("### 🎯 Presupuesto Mensual (USD)")
+    budget = finance.read_budget()
+    categories = sorted((set(expenses.columns) | set(budget.index)) - {finance.INCOME})
+    table = budget.reindex(categories, fill_value=0.0).rename_axis("Categoría").reset_index()
+    edited = st.data_editor(table, num_rows="dynamic", hide_index=True, key="fin_presupuesto",
+                            column_config={"Presupuesto": st.column_config.NumberColumn(min_value=0.0, format="$%.2f")})
+    budget = edited.dropna(subset=["Categoría"]).set_index("Categoría")["Presupuesto"].fillna(0.0).astype(float)
+    if st.button("💾 Guardar presupuesto", key="fin_guardar_presupuesto"):
+        finance.write_budget(budget)
+        st.success("Presupuesto guardado.")
+
+    status = finance.budget_status(data, budget, month)
+    dollars = st.column_config.NumberColumn(format="$%.2f")
+    st.dataframe(status, column_config={"Presupuesto": dollars, "Gastado": dollars, "Disponible": dollars,
+                                        "Usado (%)": st.column_config.ProgressColumn(format="%.0f%%", min_value=0,
+                                                                                     max_value=100)})
@@ -0,0 +1,139 @@
+# ----------------------------------------------------------------------
+#   Tipos de cambio indexados por moneda y fecha
+#
+#   Reemplaza la consulta fila por fila de data/fx_cache.csv:
+#     · cada moneda se carga como UNA serie diaria (CLPUSD=X, EURUSD=X…)
+#       a través de data_layer, así que queda en el almacén Parquet de
+#       precios y sólo se pide a Yahoo el delta desde la última fecha,
+#     · data/fx_cache.csv queda como respaldo para monedas que Yahoo no
+#       tenga o fechas anteriores a su primera cotización (sin filas
+#       repetidas ni tasas estancadas),
+#     · las conversiones son un merge_asof por moneda sobre todo el
+#       arreglo de montos: la tasa vigente en cada fecha (la última
+#       conocida a esa fecha) sin buscar fila por fila.
+#   Las tasas se expresan como USD por unidad de la moneda.
+# ----------------------------------------------------------------------
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+
+LEGACY_PATH = Path(__file__).parent.parent / "data" / "fx_cache.csv"
+BASE = "USD"
+
+
+def normalize_codes(values):
+    """Códigos (monedas, tickers) sin espacios y en mayúsculas; normaliza cada valor distinto una vez."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).astype(str))
+    return pd.Index(uniques).str.strip().str.upper().to_numpy()[codes]
+
+
+def yahoo_symbol(ccy):
+    return f"{ccy}{BASE}=X"
+
+
+def read_legacy(path=LEGACY_PATH):
+    """Tasas de fx_cache.csv ordenadas, sin duplicados y sólo donde la tasa cambia."""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame({"ccy": pd.Series(dtype=str), "date": pd.Series(dtype="datetime64[ns]"),
+                             "rate": pd.Series(dtype=float)})
+    rates = pd.read_csv(path)
+    rates["ccy"] = rates["ccy"].astype(str).str.strip().str.upper()
+    rates["date"] = pd.to_datetime(rates["date"], errors="coerce").dt.normalize()
+    rates["rate"] = pd.to_numeric(rates["rate"], errors="coerce")
+    rates = rates.dropna().sort_values(["ccy", "date"]).drop_duplicates(["ccy", "date"], keep="last")
+    changed = rates.groupby("ccy")["rate"].diff().ne(0)
+    return rates[changed].reset_index(drop=True)
+
+
+@dl.memoize(dl.TTL_QUOTE, kind="compute")
+def _rates(ccy):
+    history = dl.get_daily_history(yahoo_symbol(ccy))
+    if history.empty:
+        yahoo = pd.Series(dtype=float)
+    else:
+        yahoo = history["Close"].dropna()
+        index = yahoo.index.tz_localize(None) if yahoo.index.tz is not None else yahoo.index
+        yahoo.index = index.normalize()
+        yahoo = yahoo[~yahoo.index.duplicated(keep="last")]
+    legacy = read_legacy()
+    legacy = legacy[legacy["ccy"] == ccy].set_index("date")["rate"]
+    if yahoo.empty:
+        return legacy.sort_index().rename_axis("date").rename("rate")
+    # Yahoo manda; el CSV sólo completa fechas anteriores a su primera cotización
+    # (una fila vieja de fin de semana dentro de su rango taparía el cierre real)
+    rates = pd.concat([legacy[legacy.index < yahoo.index.min()], yahoo]).sort_index()
+    return rates.rename_axis("date").rename("rate")
+
+
+class FXStore:
+    """Series de tasas por moneda y conversiones vectorizadas a USD."""
+
+    def series(self, ccy):
+        """USD por unidad de `ccy` por fecha (Serie vacía si no hay datos)."""
+        ccy = str(ccy).strip().upper()
+        if ccy == BASE:
+            return pd.Series(dtype=float)
+        return _rates(ccy)
+
+    def table(self, currencies):
+        """Tabla larga (ccy, date, rate) ordenada por fecha, para merge_asof."""
+        frames = [self.series(c).reset_index().assign(ccy=c) for c in currencies if c != BASE]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "rate": pd.Series(dtype=float),
+                                 "ccy": pd.Series(dtype=str)})
+        return pd.concat(frames, ignore_index=True).sort_values("date", kind="stable")
+
+    def rates_at(self, currencies, dates):
+        """Tasa vigente para cada par (moneda, fecha); NaN si la moneda no tiene datos.
+
+        Para fechas anteriores a la primera tasa conocida se usa esa primera tasa.
+        """
+        ccy = normalize_codes(currencies)
+        when = pd.to_datetime(pd.Series(dates)).dt.tz_localize(None).dt.normalize().to_numpy()
+        result = np.where(ccy == BASE, 1.0, np.nan)
+        pending = (ccy != BASE) & ~pd.isna(when)
+        if not pending.any():
+            return result
+        left = pd.DataFrame({"ccy": ccy[pending], "date": when[pending], "pos": np.flatnonzero(pending)})
+        left = left.sort_values("date", kind="stable")
+        right = self.table(pd.unique(left["ccy"]))
+        if right.empty:
+            return result
+        matched = pd.merge_asof(left, right, on="date", by="ccy", direction="backward")
+        gaps = matched["rate"].isna().to_numpy()
+        if gaps.any():
+            forward = pd.merge_asof(left[gaps], right, on="date", by="ccy", direction="forward")
+            matched.loc[gaps, "rate"] = forward["rate"].to_numpy()
+        result[matched["pos"].to_numpy()] = matched["rate"].to_numpy()
+        return result
+
+    def to_usd(self, amounts, currencies, dates):
+        """Montos convertidos a USD con la tasa vigente en cada fecha (un solo arreglo)."""
+        return np.asarray(amounts, dtype=float) * self.rates_at(currencies, dates)
+
+    def latest(self, currencies):
+        """{moneda: última tasa conocida} (NaN si no hay datos)."""
+        latest = {}
+        for ccy in dict.fromkeys(str(c).strip().upper() for c in currencies):
+            series = self.series(ccy)
+            latest[ccy] = 1.0 if ccy == BASE else (float(series.iloc[-1]) if not series.empty else np.nan)
+        return latest
+
+    def rate_matrix(self, currencies, dates):
+        """Fechas × monedas con la tasa vigente en cada fecha (USD = 1)."""
+        dates = pd.DatetimeIndex(dates)
+        columns = {}
+        for ccy in dict.fromkeys(str(c).strip().upper() for c in currencies):
+            if ccy == BASE:
+                columns[ccy] = np.ones(len(dates))
+            else:
+                columns[ccy] = self.rates_at(np.full(len(dates), ccy, dtype=object), dates)
+        return pd.DataFrame(columns, index=dates)
+
+
+FX = FXStore()
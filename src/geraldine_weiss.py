@@ -0,0 +1,166 @@
+# ----------------------------------------------------------------------
+#   Motor vectorizado del método Geraldine Weiss
+#
+#   Recibe una matriz de precios diarios (fechas × tickers) y una matriz
+#   de dividendos (fechas de pago × tickers) y calcula en una sola pasada
+#   de NumPy, para todos los tickers a la vez:
+#     · dividendo anual (con el año en curso proyectado con el CAGR),
+#     · yield mensual y sus extremos (mín / máx),
+#     · bandas de sobrevaloración (div / yield mín) e infravaloración
+#       (div / yield máx),
+#     · posición actual del precio respecto a esas bandas.
+#   Sirve igual para el gráfico de un ticker que para ordenar un universo
+#   de cientos de nombres por distancia a la banda infravalorada.
+# ----------------------------------------------------------------------
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+from dividends import annual_dividend_matrix, cagr_matrix
+from instrumentation import timed
+
+
+@dataclass(frozen=True)
+class GWBands:
+    annual_dividend: pd.DataFrame    # años × tickers (año en curso ajustado)
+    cagr: pd.Series                  # % por ticker
+    monthly_price: pd.DataFrame      # fin de mes × tickers
+    monthly_dividend: pd.DataFrame
+    yield_min: pd.Series
+    yield_max: pd.Series
+    last_date: pd.Series             # última fecha con precio por ticker
+
+    @property
+    def monthly_yield(self):
+        return self.monthly_dividend / self.monthly_price
+
+    @property
+    def overvalued(self):
+        return self.monthly_dividend / self.yield_min
+
+    @property
+    def undervalued(self):
+        return self.monthly_dividend / self.yield_max
+
+    def summary(self, current_price=None):
+        """Situación actual de cada ticker frente a sus bandas."""
+        last_price = self.monthly_price.ffill().iloc[-1]
+        price = last_price if current_price is None else current_price.reindex(last_price.index).fillna(last_price)
+        dividend = self.monthly_dividend.ffill().iloc[-1]
+        over = dividend / self.yield_min
+        under = dividend / self.yield_max
+        return pd.DataFrame({
+            "Precio": price,
+            "Dividendo Anual": dividend,
+            "CAGR Dividendo (%)": self.cagr,
+            "Yield Mínimo": self.yield_min,
+            "Yield Máximo": self.yield_max,
+            "Precio Sobrevalorado": over,
+            "Precio Infravalorado": under,
+            # 0 = sobre la banda infravalorada, 1 = sobre la sobrevalorada
+            "Posición en Banda": (price - under) / (over - under),
+            "Distancia a Infravalorado (%)": (price / under - 1) * 100,
+        })
+
+    def table(self, ticker):
+        """Tabla mensual de un ticker con el formato del expander."""
+        df = pd.DataFrame({
+            "Date": self.monthly_price.index,
+            "Precio": self.monthly_price[ticker].to_numpy(),
+            "Dividendo Anual": self.monthly_dividend[ticker].to_numpy(),
+        }).dropna(subset=["Precio"]).reset_index(drop=True)
+        df.insert(0, "Año", df["Date"].dt.year)
+        df.insert(1, "Mes", df["Date"].dt.strftime("%B"))
+        df["Yield"] = df["Dividendo Anual"] / df["Precio"]
+        df["Precio Sobrevalorado"] = df["Dividendo Anual"] / self.yield_min[ticker]
+        df["Precio Infravalorado"] = df["Dividendo Anual"] / self.yield_max[ticker]
+        return df.drop(columns="Date")
+
+    def step_lines(self, ticker):
+        """Coordenadas (x, y_sobre, y_infra) de las bandas anuales escalonadas."""
+        months = self.monthly_price[ticker].dropna().index
+        dividend = self.annual_dividend[ticker].reindex(np.unique(months.year)).dropna()
+        if dividend.empty:
+            return [], np.array([]), np.array([])
+        starts = pd.to_datetime(dividend.index.astype(str), format="%Y")
+        # Cada tramo va del 1 de enero al 1 de enero siguiente; el último, hasta el último precio
+        ends = (starts + pd.DateOffset(years=1))[:-1].append(pd.DatetimeIndex([self.last_date[ticker]]))
+        x = np.column_stack([starts, ends]).ravel()
+        over = np.repeat(dividend.to_numpy() / self.yield_min[ticker], 2)
+        under = np.repeat(dividend.to_numpy() / self.yield_max[ticker], 2)
+        return list(pd.DatetimeIndex(x)), over, under
+
+
+def to_matrix(series_by_ticker):
+    """Alinea {ticker: Serie} en una matriz fechas × tickers sin zona horaria."""
+    columns = {}
+    for ticker, series in series_by_ticker.items():
+        series = series.copy()
+        if getattr(series.index, "tz", None) is not None:
+            series.index = series.index.tz_localize(None)
+        columns[ticker] = series
+    return pd.DataFrame(columns).sort_index()
+
+
+@timed()
+def compute_bands(prices, dividends, current_year=None):
+    """Bandas Geraldine Weiss para todas las columnas de `prices`.
+
+    `prices`: cierres diarios (fechas × tickers); `dividends`: pagos por
+    fecha con las mismas columnas. Ambas sin zona horaria (ver to_matrix).
+    """
+    current_year = current_year or pd.Timestamp.today().year
+    dividends = dividends.reindex(columns=prices.columns)
+    annual = annual_dividend_matrix(dividends, prices, current_year)
+    cagr = cagr_matrix(annual)
+
+    # Año en curso: dividendo del año anterior crecido al CAGR
+    previous = annual.loc[current_year - 1] if current_year - 1 in annual.index else np.nan
+    projected = previous * (1 + cagr / 100)
+    annual.loc[current_year] = projected.where(projected.notna(), annual.loc[current_year])
+    annual = annual.dropna(how="all")
+
+    monthly_price = prices.resample("ME").last()
+    rows = annual.index.get_indexer(monthly_price.index.year)
+    monthly_dividend = np.where((rows >= 0)[:, None], annual.to_numpy()[rows], np.nan)
+    monthly_dividend = pd.DataFrame(monthly_dividend, index=monthly_price.index, columns=prices.columns)
+    monthly_dividend = monthly_dividend.where(monthly_price.notna())
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monthly_yield = monthly_dividend.to_numpy() / monthly_price.to_numpy()
+    has_yield = ~np.isnan(monthly_yield).all(axis=0)
+    yield_min = np.full(len(prices.columns), np.nan)
+    yield_max = np.full(len(prices.columns), np.nan)
+    yield_min[has_yield] = np.nanmin(monthly_yield[:, has_yield], axis=0)
+    yield_max[has_yield] = np.nanmax(monthly_yield[:, has_yield], axis=0)
+
+    return GWBands(
+        annual_dividend=annual,
+        cagr=cagr,
+        monthly_price=monthly_price,
+        monthly_dividend=monthly_dividend,
+        yield_min=pd.Series(yield_min, index=prices.columns),
+        yield_max=pd.Series(yield_max, index=prices.columns),
+        last_date=prices.apply(pd.Series.last_valid_index),
+    )
+
+
+def rank_universe(prices, dividends, current_price=None):
+    """Universo ordenado de más cerca a más lejos de la banda infravalorada."""
+    summary = compute_bands(prices, dividends).summary(current_price)
+    return summary.dropna(subset=["Precio Infravalorado"]).sort_values("Distancia a Infravalorado (%)")
+
+
+@dl.memoize(dl.TTL_QUOTE, kind="compute")
+def _ticker_bands(ticker, period):
+    close = dl.get_history(ticker, period, "1d")["Close"]
+    prices = to_matrix({ticker: close})
+    dividends = to_matrix({ticker: dl.get_dividends(ticker)}).reindex(columns=prices.columns)
+    return compute_bands(prices, dividends)
+
+
+def ticker_bands(ticker, period):
+    """Bandas de un solo ticker (memoizadas por ticker y período)."""
+    return _ticker_bands(dl.normalize_ticker(ticker), period)
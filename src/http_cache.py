@@ -0,0 +1,339 @@
+# ----------------------------------------------------------------------
+#   Caché HTTP persistente (SQLite) para la sesión curl_cffi de Yahoo
+#
+#   requests_cache sólo parchea la librería `requests`; todas las
+#   llamadas de yfinance salen por la sesión curl_cffi, así que aquí se
+#   envuelve esa sesión: los GET a los endpoints de datos se guardan en
+#   SQLite con un TTL por endpoint (cotizaciones cortas, estados
+#   financieros largos) y, al expirar, se revalidan con ETag /
+#   Last-Modified antes de volver a descargar el cuerpo completo.
+#
+#   Política escalonada:
+#     · 200      → TTL del endpoint; al vencer, y dentro de la ventana del
+#                  endpoint (minutos para cotizaciones, días para estados),
+#                  se sirve el último payload bueno mientras un hilo lo
+#                  refresca (stale-while-revalidate).
+#     · 404/429  → caché negativa corta, y nunca pisan un payload bueno.
+#     · 429      → backoff exponencial (o Retry-After) durante el cual no
+#                  se vuelve a llamar a Yahoo.
+# ----------------------------------------------------------------------
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHE_PATH = Path(__file__).parent.parent / "yf_http_cache.sqlite"
+
+# (patrón de URL, TTL, ventana vencida) en segundos — gana el primero que coincida.
+# Pasado el TTL, durante la ventana se sirve el último payload bueno mientras se
+# refresca en segundo plano: corta para cotizaciones, larga para estados financieros.
+ENDPOINT_TTLS = (
+    (r"/v7/finance/quote\b",                 5 * 60,          10 * 60),            # cotización
+    (r"/v8/finance/chart/",                  15 * 60,         60 * 60),            # históricos
+    (r"/v10/finance/quoteSummary/",          60 * 60,         6 * 60 * 60),        # info
+    (r"/ws/fundamentals-timeseries/",        24 * 60 * 60,    7 * 24 * 60 * 60),   # estados financieros
+    (r"/v1/finance/search",                  24 * 60 * 60,    7 * 24 * 60 * 60),
+)
+
+# Caché negativa: segundos que se recuerda un error antes de reintentar
+NEGATIVE_TTLS = {404: 10 * 60, 429: 60}
+
+# Cookies / crumb: nunca se cachean
+NEVER_CACHE = re.compile(r"fc\.yahoo\.com|getcrumb|consent|/v1/test/")
+
+# Parámetros que cambian entre sesiones pero no el contenido: el crumb de la
+# sesión y period2 ("hasta ahora", distinto en cada petición de históricos)
+VOLATILE_PARAMS = {"crumb", "period2"}
+
+# period="max" en yfinance es period1 = hoy − 99 años: cambia cada día
+MAX_PERIOD_START = -20 * 365 * 24 * 60 * 60       # antes de 1950
+
+# Cada cuántas respuestas guardadas se borran las filas ya inservibles
+PRUNE_EVERY = 500
+
+# Cabeceras que dejan de ser válidas una vez descomprimido el cuerpo
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+class CachedResponse:
+    """Respuesta servida desde la caché con la interfaz que usa yfinance."""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.reason = "OK" if status_code < 400 else "Cached error"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} (caché) para {self.url}")
+
+
+class _Store:
+    """Tabla SQLite clave → respuesta, segura entre hilos."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   url TEXT,
+                   status INTEGER,
+                   headers TEXT,
+                   body BLOB,
+                   stored_at REAL,
+                   expires_at REAL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_expires ON responses (expires_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, stored_at, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, stored_at, expires_at = row
+        return {
+            "url": url, "status": status, "headers": json.loads(headers),
+            "body": body, "stored_at": stored_at, "expires_at": expires_at,
+        }
+
+    def put(self, key, url, status, headers, body, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, now, now + ttl),
+            )
+            self._conn.commit()
+
+    def touch(self, key, ttl):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ? WHERE key = ?", (time.time() + ttl, key)
+            )
+            self._conn.commit()
+
+    def prune(self, before):
+        """Borra las respuestas vencidas antes de `before` (ya no se sirven ni como vencidas)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (before,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class RateLimitBackoff:
+    """Backoff exponencial compartido tras un 429 de Yahoo."""
+
+    def __init__(self, base=5, cap=15 * 60):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def active(self):
+        return time.time() < self.blocked_until
+
+    def failure(self, retry_after=None):
+        with self._lock:
+            self.failures += 1
+            delay = retry_after if retry_after else self.base * 2 ** (self.failures - 1)
+            self.blocked_until = time.time() + min(delay, self.cap)
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.blocked_until = 0.0
+
+    def remaining(self):
+        return max(0, int(self.blocked_until - time.time()))
+
+
+def _retry_after(headers):
+    value = {k.lower(): v for k, v in dict(headers or {}).items()}.get("retry-after")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedSession:
+    """Envuelve una sesión curl_cffi y cachea sus GET en SQLite.
+
+    Todo lo que no sea `get` (cookies, post, headers…) se delega tal cual
+    a la sesión original.
+    """
+
+    def __init__(self, session, path=CACHE_PATH, endpoint_ttls=ENDPOINT_TTLS):
+        self._session = session
+        self._store = _Store(path)
+        self._ttls = [(re.compile(pattern), ttl, stale) for pattern, ttl, stale in endpoint_ttls]
+        self._max_stale = max((stale for _, _, stale in endpoint_ttls), default=0)
+        self._stored = 0
+        self._store.prune(time.time() - self._max_stale)
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0,
+                      "stale": 0, "negative": 0, "throttled": 0}
+        self.backoff = RateLimitBackoff()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="yf-refresh")
+        self._refreshing = set()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    # --------------------------
+    # Política
+    # --------------------------
+    def policy_for(self, url):
+        """(TTL, ventana vencida) del endpoint, o None si la URL no se cachea."""
+        if NEVER_CACHE.search(url):
+            return None
+        for pattern, ttl, stale in self._ttls:
+            if pattern.search(url):
+                return ttl, stale
+        return None
+
+    @staticmethod
+    def cache_key(url, params):
+        params = {k: v for k, v in (params or {}).items() if k not in VOLATILE_PARAMS}
+        if "period1" in params and int(params["period1"]) < MAX_PERIOD_START:
+            params["period1"] = "max"
+        query = urlencode(sorted((k, str(v)) for k, v in params.items()))
+        return f"{url}?{query}" if query else url
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    # --------------------------
+    # Peticiones
+    # --------------------------
+    def get(self, url, params=None, **kwargs):
+        policy = self.policy_for(url)
+        if policy is None:
+            return self._session.get(url, params=params, **kwargs)
+        ttl, stale_window = policy
+
+        key = self.cache_key(url, params)
+        cached = self._store.get(key)
+        now = time.time()
+        if cached is not None and cached["expires_at"] > now:
+            self._count("hits")
+            return self._to_response(cached)
+
+        good = cached if cached is not None and cached["status"] == 200 else None
+        if good is not None and now - good["expires_at"] < stale_window:
+            self._count("stale")
+            self._refresh_in_background(key, url, params, kwargs, ttl, good)
+            return self._to_response(good)
+
+        if self.backoff.active():
+            # Yahoo nos limitó hace poco: no insistir hasta que pase el backoff
+            self._count("throttled")
+            if cached is not None:
+                return self._to_response(cached)
+            return CachedResponse(url, 429, {"Retry-After": str(self.backoff.remaining())}, b"")
+
+        return self._fetch(key, url, params, kwargs, ttl, good)
+
+    def _fetch(self, key, url, params, kwargs, ttl, good):
+        kwargs = dict(kwargs)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if good is not None:
+            # Revalidación condicional: si Yahoo responde 304 se reutiliza el cuerpo
+            validators = {k.lower(): v for k, v in good["headers"].items()}
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                headers["If-Modified-Since"] = validators["last-modified"]
+
+        response = self._session.get(url, params=params, headers=headers or None, **kwargs)
+        status = response.status_code
+
+        if good is not None and status == 304:
+            self._count("revalidated")
+            self._store.touch(key, ttl)
+            return self._to_response(good)
+
+        self._count("misses")
+        if status == 200:
+            self.backoff.success()
+            self._store.put(key, url, 200, self._clean_headers(response.headers), response.content, ttl)
+            self._count("stored")
+            self._prune_periodically()
+            return response
+
+        if status == 429:
+            self.backoff.failure(_retry_after(response.headers))
+        if good is not None:
+            # Un error nunca reemplaza al último payload bueno
+            return self._to_response(good)
+        if status in NEGATIVE_TTLS:
+            self._store.put(key, url, status, self._clean_headers(response.headers),
+                            response.content, NEGATIVE_TTLS[status])
+            self._count("negative")
+        return response
+
+    def _prune_periodically(self):
+        with self._stats_lock:
+            self._stored += 1
+            due = self._stored % PRUNE_EVERY == 0
+        if due:
+            self._store.prune(time.time() - self._max_stale)
+
+    def _refresh_in_background(self, key, url, params, kwargs, ttl, good):
+        with self._stats_lock:
+            if key in self._refreshing or self.backoff.active():
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, url, params, kwargs, ttl, good)
+            except Exception:
+                pass        # se reintentará en la próxima lectura
+            finally:
+                with self._stats_lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+    @staticmethod
+    def _clean_headers(headers):
+        return {k: v for k, v in dict(headers).items() if k.lower() not in DROP_HEADERS}
+
+    @staticmethod
+    def _to_response(cached):
+        return CachedResponse(cached["url"], cached["status"], cached["headers"], cached["body"])
+
+    def clear(self):
+        self._store.clear()
@@ -0,0 +1,133 @@
+# ----------------------------------------------------------------------
+#   Ingresos por dividendos (data/incomes.csv)
+#
+#   Cada pago se registra en su moneda (CLP, USD…). Aquí:
+#     · el valor en USD se recalcula con el almacén de tipos de cambio
+#       (fx.py) a la fecha del pago, en una sola operación por arreglo,
+#     · Año / Mes salen de la fecha (en el CSV a veces faltan),
+#     · los totales mensuales por ticker y moneda se acumulan con groupby
+#       y se ponen al día sólo con las filas agregadas al archivo.
+#   Las tablas anuales y mensuales de la pestaña son pivotes de ese
+#   acumulado, que tiene a lo más una fila por ticker / moneda / mes.
+# ----------------------------------------------------------------------
+import calendar
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fx import FX, normalize_codes
+from portfolio import CSVTail
+
+INCOMES_PATH = Path(__file__).parent.parent / "data" / "incomes.csv"
+
+INCOME_COLUMNS = ["Ticker", "Fecha", "Tipo", "Moneda", "Dividendo/Acción", "Valor Bruto",
+                  "Total USD", "Año", "Mes"]
+KEYS = ["Ticker", "Moneda", "Periodo"]
+MONTH_NAMES = np.array(calendar.month_abbr[1:])      # "Jan" … "Dec", como en el CSV
+TOTALS = ["Valor Bruto", "Total USD", "Pagos"]
+
+
+def parse_incomes(data, fx=FX):
+    """Tipos del archivo, Total USD recalculado y Año / Mes / Periodo desde la fecha."""
+    incomes = data.reindex(columns=INCOME_COLUMNS).copy()
+    incomes["Ticker"] = normalize_codes(incomes["Ticker"])
+    incomes["Moneda"] = normalize_codes(incomes["Moneda"])
+    incomes["Fecha"] = pd.to_datetime(incomes["Fecha"], errors="coerce", format="ISO8601")
+    numeric = ["Dividendo/Acción", "Valor Bruto", "Total USD"]
+    incomes[numeric] = incomes[numeric].apply(pd.to_numeric, errors="coerce")
+    incomes = incomes.dropna(subset=["Fecha", "Valor Bruto"]).reset_index(drop=True)
+
+    usd = fx.to_usd(incomes["Valor Bruto"], incomes["Moneda"], incomes["Fecha"])
+    # Sin tasa para la moneda → se conserva el Total USD registrado
+    incomes["Total USD"] = np.where(np.isnan(usd), incomes["Total USD"], usd)
+    incomes["Año"] = incomes["Fecha"].dt.year
+    incomes["Mes"] = MONTH_NAMES[incomes["Fecha"].dt.month.to_numpy() - 1]
+    incomes["Periodo"] = incomes["Fecha"].dt.to_period("M").dt.to_timestamp()
+    return incomes
+
+
+def monthly_totals(incomes):
+    """Valor bruto, USD y número de pagos por ticker, moneda y mes."""
+    return incomes.assign(Pagos=1).groupby(KEYS)[TOTALS].sum()
+
+
+def _empty_totals():
+    index = pd.MultiIndex.from_arrays([[], [], pd.DatetimeIndex([])], names=KEYS)
+    return pd.DataFrame({column: pd.Series(dtype=float) for column in TOTALS}, index=index)
+
+
+# --------------------------
+# Pivotes
+# --------------------------
+def monthly_pivot(totals, by="Ticker", value="Total USD"):
+    """Meses × `by` (Ticker o Moneda), con todos los meses del rango aunque no haya pagos."""
+    if totals.empty:
+        return pd.DataFrame()
+    pivot = totals[value].groupby(level=["Periodo", by]).sum().unstack(by, fill_value=0.0)
+    months = pd.date_range(pivot.index.min(), pivot.index.max(), freq="MS")
+    return pivot.reindex(months, fill_value=0.0).rename_axis("Periodo")
+
+
+def annual_pivot(totals, by="Ticker", value="Total USD"):
+    """Años × `by`, con una columna Total."""
+    if totals.empty:
+        return pd.DataFrame()
+    frame = totals[value].reset_index()
+    frame["Año"] = frame["Periodo"].dt.year
+    pivot = frame.pivot_table(index="Año", columns=by, values=value, aggfunc="sum", fill_value=0.0)
+    pivot["Total"] = pivot.sum(axis=1)
+    return pivot
+
+
+def summary(totals, today=None):
+    """Total cobrado, últimos 12 meses y año en curso (USD)."""
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+    if totals.empty:
+        return {"Total (USD)": 0.0, "Últimos 12 meses (USD)": 0.0, "Año en curso (USD)": 0.0}
+    usd = totals["Total USD"].groupby(level="Periodo").sum()
+    start_12m = (today - pd.DateOffset(months=11)).to_period("M").to_timestamp()
+    return {
+        "Total (USD)": usd.sum(),
+        "Últimos 12 meses (USD)": usd[usd.index >= start_12m].sum(),
+        "Año en curso (USD)": usd[usd.index.year == today.year].sum(),
+    }
+
+
+# --------------------------
+# Archivo con lectura incremental
+# --------------------------
+class IncomeLedger:
+    """Totales mensuales de incomes.csv que se ponen al día sólo con las filas nuevas."""
+
+    def __init__(self, path=INCOMES_PATH):
+        self.path = Path(path)
+        self.stats = {"full": 0, "incremental": 0}
+        self._tail = CSVTail(self.path, INCOME_COLUMNS)
+        self._lock = threading.Lock()
+        self.incomes = parse_incomes(pd.DataFrame(columns=INCOME_COLUMNS))
+        self.totals = _empty_totals()
+
+    def refresh(self):
+        """Totales mensuales al día (relee todo si el archivo se reescribió)."""
+        with self._lock:
+            if not self.path.exists():
+                self._tail.reset()
+                self.incomes = parse_incomes(pd.DataFrame(columns=INCOME_COLUMNS))
+                self.totals = _empty_totals()
+                return self.totals
+            data, full = self._tail.read()
+            if full:
+                self.incomes = parse_incomes(data)
+                self.totals = monthly_totals(self.incomes)
+                self.stats["full"] += 1
+            elif not data.empty:
+                new = parse_incomes(data)
+                self.incomes = pd.concat([self.incomes, new], ignore_index=True)
+                self.totals = self.totals.add(monthly_totals(new), fill_value=0.0).sort_index()
+                self.stats["incremental"] += 1
+            return self.totals
+
+
+LEDGER = IncomeLedger()
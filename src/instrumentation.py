@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------
+#   Instrumentación de la pestaña de valoración
+#
+#   Con el panel de depuración activo, cada ejecución del script guarda
+#   un registro (RunTrace) con:
+#     · spans "fetch"   → endpoints de data_layer (hit / miss en la caché
+#                         en memoria y tamaño del resultado),
+#     · spans "compute" → transformaciones de pandas / NumPy,
+#     · spans "chart"   → st.plotly_chart (armado + serialización) y
+#                         tamaño del JSON de la figura,
+#     · marcas "section" → tiempo total de cada bloque de la página,
+#     · delta de las estadísticas de caché (memoria y HTTP) de la ejecución.
+#   Sin panel activo todo esto es un no-op: no se mide nada.
+# ----------------------------------------------------------------------
+import csv
+import io
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+_RUN = ContextVar("instrumentation_run", default=None)
+_PARENT = ContextVar("instrumentation_parent", default=None)
+
+SPAN_FIELDS = ["run", "id", "parent", "kind", "name", "start", "seconds", "self_seconds",
+               "cache", "bytes", "detail", "thread"]
+
+
+def payload_bytes(value):
+    """Tamaño aproximado en memoria de un resultado (DataFrame, Serie, dict…)."""
+    if value is None:
+        return 0
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        return len(json.dumps(value, default=str))
+    return sys.getsizeof(value)
+
+
+class RunTrace:
+    """Spans de una ejecución del script."""
+
+    def __init__(self, label, cache_stats=None):
+        self.label = label
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._cache_stats = cache_stats
+        self._cache_before = cache_stats() if cache_stats else None
+        self._section = None
+        self.spans = []
+        self.cache = {}
+        self.seconds = None
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def add(self, **span):
+        payload = span.pop("payload", None)
+        if payload is not None and span.get("bytes") is None:
+            span["bytes"] = payload_bytes(payload)
+        span["start"] = span["start"] - self._t0
+        with self._lock:
+            self.spans.append(span)
+
+    def section(self, name):
+        # Cierra la sección anterior y abre `name`: las secciones son consecutivas
+        now = time.perf_counter()
+        if self._section is not None:
+            previous, start = self._section
+            self.add(id=self.new_id(), parent=None, kind="section", name=previous,
+                     start=start, seconds=now - start, thread=threading.current_thread().name)
+        self._section = (name, now) if name is not None else None
+
+    def finish(self):
+        self.section(None)
+        self.seconds = time.perf_counter() - self._t0
+        if self._cache_stats:
+            self.cache = _stats_delta(self._cache_before, self._cache_stats())
+        _self_times(self.spans)
+        return self
+
+    def summary(self):
+        """Segundos propios (sin contar spans hijos) por tipo, más bytes y caché."""
+        totals = {"total": self.seconds}
+        for kind in ("fetch", "compute", "chart"):
+            totals[kind] = sum(s["self_seconds"] for s in self.spans if s["kind"] == kind)
+        totals["bytes_datos"] = sum(s.get("bytes") or 0 for s in self.spans if s["kind"] == "fetch" and s.get("cache") == "miss")
+        totals["bytes_graficos"] = sum(s.get("bytes") or 0 for s in self.spans if s["kind"] == "chart")
+        return totals
+
+    def to_dict(self):
+        return {
+            "label": self.label,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "summary": self.summary(),
+            "cache": self.cache,
+            "spans": sorted(self.spans, key=lambda s: s["start"]),
+        }
+
+
+def _stats_delta(before, after):
+    # Estadísticas anidadas {"memory": {...}, "http": {...}} → sólo lo que cambió en la ejecución
+    if isinstance(after, dict):
+        return {k: _stats_delta((before or {}).get(k), v) for k, v in after.items()}
+    if isinstance(after, (int, float)) and isinstance(before, (int, float)):
+        return after - before
+    return after
+
+
+def _self_times(spans):
+    children = {}
+    for s in spans:
+        if s["kind"] != "section" and s.get("parent") is not None:
+            children[s["parent"]] = children.get(s["parent"], 0.0) + s["seconds"]
+    for s in spans:
+        s["self_seconds"] = max(s["seconds"] - children.get(s["id"], 0.0), 0.0)
+
+
+# --------------------------
+# API para el resto de módulos
+# --------------------------
+def start_run(label, enabled=True, cache_stats=None):
+    """Abre el registro de esta ejecución (None si la instrumentación está apagada)."""
+    trace = RunTrace(label, cache_stats) if enabled else None
+    _RUN.set(trace)
+    _PARENT.set(None)
+    return trace
+
+
+def finish_run():
+    trace = _RUN.get()
+    _RUN.set(None)
+    return trace.finish() if trace is not None else None
+
+
+def active():
+    return _RUN.get() is not None
+
+
+def section(name):
+    trace = _RUN.get()
+    if trace is not None:
+        trace.section(name)
+
+
+@contextmanager
+def span(kind, name, **fields):
+    """Mide el bloque; los campos que se agreguen al dict entregado se guardan con el span."""
+    trace = _RUN.get()
+    if trace is None:
+        yield fields
+        return
+    span_id = trace.new_id()
+    parent = _PARENT.get()
+    token = _PARENT.set(span_id)
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        seconds = time.perf_counter() - start
+        _PARENT.reset(token)
+        trace.add(id=span_id, parent=parent, kind=kind, name=name, start=start, seconds=seconds,
+                  thread=threading.current_thread().name, **fields)
+
+
+def timed(kind="compute", name=None):
+    """Decorador: registra cada llamada a la función como un span."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _RUN.get() is None:
+                return func(*args, **kwargs)
+            with span(kind, name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart medido: tiempo de armado / envío y tamaño del JSON de la figura."""
+    import streamlit as st
+
+    if _RUN.get() is None:
+        return st.plotly_chart(fig, **kwargs)
+    size = len(fig.to_json())
+    name = kwargs.get("key") or fig.layout.title.text or "figura"
+    with span("chart", name, bytes=size):
+        return st.plotly_chart(fig, **kwargs)
+
+
+# --------------------------
+# Exportación
+# --------------------------
+def runs_to_json(runs):
+    return json.dumps(runs, indent=2, default=str)
+
+
+def runs_to_csv(runs):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=SPAN_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for number, run in enumerate(runs, start=1):
+        for s in run["spans"]:
+            writer.writerow({**s, "run": number})
+    return buffer.getvalue()
@@ -0,0 +1,103 @@
+# ----------------------------------------------------------------------
+#   Métricas de valoración sin Streamlit
+#
+#   Drawdown, histórico del PER, EV/EBITDA y márgenes como funciones
+#   puras sobre Series / DataFrames: la app sólo las grafica y el
+#   benchmark (benchmarks/bench_valuation.py) las mide por separado.
+#   Los estados financieros se reciben traspuestos (filas = años), como
+#   los entrega data_layer.get_annual_statement.
+# ----------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+
+@timed()
+def drawdown(close):
+    """Caída (%) desde el máximo previo; acepta una Serie o una matriz fechas × tickers."""
+    return (close / close.cummax() - 1) * 100
+
+
+@timed()
+def per_history(eps, close):
+    """EPS, precio de cierre anual y PER por año (sólo años con ambos datos).
+
+    `eps` es la fila "Basic EPS" del estado de resultados (índice = fechas).
+    """
+    eps = eps.copy()
+    eps.index = pd.to_datetime(eps.index).year
+    eps = eps.sort_index()
+    price_yearly = close.resample("YE").last()
+    price_yearly.index = price_yearly.index.year
+    price_yearly = price_yearly.sort_index()
+    common_years = eps.index.intersection(price_yearly.index)
+    eps = eps.loc[common_years]
+    price_yearly = price_yearly.loc[common_years]
+    per = (price_yearly / eps).replace([np.inf, -np.inf], None).dropna()
+    return pd.DataFrame({"EPS": eps, "Precio": price_yearly, "PER": per})
+
+
+def debt_and_cash(balance):
+    """(deuda total, caja) por año; None si el balance no trae la fila."""
+    if "Total Debt" in balance.columns:
+        total_debt = balance["Total Debt"]
+    elif "Long Term Debt" in balance.columns:
+        total_debt = balance["Long Term Debt"]
+    else:
+        total_debt = None
+
+    if "Cash And Cash Equivalents" in balance.columns:
+        cash = balance["Cash And Cash Equivalents"]
+    elif "Cash" in balance.columns:
+        cash = balance["Cash"]
+    else:
+        cash = None
+    return total_debt, cash
+
+
+@timed()
+def ev_ebitda(income, balance, market_cap):
+    """(DataFrame EBITDA / EV / EV/EBITDA por año, EV/EBITDA del último año)."""
+    ebitda = income["EBITDA"] if "EBITDA" in income.columns else None
+    total_debt, cash = debt_and_cash(balance)
+    net_debt = total_debt - cash if total_debt is not None and cash is not None else None
+
+    current = None
+    if ebitda is not None and net_debt is not None and market_cap is not None:
+        last_year = balance.index.max()
+        try:
+            ev_current = market_cap + (total_debt.loc[last_year] - cash.loc[last_year])
+            last_ebitda = ebitda.loc[last_year]
+            current = ev_current / last_ebitda if last_ebitda != 0 else None
+        except Exception:
+            current = None
+
+    ev = market_cap + net_debt if market_cap is not None and net_debt is not None else None
+    table = pd.DataFrame()
+    if ebitda is not None:
+        table["EBITDA"] = ebitda
+    if ev is not None:
+        table["EV"] = ev
+    if ev is not None and ebitda is not None:
+        table["EV/EBITDA"] = ev / ebitda
+    return table, current
+
+
+MARGIN_ROWS = {
+    "Margen Bruto (%)": "Gross Profit",
+    "Margen Operativo (%)": "Operating Income",
+    "Margen Neto (%)": "Net Income",
+}
+
+
+@timed()
+def margins(income):
+    """{nombre del margen: Serie (%) por año} para las filas disponibles."""
+    if "Total Revenue" not in income.columns:
+        return {}
+    revenue = income["Total Revenue"]
+    return {
+        name: (income[row] / revenue * 100).round(1)
+        for name, row in MARGIN_ROWS.items() if row in income.columns
+    }
@@ -0,0 +1,46 @@
+# ----------------------------------------------------------------------
+#   Navegación entre pestañas
+#
+#   st.tabs ejecuta TODAS las pestañas en cada corrida del script aunque
+#   sólo una esté a la vista. Aquí la navegación es un selector
+#   horizontal y app.py dibuja sólo la pestaña elegida, importando sus
+#   módulos (plotly, fx, motores de cada pestaña…) la primera vez que se
+#   abre.
+#
+#   Streamlit borra el estado de los widgets que no se dibujan en una
+#   ejecución. Para que volver a una pestaña la deje como estaba, los
+#   valores de los widgets de las pestañas ocultas se vuelven a guardar
+#   en cada ejecución (nunca en la que dibuja el widget, así no chocan
+#   con sus valores por defecto ni con los botones).
+# ----------------------------------------------------------------------
+import streamlit as st
+
+from sections import DEBUG_KEY, LOAD_ALL_KEY
+
+TAB_KEY = "pestana"
+
+VALUATION = "Valoración y Análisis Financiero"
+PORTFOLIO = "Seguimiento de Cartera"
+ETF = "Analizar ETF's"
+FINANCE = "Finanzas Personales"
+COMPOUND = "Calculadora de Interés Compuesto"
+
+# Pestaña → prefijos de las claves de sus widgets
+WIDGET_PREFIXES = {
+    VALUATION: ("valoracion_", "seccion_", "screener_", "yield_deseado_", LOAD_ALL_KEY, DEBUG_KEY),
+    PORTFOLIO: ("ingresos_",),
+    ETF: ("etf_",),
+    FINANCE: ("fin_",),
+    COMPOUND: ("ic_",),
+}
+TABS = list(WIDGET_PREFIXES)
+
+
+def selected_tab():
+    """Dibuja el selector de pestañas y conserva el estado de las que quedan ocultas."""
+    tab = st.radio("Pestaña", TABS, horizontal=True, label_visibility="collapsed", key=TAB_KEY)
+    hidden = tuple(prefix for name, prefixes in WIDGET_PREFIXES.items() if name != tab for prefix in prefixes)
+    for key in list(st.session_state):
+        if str(key).startswith(hidden):
+            st.session_state[key] = st.session_state[key]
+    return tab
@@ -0,0 +1,218 @@
+# ----------------------------------------------------------------------
+#   Valor diario de la cartera y rentabilidad (TWR / MWR)
+#
+#   Con las operaciones de data/trades.csv, los cierres diarios del
+#   almacén de precios y los tipos de cambio de fx.py se arman tres
+#   matrices fechas × tickers (acciones en cartera, precio, tipo de
+#   cambio); el valor de la cartera es la suma por fila de su producto.
+#   Sobre esa serie y los flujos diarios (compras, ventas, dividendos):
+#     · TWR: rentabilidad encadenada día a día, sin el efecto del
+#       momento y tamaño de los aportes,
+#     · MWR: TIR de los flujos de caja (lo que ganó cada dólar aportado).
+# ----------------------------------------------------------------------
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+from fx import FX
+from instrumentation import timed
+
+YEAR_DAYS = 365.25
+
+
+# --------------------------
+# Matrices
+# --------------------------
+def _naive_dates(index):
+    index = pd.DatetimeIndex(index)
+    return (index.tz_localize(None) if index.tz is not None else index).normalize()
+
+
+def split_factors(splits, dates):
+    """Fechas × tickers: splits posteriores a cada fecha (acciones de entonces → acciones de hoy)."""
+    ratio = splits.where(splits > 0, 1.0).fillna(1.0)
+    # producto de los splits con fecha > d: cumprod invertido y desplazado un día
+    after = ratio.iloc[::-1].cumprod().iloc[::-1].shift(-1, fill_value=1.0)
+    return after.reindex(dates, method="bfill").fillna(1.0)
+
+
+def close_matrix(histories, dates):
+    """(cierres sin ajustar por dividendos, splits) como fechas × tickers."""
+    closes, splits = {}, {}
+    for ticker, history in histories.items():
+        if history is None or history.empty:
+            continue
+        index = _naive_dates(history.index)
+        closes[ticker] = pd.Series(history["Close"].to_numpy(), index=index)
+        if "Stock Splits" in history:
+            splits[ticker] = pd.Series(history["Stock Splits"].to_numpy(), index=index)
+    if not closes:
+        empty = pd.DataFrame(index=dates)
+        return empty, empty
+    closes = pd.DataFrame(closes).groupby(level=0).last()
+    splits = pd.DataFrame(splits, index=closes.index).groupby(level=0).max()
+    calendar = closes.index.union(dates)
+    prices = closes.reindex(calendar).ffill().reindex(dates)
+    return prices, split_factors(splits.reindex(calendar), dates)
+
+
+def holdings_matrix(trades, dates, factors):
+    """Fechas × tickers: acciones en cartera al cierre de cada día (en unidades de hoy)."""
+    side = np.where(trades["Compra/Venta"].astype(str).str.strip().str.lower().str.startswith("v"), -1.0, 1.0)
+    # Operaciones de fin de semana / feriado cuentan desde el día hábil siguiente
+    day = _snap(_naive_dates(trades["Fecha"]), dates)
+    quantity = pd.DataFrame({"Fecha": day, "Ticker": trades["Ticker"].to_numpy(),
+                             "cantidad": trades["Nº Acciones"].abs().to_numpy() * side}).dropna()
+    daily = quantity.groupby(["Fecha", "Ticker"])["cantidad"].sum().unstack("Ticker", fill_value=0.0)
+    shares = daily.reindex(dates, fill_value=0.0).cumsum()
+    adjusted = factors.reindex(columns=shares.columns).fillna(1.0)
+    # Cada compra queda en unidades de hoy con los splits posteriores a su fecha
+    increments = shares.diff().fillna(shares) * adjusted
+    return increments.cumsum().where(lambda s: s.abs() > 1e-9, 0.0)
+
+
+def trade_prices(trades, dates):
+    """Fechas × tickers: precio de la última operación a cada fecha."""
+    day = _snap(_naive_dates(trades["Fecha"]), dates)
+    operated = pd.DataFrame({"Fecha": day, "Ticker": trades["Ticker"].to_numpy(),
+                             "Precio": trades["Precio"].to_numpy(dtype=float)}).dropna()
+    last = operated.groupby(["Fecha", "Ticker"])["Precio"].last().unstack("Ticker")
+    return last.reindex(dates).ffill()
+
+
+def daily_flows(trades, incomes, dates):
+    """(aportes, retiros, dividendos) diarios en USD alineados con `dates`."""
+    usd = trades["Total USD"].abs().to_numpy(dtype=float)
+    sale = trades["Compra/Venta"].astype(str).str.strip().str.lower().str.startswith("v").to_numpy()
+    day = _snap(_naive_dates(trades["Fecha"]), dates)
+    flows = pd.DataFrame({"Fecha": day, "Aportes": np.where(sale, 0.0, usd), "Retiros": np.where(sale, usd, 0.0)})
+    flows = flows.dropna(subset=["Fecha"]).groupby("Fecha")[["Aportes", "Retiros"]].sum().reindex(dates, fill_value=0.0)
+    if incomes is not None and not incomes.empty:
+        income_day = _snap(_naive_dates(incomes["Fecha"]), dates)
+        dividends = pd.Series(incomes["Total USD"].to_numpy(dtype=float), index=income_day)
+        dividends = dividends[dividends.index.notna()].groupby(level=0).sum()
+        flows["Dividendos"] = dividends.reindex(dates, fill_value=0.0)
+    else:
+        flows["Dividendos"] = 0.0
+    return flows
+
+
+def _snap(days, dates):
+    # Cada fecha al día hábil de `dates` que le corresponde (NaT si cae después)
+    position = np.searchsorted(dates.to_numpy(), days.to_numpy())
+    snapped = np.full(len(days), np.datetime64("NaT"), dtype="datetime64[ns]")
+    inside = position < len(dates)
+    snapped[inside] = dates.to_numpy()[position[inside]]
+    return pd.DatetimeIndex(snapped)
+
+
+# --------------------------
+# Serie de valor
+# --------------------------
+@timed()
+def valuation_series(trades, incomes=None, end=None, histories=None):
+    """Serie diaria (días hábiles) con Valor de Mercado, flujos e Invertido Neto en USD."""
+    if trades.empty:
+        return pd.DataFrame()
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    # Días hábiles más el día de hoy (aunque caiga en fin de semana)
+    dates = pd.bdate_range(_naive_dates(trades["Fecha"]).min(), end).union(pd.DatetimeIndex([end]))
+    tickers = list(dict.fromkeys(trades["Ticker"]))
+    if histories is None:
+        histories = dl.get_daily_histories(tickers, adjusted=False)
+
+    prices, factors = close_matrix(histories, dates)
+    prices = prices.reindex(columns=tickers)
+    shares = holdings_matrix(trades, dates, factors).reindex(columns=tickers, fill_value=0.0)
+
+    currency = trades.groupby("Ticker")["Moneda"].last().reindex(tickers).astype(str).str.strip().str.upper()
+    rates = FX.rate_matrix(currency.unique(), dates)
+    fx_matrix = rates[currency.to_numpy()].to_numpy()
+
+    # Sin cierre (ticker sin historial o días antes del primero): último precio operado
+    held = shares.to_numpy() != 0
+    fallback = prices.isna().to_numpy() & held
+    prices = prices.fillna(trade_prices(trades, dates).reindex(columns=tickers))
+    values = np.where(held, shares.to_numpy() * prices.to_numpy() * fx_matrix, 0.0)
+
+    flows = daily_flows(trades, incomes, dates)
+    series = pd.DataFrame({"Valor de Mercado": np.nansum(values, axis=1)}, index=dates)
+    series = series.join(flows)
+    series["Invertido Neto"] = (series["Aportes"] - series["Retiros"]).cumsum()
+    series["Sin Precio"] = fallback.any(axis=1)
+    return series
+
+
+# --------------------------
+# Rentabilidad
+# --------------------------
+def daily_returns(series):
+    """Retorno diario con aportes al inicio del día y retiros / dividendos al cierre."""
+    value = series["Valor de Mercado"].to_numpy()
+    previous = np.concatenate([[0.0], value[:-1]])
+    start = previous + series["Aportes"].to_numpy()
+    end = value + series["Retiros"].to_numpy() + series["Dividendos"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(start > 0, end / start - 1, 0.0)
+    return pd.Series(returns, index=series.index, name="Retorno Diario")
+
+
+def twr(series):
+    """(TWR acumulado, TWR anualizado) en fracción."""
+    returns = daily_returns(series)
+    total = float(np.prod(1 + returns.to_numpy()) - 1)
+    years = (series.index[-1] - series.index[0]).days / YEAR_DAYS
+    annual = (1 + total) ** (1 / years) - 1 if years > 0 and total > -1 else np.nan
+    return total, annual
+
+
+def cumulative_twr(series):
+    """Índice de TWR acumulado (%) día a día."""
+    return (np.cumprod(1 + daily_returns(series).to_numpy()) - 1) * 100
+
+
+def xirr(amounts, dates, low=-0.9999, high=10.0, tol=1e-10, max_iter=200):
+    """TIR anual de flujos en fechas arbitrarias (aportes negativos, retiros positivos).
+
+    Bisección sobre el VPN, evaluado de una vez para todos los flujos;
+    NaN si el VPN no cambia de signo en [low, high].
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    years = (pd.DatetimeIndex(dates) - pd.DatetimeIndex(dates).min()).days.to_numpy() / YEAR_DAYS
+
+    def npv(rate):
+        return np.sum(amounts / (1 + rate) ** years)
+
+    f_low, f_high = npv(low), npv(high)
+    if np.sign(f_low) == np.sign(f_high):
+        return np.nan
+    for _ in range(max_iter):
+        mid = (low + high) / 2
+        f_mid = npv(mid)
+        if abs(f_mid) < tol or high - low < tol:
+            break
+        if np.sign(f_mid) == np.sign(f_low):
+            low, f_low = mid, f_mid
+        else:
+            high = mid
+    return mid
+
+
+def mwr(series):
+    """MWR (TIR anual de los flujos, con el valor final como último flujo)."""
+    flows = series["Retiros"] + series["Dividendos"] - series["Aportes"]
+    flows = flows[flows != 0]
+    amounts = np.append(flows.to_numpy(), series["Valor de Mercado"].iloc[-1])
+    dates = flows.index.append(pd.DatetimeIndex([series.index[-1]]))
+    return xirr(amounts, dates)
+
+
+def performance_summary(series):
+    total, annual = twr(series)
+    return {
+        "Valor de Mercado (USD)": float(series["Valor de Mercado"].iloc[-1]),
+        "Invertido Neto (USD)": float(series["Invertido Neto"].iloc[-1]),
+        "TWR (%)": total * 100,
+        "TWR Anualizado (%)": annual * 100,
+        "MWR / TIR (%)": mwr(series) * 100,
+    }
@@ -0,0 +1,306 @@
+# ----------------------------------------------------------------------
+#   Motor de la cartera (pestaña "Seguimiento de Cartera")
+#
+#   A partir del libro de operaciones data/trades.csv calcula, por ticker:
+#     · acciones en cartera y costo promedio (método de costo promedio
+#       ponderado: las ventas no cambian el costo por acción),
+#     · ganancia / pérdida realizada (ventas) y no realizada (precio actual).
+#   Todo el cálculo es por columnas con groupby sobre el DataFrame de
+#   operaciones, sin recorrerlas una a una. El libro se lee de forma
+#   incremental: sólo las líneas agregadas desde la última lectura se
+#   aplican sobre el estado guardado por ticker.
+# ----------------------------------------------------------------------
+import io
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TRADES_PATH = Path(__file__).parent.parent / "data" / "trades.csv"
+
+LEDGER_COLUMNS = ["Ticker", "Fecha", "Asset Allocation", "Moneda", "Compra/Venta",
+                  "Nº Acciones", "Precio", "Total tranzado", "Total USD"]
+
+# Estado por ticker tras la última operación aplicada
+STATE_COLUMNS = ["Nº Acciones", "Costo Total", "G/P Realizada", "Invertido", "Última Operación",
+                 "Asset Allocation", "Moneda", "USD por Unidad"]
+
+# Por debajo de esto una posición se considera cerrada (acciones fraccionarias)
+TOLERANCE = 1e-9
+
+
+# --------------------------
+# Lectura del libro
+# --------------------------
+def parse_trades(data):
+    """Tipos del libro: fechas, números y nombres de ticker normalizados."""
+    trades = data.reindex(columns=LEDGER_COLUMNS).copy()
+    trades["Ticker"] = trades["Ticker"].astype(str).str.strip().str.upper()
+    trades["Fecha"] = pd.to_datetime(trades["Fecha"], errors="coerce")
+    numeric = ["Nº Acciones", "Precio", "Total tranzado", "Total USD"]
+    trades[numeric] = trades[numeric].apply(pd.to_numeric, errors="coerce")
+    return trades.dropna(subset=["Fecha", "Nº Acciones"])
+
+
+def read_csv_tail(path, columns, offset=0):
+    """(filas de un CSV de sólo-agregar desde el byte `offset`, offset del final del archivo)."""
+    with open(path, "rb") as f:
+        if offset == 0:
+            return pd.read_csv(f), f.tell()
+        f.seek(offset)
+        tail = f.read()
+    if not tail.strip():
+        return pd.DataFrame(columns=columns), offset
+    return pd.read_csv(io.BytesIO(tail), header=None, names=columns), offset + len(tail)
+
+
+def read_trades(path=TRADES_PATH, offset=0):
+    """(operaciones desde el byte `offset`, offset del final del archivo)."""
+    data, offset = read_csv_tail(path, LEDGER_COLUMNS, offset)
+    return parse_trades(data), offset
+
+
+def append_trade(trade, path=TRADES_PATH):
+    """Agrega una operación (dict con LEDGER_COLUMNS) al final del libro."""
+    path = Path(path)
+    if path.exists() and path.stat().st_size:
+        with open(path, "rb") as f:
+            f.seek(-1, 2)
+            needs_newline = f.read(1) != b"\n"
+        if needs_newline:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+    row = pd.DataFrame([trade], columns=LEDGER_COLUMNS)
+    row.to_csv(path, mode="a", header=not path.exists() or not path.stat().st_size, index=False)
+
+
+# --------------------------
+# Cálculo
+# --------------------------
+def _empty_state():
+    state = pd.DataFrame(columns=STATE_COLUMNS).rename_axis("Ticker")
+    return state.astype({"Nº Acciones": float, "Costo Total": float, "G/P Realizada": float, "Invertido": float,
+                         "Última Operación": "datetime64[ns]", "USD por Unidad": float})
+
+
+def apply_trades(trades, state=None):
+    """Aplica `trades` sobre `state` (estado por ticker); devuelve (detalle, nuevo estado).
+
+    El costo de la posición sigue B_t = B_{t-1} · f_t + compra_t, con
+    f_t = acciones después / antes de una venta (1 en compras). Dentro de
+    cada racha abierta de un ticker, con L = Σ log f:
+        B_t = e^{L_t} · Σ_{s≤t} compra_s · e^{−L_s}
+    que son sumas acumuladas por grupo. Una venta que cierra la posición
+    reinicia la racha. Supone operaciones en orden de fecha por ticker y
+    sin ventas en corto.
+    """
+    state = _empty_state() if state is None else state
+    trades = trades.reset_index(drop=True)
+    if trades.empty:
+        return pd.DataFrame(), state
+
+    # El estado previo entra como una compra inicial por ticker
+    seeds = state[state["Nº Acciones"] > TOLERANCE]
+    seed_rows = pd.DataFrame({
+        "Ticker": seeds.index,
+        "Fecha": seeds["Última Operación"].to_numpy(),
+        "cantidad": seeds["Nº Acciones"].to_numpy(dtype=float),
+        "usd": seeds["Costo Total"].to_numpy(dtype=float),
+        "semilla": True,
+    })
+    is_sale = trades["Compra/Venta"].astype(str).str.strip().str.lower().str.startswith("v").to_numpy()
+    rows = pd.DataFrame({
+        "Ticker": trades["Ticker"],
+        "Fecha": trades["Fecha"],
+        "cantidad": trades["Nº Acciones"].abs().to_numpy() * np.where(is_sale, -1.0, 1.0),
+        "usd": trades["Total USD"].abs().to_numpy(dtype=float),
+        "semilla": False,
+    })
+    frame = pd.concat([seed_rows, rows], ignore_index=True) if not seed_rows.empty else rows
+    frame = frame.sort_values(["Ticker", "Fecha"], kind="stable").reset_index(drop=True)
+
+    quantity = frame["cantidad"].to_numpy()
+    sale = quantity < 0
+    by_ticker = frame.groupby("Ticker", sort=False)
+    shares_after = by_ticker["cantidad"].cumsum().to_numpy()
+    shares_before = shares_after - quantity
+
+    # Rachas: una nueva empieza cuando la posición estaba cerrada
+    opens = pd.Series(shares_before <= TOLERANCE, index=frame.index)
+    run = opens.groupby(frame["Ticker"], sort=False).cumsum()
+    closing = sale & (shares_after <= TOLERANCE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kept = np.where(sale & ~closing, np.clip(shares_after / shares_before, 0.0, 1.0), 1.0)
+    kept = np.where(kept > 0, kept, 1.0)
+    buys = np.where(sale, 0.0, frame["usd"].to_numpy())
+
+    keys = [frame["Ticker"], run]
+    log_kept = pd.Series(np.log(kept), index=frame.index).groupby(keys, sort=False).cumsum().to_numpy()
+    # e^{−L} sólo se desborda si las ventas parciales de una misma racha
+    # reducen la posición en un factor mayor a 1e300
+    scaled = pd.Series(buys * np.exp(-log_kept), index=frame.index).groupby(keys, sort=False).cumsum().to_numpy()
+    cost = np.where(closing, 0.0, np.exp(log_kept) * scaled)
+
+    cost_before = pd.Series(cost, index=frame.index).groupby(frame["Ticker"], sort=False).shift(1).fillna(0.0).to_numpy()
+    sold_fraction = np.where(closing, 1.0, 1.0 - kept)
+    realized = np.where(sale, frame["usd"].to_numpy() - cost_before * sold_fraction, 0.0)
+
+    detail = frame.assign(**{
+        "Acciones": shares_after,
+        "Costo Total": cost,
+        "Costo Promedio": np.where(shares_after > TOLERANCE, cost / np.where(shares_after > TOLERANCE, shares_after, 1.0), np.nan),
+        "G/P Realizada": realized,
+    })
+    detail = detail[~detail["semilla"]].drop(columns="semilla").reset_index(drop=True)
+
+    # Nuevo estado: última fila por ticker + acumulados
+    last = pd.DataFrame({"Ticker": frame["Ticker"], "Nº Acciones": shares_after, "Costo Total": cost,
+                         "Última Operación": frame["Fecha"]}).groupby("Ticker").last()
+    rate = (trades["Total USD"] / trades["Total tranzado"]).replace([np.inf, -np.inf], np.nan)
+    info = trades.assign(**{"USD por Unidad": rate}).groupby("Ticker")[["Asset Allocation", "Moneda", "USD por Unidad"]].last()
+    flows = pd.DataFrame({"Ticker": frame["Ticker"], "G/P Realizada": realized, "Invertido": buys,
+                          "semilla": frame["semilla"]})
+    flows = flows[~flows["semilla"]].groupby("Ticker")[["G/P Realizada", "Invertido"]].sum()
+
+    new_state = last.join(flows).join(info)
+    previous = state.reindex(new_state.index)
+    for column in ("G/P Realizada", "Invertido"):
+        new_state[column] = new_state[column].fillna(0.0) + previous[column].astype(float).fillna(0.0)
+    for column in ("Asset Allocation", "Moneda", "USD por Unidad"):
+        new_state[column] = new_state[column].where(new_state[column].notna(), previous[column])
+    untouched = state.drop(index=new_state.index, errors="ignore")
+    merged = pd.concat([untouched, new_state[STATE_COLUMNS]]) if not untouched.empty else new_state[STATE_COLUMNS]
+    return detail, merged.sort_index().rename_axis("Ticker")
+
+
+def positions(state, prices, usd_rates=None):
+    """Tabla de posiciones abiertas valorizadas con `prices` ({ticker: precio en su moneda}).
+
+    `usd_rates` ({ticker: USD por unidad de su moneda}, ver fx.FX.latest)
+    convierte el precio a USD; si falta, se usa el tipo de cambio
+    implícito de la última operación del ticker.
+    """
+    open_ = state[state["Nº Acciones"] > TOLERANCE].copy()
+    rates = pd.Series(usd_rates or {}, dtype=float).reindex(open_.index)
+    rates = rates.fillna(open_["USD por Unidad"].astype(float)).fillna(1.0)
+    price = pd.Series(prices, dtype=float).reindex(open_.index)
+    shares = open_["Nº Acciones"].astype(float)
+    cost = open_["Costo Total"].astype(float)
+    value = shares * price * rates
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = pd.DataFrame({
+            "Asset Allocation": open_["Asset Allocation"],
+            "Moneda": open_["Moneda"],
+            "Nº Acciones": shares,
+            "Costo Promedio (USD)": cost / shares,
+            "Costo Total (USD)": cost,
+            "Precio Actual": price,
+            "Valor de Mercado (USD)": value,
+            "G/P No Realizada (USD)": value - cost,
+            "G/P No Realizada (%)": (value / cost - 1) * 100,
+            "G/P Realizada (USD)": open_["G/P Realizada"].astype(float),
+            "Peso (%)": value / value.sum() * 100,
+        })
+    return table.sort_values("Valor de Mercado (USD)", ascending=False)
+
+
+def summary(state, table):
+    """Totales de la cartera: valor, costo, G/P no realizada y realizada (incluye posiciones cerradas)."""
+    value = table["Valor de Mercado (USD)"].sum()
+    cost = table["Costo Total (USD)"].sum()
+    return {
+        "Valor de Mercado (USD)": value,
+        "Costo Total (USD)": cost,
+        "G/P No Realizada (USD)": value - cost,
+        "G/P Realizada (USD)": state["G/P Realizada"].astype(float).sum(),
+    }
+
+
+# --------------------------
+# Libro con lectura incremental
+# --------------------------
+class CSVTail:
+    """Sigue un CSV de sólo-agregar: cada read() entrega sólo las filas nuevas.
+
+    Si el archivo se achicó o cambió su encabezado (se reescribió), read()
+    vuelve a entregar el archivo completo y lo indica con full=True.
+    """
+
+    def __init__(self, path, columns):
+        self.path = Path(path)
+        self.columns = columns
+        self.reset()
+
+    def reset(self):
+        self._offset = 0
+        self._header = None
+
+    def _read_header(self):
+        with open(self.path, "rb") as f:
+            return f.readline()
+
+    def read(self):
+        """(filas, full): full=True si `filas` es el archivo completo."""
+        header = self._read_header()
+        size = self.path.stat().st_size
+        if self._header is None or size < self._offset or header != self._header:
+            data, self._offset = read_csv_tail(self.path, self.columns)
+            self._header = header
+            return data, True
+        if size == self._offset:
+            return pd.DataFrame(columns=self.columns), False
+        data, self._offset = read_csv_tail(self.path, self.columns, self._offset)
+        return data, False
+
+
+class PortfolioLedger:
+    """Estado de la cartera que se pone al día sólo con las operaciones nuevas del libro."""
+
+    def __init__(self, path=TRADES_PATH):
+        self.path = Path(path)
+        self.stats = {"full": 0, "incremental": 0}
+        self._tail = CSVTail(self.path, LEDGER_COLUMNS)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.state = _empty_state()
+        self.trades = parse_trades(pd.DataFrame(columns=LEDGER_COLUMNS))
+        self._tail.reset()
+
+    def _rebuild(self, trades):
+        self.trades = trades
+        _, self.state = apply_trades(trades)
+        self.stats["full"] += 1
+
+    def refresh(self):
+        """Aplica las operaciones agregadas desde la última vez; relee todo si el archivo se reescribió."""
+        with self._lock:
+            if not self.path.exists():
+                self._reset()
+                return self.state
+            data, full = self._tail.read()
+            new = parse_trades(data)
+            if full:
+                self._rebuild(new)
+            elif not new.empty:
+                # Una operación con fecha anterior a la última aplicada cambia el
+                # costo promedio de lo que ya se vendió → se recalcula todo
+                last = self.state["Última Operación"].reindex(new["Ticker"]).to_numpy()
+                if (pd.notna(last) & (new["Fecha"].to_numpy() < last)).any():
+                    self._rebuild(pd.concat([self.trades, new], ignore_index=True))
+                else:
+                    _, self.state = apply_trades(new, self.state)
+                    self.trades = pd.concat([self.trades, new], ignore_index=True)
+                    self.stats["incremental"] += 1
+            return self.state
+
+    def append(self, trade):
+        append_trade(trade, self.path)
+
+    def open_tickers(self):
+        return self.state.index[self.state["Nº Acciones"] > TOLERANCE].tolist()
+
+
+LEDGER = PortfolioLedger()
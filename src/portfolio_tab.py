@@ -0,0 +1,188 @@
+# ----------------------------------------------------------------------
+#   Pestaña "Seguimiento de Cartera"
+#
+#   Posiciones, costo promedio y ganancias realizadas / no realizadas a
+#   partir de data/trades.csv (motor en portfolio.py). Los precios de
+#   todas las posiciones abiertas salen de una sola descarga en bloque y
+#   se pasan a USD con el almacén de tipos de cambio (fx.py). Debajo,
+#   la evolución diaria del valor con su TWR / MWR (performance.py) y
+#   los dividendos cobrados (data/incomes.csv, motor en income.py).
+# ----------------------------------------------------------------------
+import datetime
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import data_layer as dl
+import income
+import instrumentation
+import performance
+import portfolio
+from fx import FX
+
+
+def _usd(value):
+    return f"-${abs(value):,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+def _pct(value):
+    return "—" if pd.isna(value) else f"{value:.2f}%"
+
+
+def _trade_form():
+    with st.expander("➕ Registrar operación"):
+        with st.form("cartera_nueva_operacion", clear_on_submit=True):
+            cols = st.columns(4)
+            ticker = cols[0].text_input("Ticker")
+            fecha = cols[1].date_input("Fecha", value=datetime.date.today())
+            lado = cols[2].selectbox("Compra/Venta", ["Compra", "Venta"])
+            moneda = cols[3].text_input("Moneda", value="USD")
+            cols = st.columns(4)
+            asset_allocation = cols[0].text_input("Asset Allocation", value="Renta Variable Internacional")
+            acciones = cols[1].number_input("Nº Acciones", min_value=0.0, value=0.0, step=1.0, format="%.6f")
+            precio = cols[2].number_input("Precio", min_value=0.0, value=0.0, step=0.01)
+            if st.form_submit_button("Guardar"):
+                if not ticker.strip() or acciones <= 0 or precio <= 0:
+                    st.warning("Completa ticker, número de acciones y precio.")
+                    return
+                moneda = moneda.strip().upper()
+                usd_por_unidad = FX.rates_at([moneda], [fecha])[0]
+                if pd.isna(usd_por_unidad):
+                    st.warning(f"No hay tipo de cambio para {moneda}.")
+                    return
+                signo = -1 if lado == "Venta" else 1
+                total = signo * acciones * precio
+                portfolio.LEDGER.append({
+                    "Ticker": dl.normalize_ticker(ticker),
+                    "Fecha": fecha.isoformat(),
+                    "Asset Allocation": asset_allocation,
+                    "Moneda": moneda,
+                    "Compra/Venta": lado,
+                    "Nº Acciones": signo * acciones,
+                    "Precio": precio,
+                    "Total tranzado": total,
+                    "Total USD": total * usd_por_unidad,
+                })
+                st.success("Operación registrada.")
+
+
+def render():
+    st.markdown("## 💼 Seguimiento de Cartera")
+    _trade_form()
+    _positions_section()
+    _performance_section()
+    _income_section()
+
+
+def _positions_section():
+    if not portfolio.LEDGER.path.exists():
+        st.info(f"No se encontró el libro de operaciones ({portfolio.LEDGER.path}).")
+        return
+    state = portfolio.LEDGER.refresh()
+    tickers = portfolio.LEDGER.open_tickers()
+    prices = dl.get_last_prices(tickers) if tickers else {}
+    # Precio local → USD con la última tasa de cada moneda
+    currencies = state.loc[tickers, "Moneda"]
+    latest = FX.latest(currencies)
+    table = portfolio.positions(state, prices, {t: latest[str(c).strip().upper()] for t, c in currencies.items()})
+    totals = portfolio.summary(state, table)
+
+    cols = st.columns(4)
+    cols[0].metric("💰 Valor de Mercado", _usd(totals["Valor de Mercado (USD)"]))
+    cols[1].metric("🧾 Costo Total", _usd(totals["Costo Total (USD)"]))
+    cols[2].metric("📈 G/P No Realizada", _usd(totals["G/P No Realizada (USD)"]))
+    cols[3].metric("✅ G/P Realizada", _usd(totals["G/P Realizada (USD)"]))
+
+    missing = [t for t in tickers if prices.get(t) is None]
+    if missing:
+        st.warning(f"Sin precio actual para: {', '.join(missing)}")
+
+    if table.empty:
+        st.info("No hay posiciones abiertas.")
+    else:
+        dollars = st.column_config.NumberColumn(format="$%.2f")
+        percent = st.column_config.NumberColumn(format="%.2f%%")
+        st.markdown("### 📋 Posiciones Abiertas")
+        st.dataframe(
+            table,
+            column_config={
+                **{col: dollars for col in ["Costo Promedio (USD)", "Costo Total (USD)", "Precio Actual",
+                                            "Valor de Mercado (USD)", "G/P No Realizada (USD)", "G/P Realizada (USD)"]},
+                **{col: percent for col in ["G/P No Realizada (%)", "Peso (%)"]},
+                "Nº Acciones": st.column_config.NumberColumn(format="%.4f"),
+            },
+        )
+        weights = table.groupby("Asset Allocation")["Valor de Mercado (USD)"].sum().reset_index()
+        fig = px.pie(weights, names="Asset Allocation", values="Valor de Mercado (USD)",
+                     title="Distribución por Asset Allocation", hole=0.4)
+        instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_cartera_asignacion")
+
+    closed = state[state["Nº Acciones"] <= portfolio.TOLERANCE]
+    if not closed.empty:
+        st.markdown("### 📦 Posiciones Cerradas")
+        st.dataframe(
+            closed[["Asset Allocation", "Moneda", "Invertido", "G/P Realizada", "Última Operación"]],
+            column_config={
+                "Invertido": st.column_config.NumberColumn(format="$%.2f"),
+                "G/P Realizada": st.column_config.NumberColumn(format="$%.2f"),
+                "Última Operación": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            },
+        )
+
+
+def _performance_section():
+    trades = portfolio.LEDGER.trades
+    if trades.empty:
+        return
+    st.markdown("## 📈 Rentabilidad de la Cartera")
+    incomes = None
+    if income.LEDGER.path.exists():
+        income.LEDGER.refresh()
+        incomes = income.LEDGER.incomes
+    series = performance.valuation_series(trades, incomes)
+    resumen = performance.performance_summary(series)
+
+    cols = st.columns(3)
+    cols[0].metric("⏱️ TWR Acumulado", _pct(resumen["TWR (%)"]))
+    cols[1].metric("📆 TWR Anualizado", _pct(resumen["TWR Anualizado (%)"]))
+    cols[2].metric("💸 TIR (MWR)", _pct(resumen["MWR / TIR (%)"]))
+    if series["Sin Precio"].any():
+        st.caption("Algunos días se valoran con el precio de la última operación (sin cierre disponible).")
+
+    chart = series[["Valor de Mercado", "Invertido Neto"]].assign(**{"TWR (%)": performance.cumulative_twr(series)})
+    fig = px.line(chart, x=chart.index, y=["Valor de Mercado", "Invertido Neto"],
+                  title="Valor de Mercado vs. Invertido Neto (USD)", labels={"x": "Fecha", "value": "USD", "variable": ""})
+    fig.update_layout(height=400)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_cartera_valor")
+    fig = px.line(chart, x=chart.index, y="TWR (%)", title="TWR Acumulado (%)", labels={"x": "Fecha"})
+    fig.update_layout(height=300)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_cartera_twr")
+
+
+def _income_section():
+    st.markdown("## 💵 Ingresos por Dividendos")
+    if not income.LEDGER.path.exists():
+        st.info(f"No se encontró el registro de dividendos ({income.LEDGER.path}).")
+        return
+    totals = income.LEDGER.refresh()
+    if totals.empty:
+        st.info("Aún no hay dividendos registrados.")
+        return
+
+    resumen = income.summary(totals)
+    cols = st.columns(3)
+    cols[0].metric("💰 Total Cobrado", _usd(resumen["Total (USD)"]))
+    cols[1].metric("📆 Últimos 12 Meses", _usd(resumen["Últimos 12 meses (USD)"]))
+    cols[2].metric("🗓️ Año en Curso", _usd(resumen["Año en curso (USD)"]))
+
+    by = st.radio("Agrupar por", ["Ticker", "Moneda"], horizontal=True, key="ingresos_agrupar")
+    monthly = income.monthly_pivot(totals, by=by)
+    fig = px.bar(monthly, x=monthly.index, y=list(monthly.columns), title="Dividendos Mensuales (USD)",
+                 labels={"x": "Mes", "value": "USD", "variable": by})
+    fig.update_layout(barmode="stack", height=400)
+    instrumentation.plotly_chart(fig, use_container_width=True, key="plotly_chart_ingresos_mensuales")
+
+    annual = income.annual_pivot(totals, by=by)
+    st.markdown("### 📊 Dividendos por Año (USD)")
+    st.dataframe(annual, column_config={col: st.column_config.NumberColumn(format="$%.2f") for col in annual.columns})
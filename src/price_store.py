@@ -0,0 +1,185 @@
+# ----------------------------------------------------------------------
+#   Almacén local de precios diarios (Parquet, un archivo por ticker)
+#
+#   Se guarda el histórico diario COMPLETO sin ajustar por dividendos
+#   (Close ya viene ajustado por splits desde Yahoo) junto con las
+#   columnas Dividends y Stock Splits. En cada lectura sólo se piden a
+#   Yahoo las barras desde la última fecha guardada:
+#     · si el delta trae un split, el histórico guardado queda en otra
+#       unidad de acciones → se vuelve a descargar entero;
+#     · el ajuste por dividendos se calcula aquí (factor acumulado), así
+#       un dividendo nuevo no obliga a re-descargar nada.
+#   Los archivos se leen con memory_map, así una carga en caliente es
+#   prácticamente a velocidad de disco.
+# ----------------------------------------------------------------------
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PRICES_DIR = Path(__file__).parent.parent / "data" / "prices"
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# Antigüedad máxima del archivo antes de pedir el delta a Yahoo
+MAX_AGE = 15 * 60
+
+
+def dividend_adjusted(raw):
+    """OHLC ajustados por dividendos como los entrega Yahoo con auto_adjust=True.
+
+    Cada dividendo multiplica los precios anteriores a su fecha ex por
+    (1 − dividendo / cierre del día previo).
+    """
+    close = raw["Close"].to_numpy(dtype=float)
+    dividends = raw["Dividends"].to_numpy(dtype=float)
+    previous_close = np.roll(close, 1)
+    previous_close[0] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        multiplier = np.where(dividends > 0, 1 - dividends / previous_close, 1.0)
+    multiplier = np.nan_to_num(multiplier, nan=1.0)
+    # factor[t] = producto de los multiplicadores de las fechas posteriores a t
+    factor = np.append(np.cumprod(multiplier[::-1])[::-1][1:], 1.0)
+
+    adjusted = raw.copy()
+    adjusted[PRICE_COLUMNS] = raw[PRICE_COLUMNS].to_numpy(dtype=float) * factor[:, None]
+    return adjusted
+
+
+def _conform(data, tz):
+    """Columnas de COLUMNS e índice en la zona horaria `tz` (o sin zona)."""
+    # Descarga fallida: yf.download entrega un marco vacío sin índice de fechas
+    if data is None or not isinstance(data.index, pd.DatetimeIndex):
+        return pd.DataFrame(columns=COLUMNS, dtype=float)
+    data = data.reindex(columns=COLUMNS).fillna({"Dividends": 0.0, "Stock Splits": 0.0})
+    data = data.dropna(subset=["Close"])
+    if data.index.tz is None and tz is not None:
+        data.index = data.index.tz_localize(tz)
+    elif data.index.tz is not None and tz is None:
+        data.index = data.index.tz_localize(None)
+    return data
+
+
+class PriceStore:
+    """Históricos diarios por ticker con actualización incremental."""
+
+    def __init__(self, ticker_factory, root=PRICES_DIR, max_age=MAX_AGE):
+        self.root = Path(root)
+        self.max_age = max_age
+        self._ticker_factory = ticker_factory   # ticker -> yf.Ticker
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.stats = {"full": 0, "delta": 0, "fresh": 0}
+
+    def path(self, ticker):
+        return self.root / f"{ticker.replace('/', '_')}.parquet"
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    # --------------------------
+    # Disco
+    # --------------------------
+    def load(self, ticker):
+        path = self.path(ticker)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path, memory_map=True)
+
+    def _save(self, ticker, raw):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(ticker)
+        tmp = path.with_suffix(".tmp")
+        raw.to_parquet(tmp)
+        os.replace(tmp, path)       # escritura atómica
+
+    def is_fresh(self, ticker):
+        path = self.path(ticker)
+        return path.exists() and time.time() - path.stat().st_mtime < self.max_age
+
+    # --------------------------
+    # Red
+    # --------------------------
+    def _download(self, ticker, **kwargs):
+        data = self._ticker_factory(ticker).history(interval="1d", auto_adjust=False, actions=True, **kwargs)
+        return data.reindex(columns=COLUMNS).fillna({"Dividends": 0.0, "Stock Splits": 0.0})
+
+    def update(self, ticker):
+        """Histórico crudo del ticker, trayendo de Yahoo sólo lo que falta."""
+        with self._ticker_lock(ticker):
+            stored = self.load(ticker)
+            if stored is not None and not stored.empty and self.is_fresh(ticker):
+                self.stats["fresh"] += 1
+                return stored
+
+            if stored is None or stored.empty:
+                raw = self._download(ticker, period="max")
+                self.stats["full"] += 1
+            else:
+                # Se repite la última barra guardada: pudo quedar a medio día
+                delta = self._download(ticker, start=stored.index[-1].strftime("%Y-%m-%d"))
+                raw = self._merge(ticker, stored, _conform(delta, stored.index.tz))
+
+            if raw.empty:
+                return raw
+            self._save(ticker, raw)
+            return raw
+
+    def update_many(self, tickers, batch_download):
+        """update() para muchos tickers con descargas en bloque.
+
+        `batch_download(tickers, **kwargs)` devuelve {ticker: DataFrame}; se
+        llama una vez para los tickers sin archivo (period="max") y otra para
+        los desactualizados (desde la última fecha guardada más antigua).
+        """
+        result, stale = {}, {}
+        for ticker in tickers:
+            stored = self.load(ticker)
+            if stored is not None and not stored.empty and self.is_fresh(ticker):
+                self.stats["fresh"] += 1
+                result[ticker] = stored
+            else:
+                stale[ticker] = stored
+
+        missing = [t for t, stored in stale.items() if stored is None or stored.empty]
+        outdated = [t for t in stale if t not in missing]
+        downloads = {}
+        if missing:
+            downloads.update(batch_download(missing, period="max"))
+        if outdated:
+            start = min(stale[t].index[-1].strftime("%Y-%m-%d") for t in outdated)
+            downloads.update(batch_download(outdated, start=start))
+
+        for ticker, stored in stale.items():
+            raw = _conform(downloads.get(ticker), None if stored is None else stored.index.tz)
+            if ticker in outdated:
+                raw = self._merge(ticker, stored, raw)
+            else:
+                self.stats["full"] += 1
+            if not raw.empty:
+                self._save(ticker, raw)
+            result[ticker] = raw
+        return result
+
+    def _merge(self, ticker, stored, delta):
+        known_splits = stored["Stock Splits"].reindex(delta.index).fillna(0)
+        if ((delta["Stock Splits"] > 0) & (known_splits == 0)).any():
+            # Split nuevo: todo lo guardado quedó en otra unidad de acciones
+            self.stats["full"] += 1
+            return self._download(ticker, period="max")
+        raw = pd.concat([stored, delta])
+        self.stats["delta"] += 1
+        return raw[~raw.index.duplicated(keep="last")].sort_index()
+
+    def history(self, ticker, adjusted=True):
+        """Histórico diario completo, por defecto ajustado como auto_adjust=True."""
+        raw = self.update(ticker)
+        if raw.empty or not adjusted:
+            return raw
+        return dividend_adjusted(raw)
+
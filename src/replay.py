@@ -0,0 +1,277 @@
+# ----------------------------------------------------------------------
+#   Grabación / reproducción de respuestas de Yahoo (modo offline)
+#
+#   Con la variable de entorno YF_REPLAY:
+#     · record → la sesión de yfinance funciona normal y además guarda
+#                cada respuesta cruda (status, cabeceras, cookies, cuerpo)
+#                en un almacén de fixtures en disco;
+#     · replay → no se toca la red: cada GET se sirve desde los fixtures
+#                y lo que no esté grabado responde 404.
+#   Como todo lo que hace yf.Ticker (history, info, balance, download…)
+#   pasa por la sesión, los accesores funcionan igual sin Yahoo.
+#
+#   `python src/replay.py serve` levanta un stand-in HTTP local con los
+#   mismos fixtures; con YF_REPLAY_URL=http://127.0.0.1:8765 la app le
+#   pide los datos por HTTP en vez de leerlos del disco directamente.
+# ----------------------------------------------------------------------
+import argparse
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from http_cache import CachedSession
+
+FIXTURES_DIR = Path(os.environ.get("YF_FIXTURES_DIR", Path(__file__).parent.parent / "data" / "fixtures"))
+DEFAULT_PORT = 8765
+
+ReplayCookie = namedtuple("ReplayCookie", "name value")
+
+
+def mode():
+    """'record', 'replay' u 'off' según YF_REPLAY."""
+    value = os.environ.get("YF_REPLAY", "off").strip().lower()
+    return value if value in ("record", "replay") else "off"
+
+
+def fixture_key(url, params):
+    # Misma clave que la caché HTTP: sin crumb ni period2, period="max" como "max"
+    return CachedSession.cache_key(url, params)
+
+
+class ReplayResponse:
+    """Respuesta reconstruida desde un fixture, con la interfaz que usa yfinance."""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content, cookies=()):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.cookies = [ReplayCookie(name, value) for name, value in cookies]
+        self.reason = "OK" if status_code < 400 else "Not recorded"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} (replay) para {self.url}")
+
+
+class FixtureStore:
+    """Un archivo JSON por petición, nombrado por el hash de su clave."""
+
+    def __init__(self, root=FIXTURES_DIR):
+        self.root = Path(root) / "yahoo"
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def get(self, key):
+        path = self.path(key)
+        if not path.exists():
+            return None
+        record = json.loads(path.read_text(encoding="utf-8"))
+        record["body"] = base64.b64decode(record["body"])
+        return record
+
+    def put(self, key, url, status, headers, cookies, body):
+        record = {
+            "key": key, "url": url, "status": status, "headers": headers,
+            "cookies": cookies, "body": base64.b64encode(body).decode("ascii"),
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(record), encoding="utf-8")
+            os.replace(tmp, path)
+
+    def keys(self):
+        for path in sorted(self.root.glob("*.json")):
+            yield json.loads(path.read_text(encoding="utf-8"))["key"]
+
+    def response(self, key, url):
+        record = self.get(key)
+        if record is None:
+            return None
+        return ReplayResponse(url, record["status"], record["headers"], record["body"], record["cookies"])
+
+
+def _cookie_pairs(cookies):
+    # curl_cffi itera nombres; requests itera objetos Cookie
+    pairs = []
+    for cookie in cookies or ():
+        if hasattr(cookie, "name"):
+            pairs.append((cookie.name, cookie.value))
+        else:
+            pairs.append((cookie, cookies.get(cookie)))
+    return pairs
+
+
+class RecordingSession:
+    """Envuelve la sesión de yfinance y guarda cada respuesta que recibe."""
+
+    def __init__(self, session, store=None):
+        self._session = session
+        self._store = store or FixtureStore()
+        self.recorded = 0
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def get(self, url, params=None, **kwargs):
+        response = self._session.get(url, params=params, **kwargs)
+        headers = CachedSession._clean_headers(response.headers)
+        cookies = _cookie_pairs(getattr(response, "cookies", None))
+        self._store.put(fixture_key(url, params), url, response.status_code, headers, cookies, response.content)
+        self.recorded += 1
+        return response
+
+
+class ReplaySession:
+    """Sesión sin red: sirve los fixtures grabados con RecordingSession."""
+
+    def __init__(self, store=None):
+        self._store = store or FixtureStore()
+        self._lock = threading.Lock()
+        self.cookies = {}
+        self.headers = {}
+        self.stats = {"hits": 0, "missing": 0}
+        self.missing = []           # claves pedidas que no estaban grabadas
+
+    def _count(self, name, key=None):
+        with self._lock:
+            self.stats[name] += 1
+            if key is not None:
+                self.missing.append(key)
+
+    def get(self, url, params=None, **kwargs):
+        key = fixture_key(url, params)
+        response = self._store.response(key, url)
+        if response is None:
+            self._count("missing", key)
+            return ReplayResponse(url, 404, {}, b"")
+        self._count("hits")
+        return response
+
+    def post(self, url, **kwargs):
+        return ReplayResponse(url, 404, {}, b"")
+
+    def clear(self):
+        pass
+
+
+class StandInSession(ReplaySession):
+    """Como ReplaySession, pero pidiendo los fixtures al stand-in HTTP local."""
+
+    def __init__(self, base_url, session=None):
+        super().__init__()
+        self._base_url = base_url.rstrip("/")
+        if session is None:
+            from curl_cffi import requests as curl_requests
+            session = curl_requests.Session()
+        self._http = session
+
+    def get(self, url, params=None, **kwargs):
+        parts = urlsplit(url)
+        local_url = f"{self._base_url}/{parts.netloc}{parts.path or '/'}"
+        query = dict(parse_qsl(parts.query))
+        # Mismo texto que en la clave del fixture (curl escribiría False como "false")
+        query.update({k: str(v) for k, v in (params or {}).items()})
+        response = self._http.get(local_url, params=query, timeout=kwargs.get("timeout", 30))
+        recorded = "X-Replay-Cookies" in response.headers
+        cookies = json.loads(response.headers["X-Replay-Cookies"]) if recorded else []
+        headers = CachedSession._clean_headers(response.headers)
+        if recorded:
+            self._count("hits")
+        else:
+            self._count("missing", fixture_key(url, params))
+        return ReplayResponse(url, response.status_code, headers, response.content, cookies)
+
+
+def replay_session():
+    """Sesión de reproducción: en proceso o contra el stand-in si hay YF_REPLAY_URL."""
+    base_url = os.environ.get("YF_REPLAY_URL")
+    return StandInSession(base_url) if base_url else ReplaySession()
+
+
+def price_store_options():
+    """Argumentos de PriceStore para que grabación y reproducción no usen data/prices."""
+    current = mode()
+    if current == "off":
+        return {}
+    options = {"root": FIXTURES_DIR / "prices"}
+    if current == "replay":
+        options["max_age"] = float("inf")      # nunca pedir deltas sin red
+    return options
+
+
+# --------------------------
+# Stand-in HTTP local
+# --------------------------
+class _StandInHandler(BaseHTTPRequestHandler):
+    store = None
+
+    def do_GET(self):
+        # /<host>/<ruta>?<query> → https://<host>/<ruta>
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        url = f"https://{host}/{unquote(path)}" if path else f"https://{host}"
+        key = fixture_key(url, dict(parse_qsl(parts.query)))
+        record = self.store.get(key)
+        if record is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(record["status"])
+        for name, value in record["headers"].items():
+            if name.lower() not in ("connection", "date", "server"):
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(record["body"])))
+        self.send_header("X-Replay-Cookies", json.dumps(record["cookies"]))
+        self.end_headers()
+        self.wfile.write(record["body"])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=DEFAULT_PORT, root=FIXTURES_DIR):
+    handler = type("StandInHandler", (_StandInHandler,), {"store": FixtureStore(root)})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fixtures de Yahoo Finance para trabajar sin red")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = sub.add_parser("serve", help="Stand-in HTTP local con los fixtures grabados")
+    serve_cmd.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_cmd.add_argument("--fixtures", default=str(FIXTURES_DIR))
+    list_cmd = sub.add_parser("list", help="Peticiones grabadas")
+    list_cmd.add_argument("--fixtures", default=str(FIXTURES_DIR))
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = serve(args.port, args.fixtures)
+        print(f"Sirviendo fixtures de {args.fixtures} en http://127.0.0.1:{args.port}")
+        server.serve_forever()
+    else:
+        for key in FixtureStore(args.fixtures).keys():
+            print(key)
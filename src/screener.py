@@ -0,0 +1,64 @@
+# ----------------------------------------------------------------------
+#   Screener de dividendos (cientos de tickers)
+#
+#   La tabla "👨‍💻 Datos Relevantes" de la vista individual, calculada
+#   para una lista completa de tickers con el motor de valuation.py:
+#     · precios e historial de dividendos en bloque (yf.download por
+#       tandas, sobre el almacén Parquet),
+#     · info y balance con el pool acotado de la capa de datos,
+#     · todas las métricas como operaciones de columnas sobre UN
+#       DataFrame (tickers × métricas), sin bucles por ticker.
+#   Si la pasada nocturna de warmup.py dejó la tabla del período y tiene
+#   menos de un día, sus filas se usan tal cual y sólo se calculan los
+#   tickers que no estén en ella.
+# ----------------------------------------------------------------------
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import data_layer as dl
+import valuation
+
+SNAPSHOT_DIR = Path(__file__).parent.parent / "data" / "warmup"
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+
+def parse_tickers(text):
+    """Tickers únicos de un texto separado por comas, espacios o saltos de línea."""
+    tickers = (dl.normalize_ticker(t) for t in re.split(r"[\s,;]+", text or ""))
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def snapshot_path(period, root=SNAPSHOT_DIR):
+    return Path(root) / f"valuaciones_{period}.parquet"
+
+
+def read_snapshot(period, root=SNAPSHOT_DIR, max_age=SNAPSHOT_MAX_AGE):
+    """Tabla de valoración precalculada por warmup.py, o None si no existe o está vencida."""
+    path = snapshot_path(period, root)
+    try:
+        if time.time() - path.stat().st_mtime > max_age:
+            return None
+        return pd.read_parquet(path).rename_axis(None)
+    except (OSError, ValueError):
+        return None
+
+
+@dl.memoize(dl.TTL_QUOTE, kind="compute")
+def _screen(tickers, period):
+    snapshot = read_snapshot(period)
+    known = [] if snapshot is None else [t for t in tickers if t in snapshot.index]
+    missing = [t for t in tickers if t not in known]
+    parts = [snapshot.loc[known]] if known else []
+    if missing or not known:
+        parts.append(valuation.value_universe(missing, period))
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts).reindex(list(tickers))
+
+
+def screen(tickers, period="10y"):
+    """Datos Relevantes y bandas GW de `tickers` (una fila por ticker), memoizados por lista y período."""
+    return _screen(tuple(dict.fromkeys(dl.normalize_ticker(t) for t in tickers)), period)
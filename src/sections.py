@@ -0,0 +1,85 @@
+# ----------------------------------------------------------------------
+#   Secciones perezosas de la pestaña de valoración
+#
+#   Cada expander (dividendos, múltiplos, balance, resultados, flujo de
+#   caja) sólo descarga, transforma y dibuja cuando el usuario lo pide
+#   con su interruptor, o cuando está activo "Calcular todas las
+#   secciones". Los datos quedan memoizados por ticker en data_layer,
+#   así que volver a abrir una sección ya calculada no toca la red.
+# ----------------------------------------------------------------------
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+
+LOAD_ALL_KEY = "cargar_todas_las_secciones"
+
+# Panel de depuración: interruptor y registros de la sesión (últimas MAX_RUNS ejecuciones)
+DEBUG_KEY = "panel_depuracion"
+RUNS_KEY = "registros_depuracion"
+MAX_RUNS = 50
+
+
+def load_all_toggle():
+    return st.toggle("⚡ Calcular todas las secciones al cargar", key=LOAD_ALL_KEY)
+
+
+def lazy_section(key, label="📂 Calcular esta sección"):
+    """True si la sección debe calcularse en esta ejecución."""
+    instrumentation.section(key)
+    if st.session_state.get(LOAD_ALL_KEY, False):
+        return True
+    return st.toggle(label, key=f"seccion_{key}")
+
+
+def any_section_requested():
+    """¿Alguna sección perezosa se va a calcular en esta ejecución?"""
+    return any(
+        value for key, value in st.session_state.items()
+        if key == LOAD_ALL_KEY or str(key).startswith("seccion_")
+    )
+
+
+def debug_enabled():
+    return st.session_state.get(DEBUG_KEY, False)
+
+
+def debug_panel(trace):
+    """Interruptor del panel y, si hay registro, tiempos y caché de esta ejecución."""
+    with st.expander("🛠️ Depuración: tiempos y caché"):
+        st.toggle("Registrar tiempos de esta sesión", key=DEBUG_KEY)
+        if trace is None:
+            return
+        runs = st.session_state.setdefault(RUNS_KEY, [])
+        runs.append(trace.to_dict())
+        del runs[:-MAX_RUNS]
+
+        summary = trace.summary()
+        cols = st.columns(5)
+        cols[0].metric("⏱️ Total", f"{summary['total']:.2f} s")
+        cols[1].metric("🌐 Descargas", f"{summary['fetch']:.2f} s")
+        cols[2].metric("🧮 Cálculos", f"{summary['compute']:.2f} s")
+        cols[3].metric("📊 Gráficos", f"{summary['chart']:.2f} s")
+        cols[4].metric("📦 JSON de gráficos", f"{summary['bytes_graficos'] / 1024:.0f} KB")
+
+        spans = pd.DataFrame(trace.to_dict()["spans"])
+        if spans.empty:
+            return
+        sections = spans[spans["kind"] == "section"]
+        st.markdown("**Secciones**")
+        st.dataframe(sections[["name", "seconds"]].set_index("name"))
+
+        st.markdown("**Caché en esta ejecución**")
+        st.dataframe(pd.DataFrame(trace.cache).fillna(0))
+
+        st.markdown("**Spans** (self = sin contar llamadas anidadas)")
+        detail = spans[spans["kind"] != "section"]
+        columns = [c for c in ["kind", "name", "detail", "cache", "seconds", "self_seconds", "bytes", "thread"] if c in detail.columns]
+        st.dataframe(detail[columns].sort_values("seconds", ascending=False), hide_index=True)
+
+        st.caption(f"{len(runs)} ejecuciones registradas en esta sesión")
+        dl_cols = st.columns(2)
+        dl_cols[0].download_button("⬇️ Exportar JSON", instrumentation.runs_to_json(runs),
+                                   file_name="instrumentacion.json", mime="application/json")
+        dl_cols[1].download_button("⬇️ Exportar CSV", instrumentation.runs_to_csv(runs),
+                                   file_name="instrumentacion.csv", mime="text/csv")
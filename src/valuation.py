@@ -0,0 +1,227 @@
+# ----------------------------------------------------------------------
+#   Motor de valoración sin interfaz
+#
+#   Las métricas de "🎯 Valoración Proyectada" y "👨‍💻 Datos Relevantes"
+#   como operaciones de columnas sobre un DataFrame (tickers × campos):
+#     · G = ROE · (1 − payout) y múltiplo de crecimiento (10 / 15 / 20),
+#     · EPS y Precio PER a 5 años, G esperado,
+#     · precio justo por valor libro (P/B · Book/Share),
+#     · precio objetivo por dividendo para un yield deseado,
+#     · bandas Geraldine Weiss.
+#   La app lo usa para un ticker; value_universe() y la CLI lo corren
+#   para listas completas, en paralelo entre procesos:
+#
+#     python src/valuation.py KO PEP JNJ --period 10y --output valuaciones.parquet
+#     python src/valuation.py --tickers-file watchlist.txt --workers 4 --output valuaciones.csv
+# ----------------------------------------------------------------------
+import argparse
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_layer as dl
+from dividends import summarize_matrix
+from geraldine_weiss import compute_bands, to_matrix
+from instrumentation import timed
+
+# Yield deseado por defecto para el precio objetivo por dividendo (%)
+DEFAULT_TARGET_YIELD = 3.0
+PROJECTION_YEARS = 5
+
+# Campos de Ticker.info que usa el motor → nombre de columna
+INFO_FIELDS = {
+    "longName": "Nombre",
+    "currentPrice": "Precio",
+    "dividendRate": "Dividendo Anual",
+    "payoutRatio": "Payout",
+    "trailingPE": "PER",
+    "returnOnEquity": "ROE",
+    "trailingEps": "EPS Actual",
+    "priceToBook": "P/B",
+    "sharesOutstanding": "Acciones",
+}
+EQUITY_ROW = "Total Equity Gross Minority Interest"
+
+# Columnas de la tabla, en el orden de "Datos Relevantes"
+COLUMNS = [
+    "Nombre", "Precio", "ROE Actual", "PauOut", "EPS Actual", "PER", "P/B",
+    "Book/Share", "G", "Múltiplo Crecimiento", "EPS a 5 años", "Precio PER 5 años",
+    "G esperado", "Valor Libro Precio Justo", "Dividendo Anual", "Yield Actual",
+    "CAGR del Dividendo", "Yield Promedio", "Precio por Dividendo Esperado",
+]
+GW_COLUMNS = [
+    "Yield Mínimo", "Yield Máximo", "Precio Sobrevalorado", "Precio Infravalorado",
+    "Posición en Banda", "Distancia a Infravalorado (%)",
+]
+
+
+# --------------------------
+# Entradas
+# --------------------------
+def _equity(balance_sheet):
+    if balance_sheet is None or balance_sheet.empty or EQUITY_ROW not in balance_sheet.index:
+        return np.nan
+    return balance_sheet.loc[EQUITY_ROW].iloc[0]     # último ejercicio
+
+
+def fundamentals_frame(infos, balance_sheets):
+    """Tickers × campos de info, más el capital contable del último balance."""
+    rows = {ticker: {field: (info or {}).get(field) for field in INFO_FIELDS} for ticker, info in infos.items()}
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=list(INFO_FIELDS)).rename(columns=INFO_FIELDS)
+    numeric = frame.columns.drop("Nombre")
+    frame[numeric] = frame[numeric].apply(pd.to_numeric, errors="coerce")
+    frame["Capital Contable"] = pd.Series({t: _equity(bs) for t, bs in balance_sheets.items()}, dtype=float)
+    return frame
+
+
+# --------------------------
+# Métricas
+# --------------------------
+def growth_multiple(g_percent):
+    """Múltiplo de crecimiento: 10 hasta G=10%, 15 hasta 20% y 20 por encima."""
+    g = np.asarray(g_percent, dtype=float)
+    return np.where(np.isnan(g), np.nan, np.select([g <= 10, g <= 20], [10.0, 15.0], 20.0))
+
+
+def dividend_target_price(dividend, cagr, target_yield=DEFAULT_TARGET_YIELD):
+    """Precio al que el dividendo del próximo año (crecido al CAGR) rinde `target_yield` %."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return dividend * (1 + cagr / 100) / (target_yield / 100)
+
+
+@timed()
+def valuation_table(fundamentals, dividend_stats, target_yield=DEFAULT_TARGET_YIELD):
+    """Datos Relevantes (porcentajes en %) para todos los tickers de `fundamentals` a la vez.
+
+    `dividend_stats` trae "CAGR del Dividendo" y "Yield Promedio" por ticker
+    (ver dividends.summarize_matrix).
+    """
+    f = fundamentals
+    stats = dividend_stats.reindex(f.index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = f["ROE"] * (1 - f["Payout"]) * 100
+        multiple = pd.Series(growth_multiple(g), index=f.index)
+        eps_5y = f["EPS Actual"] * (1 + g / 100) ** PROJECTION_YEARS
+        per_5y = eps_5y * multiple
+        price = f["Precio"].where(f["Precio"] != 0)
+        book_per_share = f["Capital Contable"] / f["Acciones"].where(f["Acciones"] != 0)
+        dividend = f["Dividendo Anual"]
+        return pd.DataFrame({
+            "Nombre": f["Nombre"],
+            "Precio": f["Precio"],
+            "ROE Actual": f["ROE"] * 100,
+            "PauOut": f["Payout"] * 100,
+            "EPS Actual": f["EPS Actual"],
+            "PER": f["PER"],
+            "P/B": f["P/B"],
+            "Book/Share": book_per_share,
+            "G": g,
+            "Múltiplo Crecimiento": multiple,
+            "EPS a 5 años": eps_5y,
+            "Precio PER 5 años": per_5y,
+            "G esperado": ((per_5y / price) ** (1 / PROJECTION_YEARS) - 1) * 100,
+            "Valor Libro Precio Justo": f["P/B"] * book_per_share,
+            "Dividendo Anual": dividend,
+            "Yield Actual": (dividend / price * 100).where(dividend != 0),
+            "CAGR del Dividendo": stats["CAGR del Dividendo"],
+            "Yield Promedio": stats["Yield Promedio"],
+            "Precio por Dividendo Esperado": dividend_target_price(dividend, stats["CAGR del Dividendo"], target_yield),
+        }, index=f.index)[COLUMNS]
+
+
+def value_ticker(ticker, info, balance_sheet, cagr=None, avg_yield=None, target_yield=DEFAULT_TARGET_YIELD):
+    """Fila de valuation_table() para un ticker como dict, con None en lugar de NaN."""
+    stats = pd.DataFrame({"CAGR del Dividendo": [cagr], "Yield Promedio": [avg_yield]}, index=[ticker], dtype=float)
+    row = valuation_table(fundamentals_frame({ticker: info}, {ticker: balance_sheet}), stats, target_yield).iloc[0]
+    values = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in row.items()}
+    if values["Múltiplo Crecimiento"] is not None:
+        values["Múltiplo Crecimiento"] = int(values["Múltiplo Crecimiento"])
+    return values
+
+
+# --------------------------
+# Universos
+# --------------------------
+def value_universe(tickers, period="10y", target_yield=DEFAULT_TARGET_YIELD):
+    """Valoración completa (Datos Relevantes + bandas Geraldine Weiss) de `tickers`."""
+    tickers = list(dict.fromkeys(dl.normalize_ticker(t) for t in tickers))
+    histories = dl.get_daily_histories(tickers)
+    fundamentals = dl.fetch_many(tickers, ("info", "balance_sheet"))
+    frame = fundamentals_frame(fundamentals["info"], fundamentals["balance_sheet"])
+
+    closes, dividends = {}, {}
+    for ticker, history in histories.items():
+        if history.empty:
+            continue
+        closes[ticker] = dl.slice_period(history, period)["Close"]
+        dividends[ticker] = history["Dividends"][history["Dividends"] > 0]
+    if not closes:
+        stats = pd.DataFrame(columns=["CAGR del Dividendo", "Yield Promedio"], dtype=float)
+        return valuation_table(frame, stats, target_yield).reindex(columns=COLUMNS + GW_COLUMNS)
+
+    prices = to_matrix(closes)
+    dividend_matrix = to_matrix(dividends).reindex(columns=prices.columns)
+    stats = summarize_matrix(prices, dividend_matrix)
+    bands = compute_bands(prices, dividend_matrix).summary(frame["Precio"].dropna())[GW_COLUMNS]
+    bands[["Yield Mínimo", "Yield Máximo"]] *= 100          # fracción → %
+    return valuation_table(frame, stats, target_yield).join(bands)
+
+
+def _value_chunk(args):
+    tickers, period, target_yield = args
+    return value_universe(tickers, period, target_yield)
+
+
+def value_batch(tickers, period="10y", target_yield=DEFAULT_TARGET_YIELD, workers=4):
+    """value_universe() repartido en `workers` procesos (cada uno con sus descargas en bloque)."""
+    tickers = list(dict.fromkeys(dl.normalize_ticker(t) for t in tickers))
+    if workers <= 1 or len(tickers) <= 1:
+        return value_universe(tickers, period, target_yield)
+    chunks = [tickers[i::workers] for i in range(workers) if tickers[i::workers]]
+    # "spawn": un fork heredaría los hilos y locks de data_layer a medio usar
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = list(pool.map(_value_chunk, [(chunk, period, target_yield) for chunk in chunks]))
+    return pd.concat(parts).reindex(tickers)
+
+
+def write_table(table, path):
+    """Guarda en Parquet o CSV según la extensión de `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        table.rename_axis("Ticker").to_parquet(path)
+    elif path.suffix == ".csv":
+        table.rename_axis("Ticker").to_csv(path)
+    else:
+        raise ValueError(f"Formato no soportado: {path.suffix} (usar .parquet o .csv)")
+    return path
+
+
+def read_tickers(path):
+    """Tickers de un archivo de texto (uno o varios por línea, # para comentarios)."""
+    tickers = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0]
+        tickers.extend(t for t in line.replace(",", " ").split() if t)
+    return tickers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Valoración por lotes sin interfaz")
+    parser.add_argument("tickers", nargs="*", help="tickers a valorar")
+    parser.add_argument("--tickers-file", help="archivo con tickers (uno o varios por línea)")
+    parser.add_argument("--period", default="10y", help="período para CAGR, yield promedio y bandas GW")
+    parser.add_argument("--target-yield", type=float, default=DEFAULT_TARGET_YIELD, help="yield deseado (%%)")
+    parser.add_argument("--workers", type=int, default=4, help="procesos en paralelo")
+    parser.add_argument("--output", default="valuaciones.parquet", help="archivo .parquet o .csv")
+    args = parser.parse_args()
+
+    tickers = args.tickers + (read_tickers(args.tickers_file) if args.tickers_file else [])
+    if not tickers:
+        parser.error("indica al menos un ticker o --tickers-file")
+    table = value_batch(tickers, args.period, args.target_yield, args.workers)
+    print(f"{len(table)} tickers valorados → {write_table(table, args.output)}")
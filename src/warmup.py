@@ -0,0 +1,156 @@
+# ----------------------------------------------------------------------
+#   Precalentamiento nocturno de la caché para una watchlist
+#
+#   Descarga de antemano, para cada ticker de data/watchlist.txt:
+#     · histórico diario y dividendos (en bloque, sobre el almacén Parquet),
+#     · info, balance, resultados y flujo de caja (pool acotado + límite
+#       de peticiones por segundo, para no gatillar el 429 de Yahoo),
+#     · las métricas de valoración del período por defecto de la app.
+#   Todo pasa por data_layer, así que queda en la caché HTTP (SQLite) y
+#   en el almacén de precios que comparten todos los procesos: la primera
+#   visita del día los sirve desde disco (stale-while-revalidate) en vez
+#   de esperar a Yahoo. La tabla de valoración queda además en
+#   data/warmup/valuaciones_<período>.parquet, que el screener usa en
+#   lugar de recalcular mientras tenga menos de un día.
+#
+#     python src/warmup.py                        # una pasada ahora
+#     python src/warmup.py --at 03:00             # todos los días a las 03:00
+#     python src/warmup.py --watchlist otra.txt --concurrency 2 --rate 1
+# ----------------------------------------------------------------------
+import argparse
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import data_layer as dl
+import valuation
+from screener import SNAPSHOT_DIR, snapshot_path
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+WATCHLIST_PATH = DATA_DIR / "watchlist.txt"
+
+CONCURRENCY = 4          # peticiones simultáneas a Yahoo
+RATE = 2.0               # peticiones por segundo (promedio)
+# Período con que abre la pestaña de valoración
+PERIODS = ("5y",)
+DAILY_AT = "03:00"
+
+ENDPOINTS = ("info", "balance_sheet", "financials", "cashflow")
+
+
+class RateLimiter:
+    """Cubeta de fichas: como máximo `rate` llamadas por segundo, con ráfagas de `burst`."""
+
+    def __init__(self, rate=RATE, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# --------------------------
+# Una pasada
+# --------------------------
+def _fetch(limiter, name, ticker):
+    limiter.acquire()
+    return dl.fetch(name, ticker)
+
+
+def warm_up(tickers, concurrency=CONCURRENCY, rate=RATE, periods=PERIODS, snapshot_dir=SNAPSHOT_DIR):
+    """Calienta la caché para `tickers`; devuelve un resumen con los fallos por ticker."""
+    start = time.perf_counter()
+    tickers = list(dict.fromkeys(dl.normalize_ticker(t) for t in tickers))
+    failed = {}
+
+    # Históricos y dividendos: yf.download por tandas (ya acotado por BATCH_THREADS)
+    histories = dl.get_daily_histories(tickers)
+    for ticker, history in histories.items():
+        if history.empty:
+            failed.setdefault(ticker, []).append("history")
+
+    # Endpoints por ticker, con concurrencia y ritmo acotados
+    limiter = RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="warmup") as pool:
+        futures = {(name, ticker): pool.submit(_fetch, limiter, name, ticker)
+                   for ticker in tickers for name in ENDPOINTS}
+        for (name, ticker), future in futures.items():
+            if future.exception() is not None:
+                failed.setdefault(ticker, []).append(name)
+
+    # Tabla de valoración de toda la watchlist, también en disco
+    snapshots = []
+    for period in periods:
+        table = valuation.value_universe(tickers, period)
+        if snapshot_dir is not None:
+            snapshots.append(valuation.write_table(table, snapshot_path(period, snapshot_dir)))
+
+    return {
+        "tickers": len(tickers),
+        "ok": len(tickers) - len(failed),
+        "failed": failed,
+        "snapshots": [str(p) for p in snapshots],
+        "seconds": time.perf_counter() - start,
+        "cache": dl.cache_stats(),
+    }
+
+
+# --------------------------
+# Programación diaria
+# --------------------------
+def seconds_until(at, now=None):
+    """Segundos hasta la próxima hora `at` ("HH:MM", hora local)."""
+    now = now or datetime.datetime.now()
+    hour, minute = (int(part) for part in at.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def run_daily(at=DAILY_AT, watchlist=WATCHLIST_PATH, **options):
+    """Bucle infinito: una pasada por día a la hora `at` (relee la watchlist cada vez)."""
+    while True:
+        time.sleep(seconds_until(at))
+        if Path(watchlist).exists():
+            try:
+                report = warm_up(valuation.read_tickers(watchlist), **options)
+                print(f"[warmup] {report['ok']}/{report['tickers']} tickers en {report['seconds']:.1f}s", flush=True)
+            except Exception as e:
+                print(f"[warmup] error: {e}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precalentamiento de la caché para una watchlist")
+    parser.add_argument("--watchlist", default=str(WATCHLIST_PATH), help="archivo con tickers (uno o varios por línea)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="peticiones simultáneas")
+    parser.add_argument("--rate", type=float, default=RATE, help="peticiones por segundo")
+    parser.add_argument("--periods", nargs="+", default=list(PERIODS), help="períodos a precalcular")
+    parser.add_argument("--at", help="HH:MM — repetir todos los días a esa hora en vez de una sola pasada")
+    args = parser.parse_args()
+
+    if not Path(args.watchlist).exists():
+        parser.error(f"no existe la watchlist {args.watchlist}")
+    options = dict(concurrency=args.concurrency, rate=args.rate, periods=tuple(args.periods))
+    if args.at:
+        run_daily(args.at, args.watchlist, **options)
+    else:
+        report = warm_up(valuation.read_tickers(args.watchlist), **options)
+        print(f"{report['ok']}/{report['tickers']} tickers en {report['seconds']:.1f}s")
+        for ticker, names in report["failed"].items():
+            print(f"  {ticker}: falló {', '.join(names)}")
+        print(f"caché: {report['cache']}")
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import compound
+
+
+def _simulate(initial, contribution, annual_return, years, at_start=False):
+    # Período a período, como lo haría una planilla
+    rate = (1 + annual_return) ** (1 / compound.PERIODS_PER_YEAR) - 1
+    balance = initial
+    for _ in range(years * compound.PERIODS_PER_YEAR):
+        if at_start:
+            balance += contribution
+        balance *= 1 + rate
+        if not at_start:
+            balance += contribution
+    return balance
+
+
+@pytest.mark.parametrize("at_start", [False, True])
+def test_closed_form_matches_period_by_period(at_start):
+    schedule = compound.growth_schedule(1000.0, 200.0, 0.07, 10, at_start=at_start)
+    assert schedule["Saldo"].iloc[-1] == pytest.approx(_simulate(1000.0, 200.0, 0.07, 10, at_start))
+    assert schedule["Aportado"].iloc[-1] == 1000.0 + 200.0 * 120
+    assert list(compound.yearly(schedule).index) == list(range(11))
+
+
+def test_zero_return_is_the_sum_of_contributions():
+    assert compound.future_value(1000.0, 200.0, 0.0, 120) == pytest.approx(1000.0 + 200.0 * 120)
+
+
+def test_monte_carlo_mean_matches_closed_form():
+    expected = compound.future_value(1000.0, 200.0, 0.07, 20 * compound.PERIODS_PER_YEAR)
+    bands, summary = compound.monte_carlo(1000.0, 200.0, 0.07, 0.15, 20, paths=20_000, seed=7)
+    assert summary["Saldo Medio"] == pytest.approx(expected, rel=0.02)
+    assert list(bands.index) == list(range(21))
+    last = bands.iloc[-1]
+    assert last["P5"] < last["P50"] < last["Media"] < last["P95"]
+
+
+def test_monte_carlo_without_volatility_is_deterministic():
+    expected = compound.future_value(1000.0, 200.0, 0.07, 5 * compound.PERIODS_PER_YEAR)
+    bands, summary = compound.monte_carlo(1000.0, 200.0, 0.07, 1e-9, 5, paths=1000, target=expected * 0.99, seed=1)
+    assert bands.iloc[-1]["P50"] == pytest.approx(expected, rel=1e-4)
+    assert summary["Probabilidad de Meta (%)"] == 100
+
+
+def test_goal_solvers_invert_future_value():
+    contribution = compound.required_contribution(100_000.0, 1000.0, 0.07, 15)
+    assert compound.future_value(1000.0, contribution, 0.07, 15 * 12) == pytest.approx(100_000.0)
+    assert compound.required_return(100_000.0, 1000.0, contribution, 15) == pytest.approx(0.07, abs=1e-6)
+    assert compound.years_to_target(100_000.0, 1000.0, contribution, 0.07) == pytest.approx(15.0)
+    assert np.isinf(compound.years_to_target(100_000.0, 1000.0, 0.0, 0.0))
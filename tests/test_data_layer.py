@@ -0,0 +1,19 @@
+import pandas as pd
+
+import data_layer as dl
+
+
+def test_batch_histories_do_not_evict_the_single_ticker_cache(monkeypatch):
+    bars = pd.DataFrame({"Close": [100.0], "Dividends": [0.0]}, index=pd.to_datetime(["2024-01-05"]))
+    for column in ("Open", "High", "Low"):
+        bars[column] = 100.0
+    monkeypatch.setattr(dl.PRICE_STORE, "update_many", lambda tickers, download: {t: bars for t in tickers})
+    dl.clear_cache()
+    dl._CACHE.set(("_daily_history", "KO"), bars, dl.TTL_QUOTE)
+
+    tickers = [f"T{i}" for i in range(dl._CACHE.maxsize + 50)]
+    histories = dl.get_daily_histories(tickers)
+
+    assert len(histories) == len(tickers)
+    assert dl._CACHE.get(("_daily_history", "KO"))[0]
+    assert dl._BATCH_CACHE.get(("_daily_history", "T0"))[0]
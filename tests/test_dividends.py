@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dividends import summarize_dividends, summarize_matrix
+from geraldine_weiss import compute_bands, to_matrix
+
+CURRENT_YEAR = 2023
+
+
+def _ticker(start_price, start_dividend, growth, first_year=2018):
+    days = pd.bdate_range(f"{first_year}-01-02", f"{CURRENT_YEAR}-06-30")
+    close = pd.Series(start_price * (1 + 0.3 * np.sin(np.arange(len(days)) / 90)), index=days)
+    payments = pd.date_range(f"{first_year}-03-01", f"{CURRENT_YEAR}-06-30", freq="QS-MAR") + pd.Timedelta(days=14)
+    amounts = [start_dividend * (1 + growth) ** (date.year - first_year) / 4 for date in payments]
+    return close, pd.Series(amounts, index=payments)
+
+
+TICKERS = {"KO": _ticker(60.0, 1.6, 0.04), "PEP": _ticker(150.0, 3.5, 0.07, first_year=2019)}
+
+
+def test_matrix_summary_matches_single_ticker():
+    prices = to_matrix({t: close for t, (close, _) in TICKERS.items()})
+    dividends = to_matrix({t: divs for t, (_, divs) in TICKERS.items()})
+    matrix = summarize_matrix(prices, dividends, current_year=CURRENT_YEAR)
+
+    for ticker, (close, divs) in TICKERS.items():
+        single = summarize_dividends(divs, close, current_year=CURRENT_YEAR)
+        assert matrix.loc[ticker, "CAGR del Dividendo"] == pytest.approx(single.cagr)
+        assert matrix.loc[ticker, "Yield Promedio"] == pytest.approx(single.avg_yield)
+
+
+def test_bands_do_not_depend_on_other_tickers():
+    prices = to_matrix({t: close for t, (close, _) in TICKERS.items()})
+    dividends = to_matrix({t: divs for t, (_, divs) in TICKERS.items()})
+    together = compute_bands(prices, dividends, current_year=CURRENT_YEAR).summary()
+
+    for ticker, (close, divs) in TICKERS.items():
+        alone = compute_bands(to_matrix({ticker: close}), to_matrix({ticker: divs}),
+                              current_year=CURRENT_YEAR).summary()
+        pd.testing.assert_series_equal(together.loc[ticker], alone.loc[ticker])
+
+
+def test_bands_from_monthly_yields():
+    close, divs = TICKERS["KO"]
+    bands = compute_bands(to_matrix({"KO": close}), to_matrix({"KO": divs}), current_year=CURRENT_YEAR)
+    monthly = close.resample("ME").last()
+    annual = divs.groupby(divs.index.year).sum()
+    # Año en curso: el del año anterior crecido al CAGR
+    annual[CURRENT_YEAR] = annual[CURRENT_YEAR - 1] * (1 + bands.cagr["KO"] / 100)
+    yields = monthly.index.year.map(annual).to_numpy() / monthly.to_numpy()
+    assert bands.yield_min["KO"] == pytest.approx(yields.min())
+    assert bands.yield_max["KO"] == pytest.approx(yields.max())
+    assert bands.cagr["KO"] == pytest.approx(4.0)
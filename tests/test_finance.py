@@ -0,0 +1,33 @@
+import pandas as pd
+
+import finance
+
+
+def _statement(tmp_path, rows):
+    path = tmp_path / "cartola.csv"
+    pd.DataFrame(rows).to_csv(path, sep=";", index=False)
+    return path
+
+
+def test_parse_all_empty_columns():
+    empty = pd.Series([None, None], dtype=object)
+    assert finance.parse_amounts(empty).isna().all()
+    assert finance.parse_dates(empty).isna().all()
+
+
+def test_ingest_without_abonos(tmp_path):
+    path = _statement(tmp_path, {"Fecha": ["05/01/2024", "06/01/2024"], "Descripción": ["LIDER", "UBER"],
+                                 "Cargo": ["45.000", "12.000"], "Abono": [None, None]})
+    store = finance.FinanceStore(tmp_path / "f.sqlite")
+    result = store.ingest(path, "Cuenta", currency="USD", categorizer=finance.Categorizer())
+    assert result == {"leídas": 2, "nuevas": 2, "duplicadas": 0}
+    assert sorted(store.frame()["monto"]) == [-45_000.0, -12_000.0]
+
+
+def test_ingest_blank_dates(tmp_path):
+    path = _statement(tmp_path, {"Fecha": [None, None], "Descripción": ["LIDER", "UBER"],
+                                 "Monto": ["-45.000", "-12.000"]})
+    store = finance.FinanceStore(tmp_path / "f.sqlite")
+    result = store.ingest(path, "Cuenta", currency="USD", categorizer=finance.Categorizer())
+    assert result == {"leídas": 0, "nuevas": 0, "duplicadas": 0}
+    assert store.frame().empty
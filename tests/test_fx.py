@@ -0,0 +1,17 @@
+import pandas as pd
+
+import fx
+
+
+def test_legacy_weekend_row_does_not_override_yahoo(tmp_path, monkeypatch):
+    # Yahoo: viernes 5 y lunes 8; el CSV trae una tasa vieja del sábado 6 y otra anterior a Yahoo
+    closes = pd.DataFrame({"Close": [0.0011, 0.0012]}, index=pd.to_datetime(["2024-01-05", "2024-01-08"]))
+    monkeypatch.setattr(fx.dl, "get_daily_history", lambda symbol: closes if symbol == "XTSUSD=X" else pd.DataFrame())
+    legacy = tmp_path / "fx_cache.csv"
+    pd.DataFrame({"ccy": ["XTS", "XTS"], "date": ["2024-01-02", "2024-01-06"], "rate": [0.0010, 0.0050]}).to_csv(legacy, index=False)
+    read_legacy = fx.read_legacy
+    monkeypatch.setattr(fx, "read_legacy", lambda: read_legacy(legacy))
+
+    rates = fx.FX.rates_at(["XTS"] * 3, ["2024-01-03", "2024-01-07", "2024-01-09"])
+    assert list(rates) == [0.0010, 0.0011, 0.0012]
+    assert fx.FX.latest(["XTS"])["XTS"] == 0.0012
@@ -0,0 +1,90 @@
+from http_cache import CachedSession, VOLATILE_PARAMS
+
+CHART = "https://query2.finance.yahoo.com/v8/finance/chart/KO"
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Responde en orden la lista de respuestas y registra cada GET."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, params, kwargs))
+        return self.responses.pop(0)
+
+
+def _session(tmp_path, *responses):
+    fake = FakeSession(*responses)
+    return CachedSession(fake, path=tmp_path / "cache.sqlite"), fake
+
+
+def _expire(session, url, params=None, ago=1):
+    # Vencida hace `ago` segundos
+    session._store.touch(session.cache_key(url, params), -ago)
+
+
+def test_cache_key_ignores_session_and_clock_params():
+    base = {"interval": "1d", "events": "div,splits"}
+    first = CachedSession.cache_key(CHART, {**base, "crumb": "a", "period1": -3124137600, "period2": 1700000000})
+    second = CachedSession.cache_key(CHART, {**base, "crumb": "b", "period1": -3124051200, "period2": 1700086400})
+    assert first == second
+    assert not any(f"{param}=" in first for param in VOLATILE_PARAMS)
+    assert "period1=max" in first
+    # Un período acotado sí forma parte de la clave
+    assert CachedSession.cache_key(CHART, {**base, "period1": 1500000000}) != first
+
+
+def test_fresh_response_is_served_from_cache(tmp_path):
+    session, fake = _session(tmp_path, FakeResponse(200, b"uno"))
+    assert session.get(CHART, params={"crumb": "x"}).content == b"uno"
+    cached = session.get(CHART, params={"crumb": "y"})
+    assert cached.content == b"uno" and cached.from_cache
+    assert len(fake.calls) == 1
+    assert session.stats["hits"] == 1
+
+
+def test_rate_limit_never_replaces_good_payload(tmp_path):
+    session, fake = _session(tmp_path, FakeResponse(200, b"bueno"), FakeResponse(429, b"", {"Retry-After": "30"}))
+    session.get(CHART)
+    _expire(session, CHART, ago=2 * 60 * 60)        # fuera de la ventana vencida del endpoint
+
+    response = session.get(CHART)
+    assert response.status_code == 200 and response.content == b"bueno"
+    stored = session._store.get(session.cache_key(CHART, None))
+    assert stored["status"] == 200 and stored["body"] == b"bueno"
+    assert session.backoff.active()
+
+    # Durante el backoff no se vuelve a llamar a Yahoo
+    assert session.get(CHART).content == b"bueno"
+    assert len(fake.calls) == 2
+
+
+def test_negative_cache_remembers_not_found(tmp_path):
+    session, fake = _session(tmp_path, FakeResponse(404, b"no existe"))
+    assert session.get(CHART).status_code == 404
+    again = session.get(CHART)
+    assert again.status_code == 404 and again.from_cache
+    assert len(fake.calls) == 1
+    assert session.stats["negative"] == 1
+
+
+def test_stale_payload_is_served_while_refreshing(tmp_path):
+    session, fake = _session(tmp_path, FakeResponse(200, b"viejo"), FakeResponse(200, b"nuevo"))
+    session.get(CHART)
+    _expire(session, CHART, ago=60)                 # dentro de la ventana vencida
+
+    assert session.get(CHART).content == b"viejo"
+    session._refresher.shutdown(wait=True)
+    assert session.stats["stale"] == 1
+    assert session._store.get(session.cache_key(CHART, None))["body"] == b"nuevo"
+    assert session.get(CHART).content == b"nuevo"
+    assert len(fake.calls) == 2
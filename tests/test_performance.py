@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import performance
+
+
+DATES = pd.to_datetime(["2023-01-02", "2023-07-02", "2023-07-03", "2024-01-02"])
+
+
+def _series(values, contributions):
+    index = DATES[:len(values)]
+    zeros = [0.0] * len(values)
+    return pd.DataFrame({
+        "Valor de Mercado": values,
+        "Aportes": contributions,
+        "Retiros": zeros,
+        "Dividendos": zeros,
+        "Invertido Neto": np.cumsum(contributions),
+    }, index=index)
+
+
+def test_twr_ignores_timing_of_contributions():
+    # +10% el primer semestre, aporte de 110 sin variación, +20% el segundo
+    series = _series([100.0, 110.0, 220.0, 264.0], [100.0, 0.0, 110.0, 0.0])
+    total, annual = performance.twr(series)
+    assert total == pytest.approx(0.32)
+    assert annual == pytest.approx(1.32 ** (performance.YEAR_DAYS / 365) - 1)
+    assert performance.cumulative_twr(series)[-1] == pytest.approx(32.0)
+
+
+def test_mwr_weights_the_larger_contribution():
+    series = _series([100.0, 110.0, 220.0, 264.0], [100.0, 0.0, 110.0, 0.0])
+    rate = performance.mwr(series)
+    flows = np.array([-100.0, -110.0, 264.0])
+    years = (DATES[[0, 2, 3]] - DATES[0]).days.to_numpy() / performance.YEAR_DAYS
+    assert np.sum(flows / (1 + rate) ** years) == pytest.approx(0.0, abs=1e-6)
+    # La mayor parte del capital estuvo en el semestre que rindió más
+    assert rate > performance.twr(series)[1]
+
+
+def test_xirr_of_one_year_investment():
+    dates = pd.to_datetime(["2023-01-01", "2024-01-01"])
+    rate = performance.xirr([-100.0, 110.0], dates)
+    assert rate == pytest.approx(1.1 ** (performance.YEAR_DAYS / 365) - 1, abs=1e-8)
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pandas as pd
+
+from price_store import COLUMNS, PriceStore, dividend_adjusted
+
+
+def _bars(dates, tz=None, close=100.0):
+    index = pd.DatetimeIndex(pd.to_datetime(dates))
+    if tz:
+        index = index.tz_localize(tz)
+    data = pd.DataFrame({c: close for c in COLUMNS}, index=index)
+    data[["Dividends", "Stock Splits"]] = 0.0
+    return data
+
+
+class FakeTicker:
+    # period="max" → `history`; start=… → `delta` (si no hay, también `history`)
+    def __init__(self, history, delta=None):
+        self._history = history
+        self._delta = delta
+        self.calls = []
+
+    def history(self, **kwargs):
+        self.calls.append(kwargs)
+        if "start" in kwargs and self._delta is not None:
+            return self._delta
+        return self._history
+
+
+def _expire(store, ticker):
+    old = time.time() - store.max_age - 1
+    os.utime(store.path(ticker), (old, old))
+
+
+def test_update_after_batch_download_mixes_timezones(tmp_path):
+    # yf.download(ignore_tz=True) guarda sin zona; Ticker.history trae el delta con zona
+    ticker = FakeTicker(_bars(["2024-01-04", "2024-01-05"], tz="America/New_York", close=101.0))
+    store = PriceStore(lambda t: ticker, root=tmp_path)
+    batch = lambda tickers, **kwargs: {t: _bars(["2024-01-02", "2024-01-03", "2024-01-04"]) for t in tickers}
+
+    first = store.update_many(["KO"], batch)["KO"]
+    assert first.index.tz is None and len(first) == 3
+
+    _expire(store, "KO")
+    merged = store.update("KO")
+    assert ticker.calls[-1]["start"] == "2024-01-04"
+    assert list(merged.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert merged["Close"].tolist() == [100.0, 100.0, 101.0, 101.0]
+    assert store.load("KO").index.equals(merged.index)
+
+
+def test_fresh_file_is_not_downloaded_again(tmp_path):
+    ticker = FakeTicker(_bars(["2024-01-02", "2024-01-03"]))
+    store = PriceStore(lambda t: ticker, root=tmp_path)
+
+    assert len(store.update("KO")) == 2
+    assert ticker.calls == [dict(interval="1d", auto_adjust=False, actions=True, period="max")]
+    assert len(store.update("KO")) == 2
+    assert len(ticker.calls) == 1
+    assert store.stats == {"full": 1, "delta": 0, "fresh": 1}
+
+
+def test_delta_replaces_last_bar_and_appends(tmp_path):
+    # La última barra guardada quedó a medio día: el delta la pisa
+    ticker = FakeTicker(_bars(["2024-01-02", "2024-01-03"]),
+                        delta=_bars(["2024-01-03", "2024-01-04"], close=105.0))
+    store = PriceStore(lambda t: ticker, root=tmp_path)
+    store.update("KO")
+    _expire(store, "KO")
+
+    merged = store.update("KO")
+    assert ticker.calls[-1]["start"] == "2024-01-03"
+    assert merged["Close"].tolist() == [100.0, 105.0, 105.0]
+    assert store.stats["delta"] == 1
+    assert store.load("KO")["Close"].tolist() == [100.0, 105.0, 105.0]
+
+
+def test_new_split_downloads_full_history(tmp_path):
+    delta = _bars(["2024-01-03", "2024-01-04"], close=50.0)
+    delta.loc[pd.Timestamp("2024-01-04"), "Stock Splits"] = 2.0
+    ticker = FakeTicker(_bars(["2024-01-02", "2024-01-03"]), delta=delta)
+    store = PriceStore(lambda t: ticker, root=tmp_path)
+    store.update("KO")
+    _expire(store, "KO")
+
+    store.update("KO")
+    assert ticker.calls[-1].get("period") == "max"
+    assert store.stats["full"] == 2 and store.stats["delta"] == 0
+
+
+def test_dividend_adjustment_matches_yahoo_factor():
+    raw = _bars(["2024-01-02", "2024-01-03", "2024-01-04"])
+    raw["Close"] = [100.0, 98.0, 99.0]
+    raw.loc[pd.Timestamp("2024-01-03"), "Dividends"] = 2.0
+
+    adjusted = dividend_adjusted(raw)
+    # Antes de la fecha ex: × (1 − 2 / 100); desde la fecha ex, sin cambios
+    assert adjusted["Close"].tolist() == [98.0, 98.0, 99.0]
+    assert adjusted["Open"].iloc[0] == 100.0 * 0.98
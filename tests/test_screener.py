@@ -0,0 +1,37 @@
+import os
+import time
+
+import pandas as pd
+
+import data_layer as dl
+import screener
+import valuation
+
+
+def test_screen_uses_fresh_warmup_snapshot(tmp_path, monkeypatch):
+    table = pd.DataFrame({"Precio": [60.0, 170.0]}, index=["KO", "PEP"])
+    valuation.write_table(table, screener.snapshot_path("5y", tmp_path))
+    read_snapshot = screener.read_snapshot
+    monkeypatch.setattr(screener, "read_snapshot", lambda period: read_snapshot(period, tmp_path))
+    computed = []
+
+    def value_universe(tickers, period):
+        computed.append(list(tickers))
+        return pd.DataFrame({"Precio": [150.0] * len(tickers)}, index=list(tickers))
+
+    monkeypatch.setattr(screener.valuation, "value_universe", value_universe)
+    dl.clear_cache()
+
+    result = screener.screen(["jnj", "KO", "PEP"], "5y")
+    assert computed == [["JNJ"]]
+    assert list(result.index) == ["JNJ", "KO", "PEP"]
+    assert list(result["Precio"]) == [150.0, 60.0, 170.0]
+
+
+def test_stale_snapshot_is_ignored(tmp_path):
+    path = valuation.write_table(pd.DataFrame({"Precio": [60.0]}, index=["KO"]), screener.snapshot_path("5y", tmp_path))
+    assert screener.read_snapshot("5y", tmp_path) is not None
+    old = time.time() - screener.SNAPSHOT_MAX_AGE - 60
+    os.utime(path, (old, old))
+    assert screener.read_snapshot("5y", tmp_path) is None
+    assert screener.read_snapshot("10y", tmp_path) is None